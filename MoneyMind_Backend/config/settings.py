@@ -29,6 +29,34 @@ logger = logging.getLogger(__name__)
 
 # --- Model Selection ---
 GEMINI_FAST_MODEL = 'gemini-1.5-flash'
+GEMINI_LITE_MODEL = 'gemini-1.5-flash-8b'
+GEMINI_PRO_MODEL = 'gemini-1.5-pro'
+
+# Preferred model per task class first, followed by the lighter/faster models the
+# router degrades to when the preferred one is slow or failing.
+GEMINI_TASK_MODELS = {
+    "classification": [os.getenv("GEMINI_CLASSIFICATION_MODEL", GEMINI_LITE_MODEL), GEMINI_FAST_MODEL],
+    "extraction": [os.getenv("GEMINI_EXTRACTION_MODEL", GEMINI_FAST_MODEL), GEMINI_LITE_MODEL],
+    "synthesis": [os.getenv("GEMINI_SYNTHESIS_MODEL", GEMINI_FAST_MODEL), GEMINI_LITE_MODEL],
+    "long_form": [os.getenv("GEMINI_LONG_FORM_MODEL", GEMINI_PRO_MODEL), GEMINI_FAST_MODEL],
+}
+DEFAULT_GEMINI_TASK = "synthesis"
+
+# p95 latency budget (seconds) per task class before the router degrades
+GEMINI_TASK_P95_BUDGET_SECONDS = {
+    "classification": 2.0,
+    "extraction": 8.0,
+    "synthesis": 12.0,
+    "long_form": 25.0,
+}
+GEMINI_MAX_ERROR_RATE = 0.25
+GEMINI_ROUTER_MIN_SAMPLES = 5
+GEMINI_ROUTER_WINDOW_SIZE = 50
+GEMINI_ROUTER_WINDOW_SECONDS = 300
+
+# Shared response cache for identical (task, prompt) generations
+GEMINI_RESPONSE_CACHE_SIZE = 512
+GEMINI_RESPONSE_CACHE_TTL_SECONDS = 600
 
 # --- Basic Validation ---
 if not GEMINI_API_KEY:
@@ -42,6 +70,200 @@ if not Twilio_Auth_Token:
 if not Ngrok_AUTHTOKEN:
     logger.error("Ngrok_AUTHTOKEN not found in environment variables.")
 
+# --- Tool Output Compaction ---
+# Fields kept per tool when search results are sent back to the model; links are
+# replaced by short ids and re-expanded in the final answer.
+TOOL_OUTPUT_FIELDS = {
+    "google_search": ["title", "snippet", "link"],
+    "youtube_search": ["title", "channel", "link"],
+    "get_financial_news": ["title", "snippet", "source", "link"],
+}
+TOOL_OUTPUT_SNIPPET_TOKENS = 40
+TOOL_OUTPUT_DEDUPE_THRESHOLD = 0.8
+
+# --- SerpApi HTTP Transport ---
+SERPAPI_BASE_URL = "https://serpapi.com/search.json"
+SERPAPI_MAX_CONNECTIONS = 20
+SERPAPI_MAX_KEEPALIVE_CONNECTIONS = 10
+SERPAPI_KEEPALIVE_EXPIRY_SECONDS = 60
+SERPAPI_CONNECT_TIMEOUT_SECONDS = 5
+
+# --- SerpApi Result Cache ---
+# Freshness per engine: explainer videos stay valid for days, organic results for
+# hours, news and market data for minutes.
+SERPAPI_CACHE_TTL_SECONDS = {
+    "youtube": 3 * 24 * 3600,
+    "google": 6 * 3600,
+    "google_news": 15 * 60,
+    "google_finance_markets": 5 * 60,
+    "google_shopping": 24 * 3600,
+    "google_product": 24 * 3600,
+    "default": 3600,
+}
+SERPAPI_NEGATIVE_CACHE_TTL_SECONDS = 10 * 60
+SERPAPI_CACHE_MAX_ENTRIES = 5000
+SERPAPI_CACHE_MAX_BYTES = int(os.getenv("SERPAPI_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+# Optional on-disk tier shared by all workers on the host; empty disables it
+SERPAPI_CACHE_DIR = os.getenv("SERPAPI_CACHE_DIR", os.path.join(DATA_DIR, "cache"))
+# How long expired results stay available to be served stale when quota is short
+SERPAPI_CACHE_STALE_SECONDS = 24 * 3600
+# How often rows past their stale window are deleted from the disk tier
+SERPAPI_CACHE_PURGE_INTERVAL_SECONDS = 3600
+
+# --- SerpApi Quota ---
+# Hard monthly plan quota. The daily budget defaults to an even pacing of what is
+# left of the month (0 = derive it); set SERPAPI_DAILY_BUDGET to pin it.
+SERPAPI_MONTHLY_QUOTA = int(os.getenv("SERPAPI_MONTHLY_QUOTA", 5000))
+SERPAPI_DAILY_BUDGET = int(os.getenv("SERPAPI_DAILY_BUDGET", 0))
+# Share of the daily budget held back from each priority class: prefetch stops
+# when less than 40% is left, app screens at 10%. Interactive chat is only bound
+# by the monthly quota.
+SERPAPI_PRIORITY_RESERVE = {
+    "interactive": 0.0,
+    "app": 0.1,
+    "prefetch": 0.4,
+}
+# Hedged duplicate requests cost quota too; only send them above this share
+SERPAPI_HEDGE_MIN_BUDGET_SHARE = 0.5
+SERPAPI_QUOTA_STATE_PATH = os.getenv("SERPAPI_QUOTA_STATE_PATH", os.path.join(DATA_DIR, "serpapi_quota.json"))
+
+# --- News Prefetch ---
+# Popular news topics (aggregated from users' news_interaction_topics) are
+# prefetched on a schedule so most news tool calls are served from memory.
+NEWS_PREFETCH_TOP_K = int(os.getenv("NEWS_PREFETCH_TOP_K", 10))
+NEWS_PREFETCH_MIN_USERS = 1
+NEWS_PREFETCH_INTERVAL_SECONDS = 15 * 60
+NEWS_PREFETCH_TTL_SECONDS = 20 * 60
+
+# --- Article Store ---
+# Every fetched article is kept in SQLite under a stable id; headlines whose
+# SimHash differs by at most this many bits are treated as the same story.
+ARTICLE_STORE_PATH = os.getenv("ARTICLE_STORE_PATH", os.path.join(DATA_DIR, "articles.sqlite3"))
+ARTICLE_SIMHASH_MAX_DISTANCE = 3
+# Stored articles are served instead of an error when upstream fetches fail
+ARTICLE_STALE_FALLBACK_SECONDS = 2 * 24 * 3600
+
+# --- Markets Snapshot ---
+# One google_finance_markets fetch per interval feeds trending news, /markets and
+# the news agent's market status answers; kept up to the max age if refreshes fail.
+MARKETS_SNAPSHOT_REFRESH_SECONDS = 5 * 60
+MARKETS_SNAPSHOT_MAX_AGE_SECONDS = 3600
+
+# --- Market Stream ---
+# The stream refresher re-reads the shared markets snapshot (which itself only
+# refetches every MARKETS_SNAPSHOT_REFRESH_SECONDS) while clients are connected.
+MARKET_STREAM_INTERVAL_SECONDS = 30
+MARKET_STREAM_HEARTBEAT_SECONDS = 15
+MARKET_STREAM_QUEUE_SIZE = 16
+
+# --- Market History ---
+# Every markets snapshot appends index quotes to per-symbol column files; history
+# responses are downsampled to at most MARKET_HISTORY_MAX_POINTS points.
+MARKET_HISTORY_DIR = os.getenv("MARKET_HISTORY_DIR", os.path.join(DATA_DIR, "market_history"))
+MARKET_HISTORY_MAX_POINTS = 120
+MARKET_HISTORY_RANGES = {
+    "1d": 86400, "5d": 5 * 86400, "1m": 30 * 86400, "3m": 90 * 86400,
+    "6m": 180 * 86400, "1y": 365 * 86400, "max": None,
+}
+
+# --- News Ingestion & Search ---
+# Feeds pulled into the local article store (and its full-text index) on a
+# schedule; /api/news/search is served from the index when it has enough
+# recent matches and only goes to SerpApi on a miss.
+NEWS_CATEGORIES = ["investments", "market & economy", "startups", "business & fintech"]
+NEWS_INGEST_INTERVAL_SECONDS = 30 * 60
+NEWS_SEARCH_MIN_INDEX_HITS = 3
+NEWS_SEARCH_MAX_AGE_SECONDS = 3 * 24 * 3600
+
+# --- News Personalization ---
+# Interests and articles are hashed into NEWS_VECTOR_DIM term columns. Older
+# topics/companies are decayed by NEWS_INTEREST_DECAY per step, logged news
+# requests by a half-life in days; fresher articles get up to a
+# NEWS_RECENCY_WEIGHT boost.
+NEWS_VECTOR_DIM = 2 ** 18
+NEWS_PERSONALIZED_CANDIDATES = 2000
+NEWS_INTEREST_DECAY = 0.85
+NEWS_LIKED_COMPANY_WEIGHT = 1.5
+NEWS_INTEREST_HALF_LIFE_DAYS = 14
+NEWS_RECENCY_HALF_LIFE_HOURS = 24
+NEWS_RECENCY_WEIGHT = 0.5
+
+# --- News Sentiment ---
+# Lexicon scores are squashed with raw / sqrt(raw^2 + alpha); |score| below the
+# neutral band is labelled neutral.
+NEWS_SENTIMENT_ALPHA = 15
+NEWS_SENTIMENT_NEUTRAL_BAND = 0.05
+NEWS_SENTIMENT_MAX_BATCH = 200
+
+# --- News Route Cache ---
+# Stale-while-revalidate cache per (endpoint, country, language): responses are
+# refreshed in the background after the soft TTL and dropped after the hard TTL.
+NEWS_ROUTE_SOFT_TTL_SECONDS = {
+    "trending": 5 * 60,
+    "category": 15 * 60,
+    "markets": 5 * 60,
+}
+NEWS_ROUTE_HARD_TTL_SECONDS = 2 * 3600
+
+# --- Instrument Catalog ---
+# Bulk CSV of Indian instruments used for recommendation candidates; returns and
+# costs in it are indicative long-run figures, not live quotes.
+INSTRUMENT_CATALOG_PATH = os.getenv("INSTRUMENT_CATALOG_PATH", os.path.join(DATA_DIR, "instruments.csv"))
+INSTRUMENT_CANDIDATE_LIMIT = 8
+
+# --- Recommendation Scoring ---
+# Weights of the per-feature fits in a product's match score
+RECOMMEND_SCORE_WEIGHTS = {"risk": 0.35, "horizon": 0.25, "tax": 0.15, "expense": 0.15, "min_investment": 0.10}
+RECOMMEND_EXPENSE_RATIO_CEILING_PCT = 2.5  # Expense ratio that scores zero
+RECOMMEND_MAX_ALLOCATED_PRODUCTS = 4
+RECOMMEND_MIN_ALLOCATION_SCORE = 60  # Lower-scoring products get no allocation
+# Ranked lists are cached per criteria bucket; amounts share a bucket within this ratio
+RECOMMEND_CACHE_AMOUNT_STEP = 1.5
+RECOMMEND_CACHE_MAX_ENTRIES = 1024
+RECOMMEND_CACHE_TTL_SECONDS = 6 * 3600
+
+# --- Product Details Cache ---
+# Bounded LRU in memory plus a SQLite file shared by all workers; empty path
+# disables the disk tier.
+PRODUCT_DETAILS_CACHE_MAX_ENTRIES = 2000
+PRODUCT_DETAILS_TTL_SECONDS = 24 * 3600
+PRODUCT_DETAILS_CACHE_PATH = os.getenv("PRODUCT_DETAILS_CACHE_PATH", os.path.join(DATA_DIR, "cache", "product_details.sqlite3"))
+
+# --- Product Comparison ---
+COMPARE_FETCH_CONCURRENCY = 4  # Product detail fetches in flight per comparison
+COMPARE_FETCH_TIMEOUT_SECONDS = 8  # A slower product is left out of the comparison
+
+# --- Product Explanations ---
+EXPLAIN_BATCH_MAX_PRODUCTS = 12  # Products per /explain-batch request (one model call)
+EXPLAIN_CACHE_MAX_ENTRIES = 2048
+EXPLAIN_CACHE_TTL_SECONDS = 24 * 3600
+
+# --- Response Compression ---
+# JSON responses at least this large are compressed (Brotli when brotli-asgi is
+# installed, otherwise gzip); live streams are never compressed.
+RESPONSE_COMPRESSION_MIN_BYTES = 1024
+
+# --- Upstream Resilience ---
+# Per-upstream circuit breaker / hedging policy used by src.services.resilience.
+# Hedged duplicates are only ever sent for idempotent reads.
+UPSTREAM_RESILIENCE = {
+    "gemini": {
+        "failure_threshold": 5,
+        "reset_timeout_seconds": 30,
+        "timeout_seconds": 30,
+        "hedge_min_delay_seconds": 1.0,
+        "hedge_max_delay_seconds": 5.0,
+    },
+    "serpapi": {
+        "failure_threshold": 5,
+        "reset_timeout_seconds": 20,
+        "timeout_seconds": 15,
+        "hedge_min_delay_seconds": 0.3,
+        "hedge_max_delay_seconds": 3.0,
+    },
+}
+UPSTREAM_FALLBACK_CACHE_SIZE = 256
+
 # --- Default User Structure ---
 DEFAULT_USER_STRUCTURE = {
   "user_id": None,
@@ -73,7 +73,7 @@ def run_news_agent(user_input: str, user_data: dict) -> tuple[str, dict]:
         c) A message indicating if no specific results were found for the query by SerpApi.
     5.  Wait for the tool's response string.
     6.  **Synthesize the information from the tool's response string into a concise, user-friendly summary.**
-        *   If news results were returned: Present 2-4 key headlines with their source and a brief snippet. Mention links if available in the tool output.
+        *   If news results were returned: Present 2-4 key headlines with their source and a brief snippet. Mention links if available in the tool output (links are given as short ids like link1; write the id exactly as given and it will be replaced with the full URL).
         *   If market data was returned: Clearly state the key index/market figures provided by the tool (e.g., "Nifty 50 is at X, up/down Y points...").
         *   If the tool indicated no results: Inform the user politely, mentioning the specific query tried (e.g., "I searched for '{{query}}' using SerpApi but couldn't find recent specific news/data."). ## <-- CORRECTED LINE
     7.  Determine the primary topic/entity that was searched for using the tool based on the query you formulated.
@@ -91,7 +91,8 @@ def run_news_agent(user_input: str, user_data: dict) -> tuple[str, dict]:
         response_text = gemini_service.generate_with_tools(
             prompt=prompt,
             tools=NEWS_TOOLS,
-            tool_functions=TOOL_FUNCTIONS_MAP
+            tool_functions=TOOL_FUNCTIONS_MAP,
+            task="synthesis"
         )
 
         logger.info(f"News Agent received response from Gemini service for user {user_id}.")
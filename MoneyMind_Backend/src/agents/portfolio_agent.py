@@ -1,13 +1,28 @@
 import logging
 import json
 import datetime
-import re
+from typing import Dict
+from pydantic import BaseModel, Field
 
 from src.services.gemini_service import gemini_service
+from src.core.structured_output import StructuredOutputError, model_to_dict
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# --- Response Schema ---
+class RiskBucket(BaseModel):
+    percentage: float
+    breakdown: Dict[str, float] = Field(default_factory=dict)
+
+class PortfolioAllocation(BaseModel):
+    low_risk_investments: RiskBucket
+    medium_risk_investments: RiskBucket
+    high_risk_investments: RiskBucket
+
+class PortfolioSuggestion(BaseModel):
+    portfolio_allocation: PortfolioAllocation
+
 # --- Agent Logic ---
 def run_portfolio_agent(user_input: str, user_data: dict) -> tuple[str, dict]:
     """Generates portfolio suggestions based on risk profile and handles adjustments."""
@@ -97,29 +112,14 @@ def run_portfolio_agent(user_input: str, user_data: dict) -> tuple[str, dict]:
 
     try:
         logger.info(f"Generating portfolio suggestion for {user_id} with prompt...")
-        response = gemini_service.generate_text(prompt=prompt) 
-
-        # --- Parse Response and Validate ---
-        json_match = re.search(r'```json\s*(\{.*?\})\s*```', response, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1)
-        else:
-             json_str = response.strip()
-             if not (json_str.startswith('{') and json_str.endswith('}')):
-                  raise ValueError("Response doesn't contain the expected JSON structure.")
-
-        portfolio_data = json.loads(json_str)
-
-        # --- Basic Validation of the returned structure ---
-        if "portfolio_allocation" not in portfolio_data:
-            raise ValueError("Missing 'portfolio_allocation' key in generated JSON.")
+        # JSON mode + schema validation + local repair; raises StructuredOutputError
+        suggestion = gemini_service.generate_json(prompt=prompt, schema=PortfolioSuggestion, task="extraction")
+        alloc = model_to_dict(suggestion)["portfolio_allocation"]
 
-        alloc = portfolio_data["portfolio_allocation"]
+        # --- Sanity-check the percentages ---
         total_perc = 0
         categories = ["low_risk_investments", "medium_risk_investments", "high_risk_investments"]
         for cat_key in categories:
-            if cat_key not in alloc:
-                 raise ValueError(f"Missing category '{cat_key}' in generated JSON.")
             cat_perc = alloc[cat_key].get("percentage", 0)
             total_perc += cat_perc
             breakdown = alloc[cat_key].get("breakdown", {})
@@ -151,12 +151,12 @@ def run_portfolio_agent(user_input: str, user_data: dict) -> tuple[str, dict]:
 
         for risk_level_key, details in alloc.items():
             level_name = risk_level_key.replace("_", " ").title()
-            readable_output += f"**{level_name} ({details.get('percentage', 0)}%)**\n"
+            readable_output += f"**{level_name} ({details.get('percentage', 0):g}%)**\n"
             breakdown = details.get('breakdown', {})
             if breakdown:
                 for asset_key, percent in breakdown.items():
                     asset_name = asset_key.replace("_", " ").title()
-                    readable_output += f"- {asset_name}: {percent}%\n"
+                    readable_output += f"- {asset_name}: {percent:g}%\n"
             else:
                  readable_output += "- (No specific assets listed)\n"
             readable_output += "\n"
@@ -167,12 +167,9 @@ def run_portfolio_agent(user_input: str, user_data: dict) -> tuple[str, dict]:
 
         return readable_output, user_data
 
-    except json.JSONDecodeError as e:
-        logger.error(f"Error decoding JSON from Gemini portfolio response for user {user_id}: {e}\nRaw response:\n{response}")
+    except StructuredOutputError as e:
+        logger.error(f"Could not get a valid portfolio JSON from Gemini for user {user_id}: {e}")
         return "Sorry, I generated a portfolio suggestion, but had trouble formatting it correctly. Could you try asking again?", user_data
-    except ValueError as e:
-        logger.error(f"Validation Error for generated portfolio for user {user_id}: {e}\nRaw response:\n{response}")
-        return f"Sorry, I encountered an issue generating the portfolio suggestion ({e}). Please try again.", user_data
     except Exception as e:
         logger.error(f"Unexpected error in Portfolio agent for user {user_id}: {e}")
         return "Sorry, an unexpected error occurred while generating the portfolio suggestion.", user_data
\ No newline at end of file
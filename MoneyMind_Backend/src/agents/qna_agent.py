@@ -64,7 +64,7 @@ def run_qna_agent(user_input: str, user_data: dict) -> tuple[str, dict]:
     1.  Answer the question clearly, concisely, and accurately, focusing on the Indian context (e.g., Indian regulations, markets, financial products like PPF, NPS, specific banks).
     2.  If the question requires current information, specific data points, or details beyond general knowledge, use the 'google_search' tool. Formulate a good search query.
     3.  If the question asks for explanations or "how-to" guides, consider using the 'youtube_search' tool to find relevant videos. Formulate a good search query.
-    4.  Integrate the information found from tools smoothly into your answer. Cite the source or link if appropriate (e.g., "According to [Source Name], ..."). If providing video suggestions, list the title and link.
+    4.  Integrate the information found from tools smoothly into your answer. Cite the source or link if appropriate (e.g., "According to [Source Name], ..."). If providing video suggestions, list the title and link. Links in tool results are short ids like link1; write the id exactly as given and it will be replaced with the full URL.
     5.  Identify the main financial topic(s) discussed in the user's question (e.g., "Mutual Funds", "Stock Market", "Taxation", "Loans").
     6.  Be polite and conversational.
 
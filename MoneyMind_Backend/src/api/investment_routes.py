@@ -1,10 +1,18 @@
 # api/investment_routes.py
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from src.services.investment_service import InvestmentProductAI, InvestmentCriteria, ProductComparison
-from ..services.investment_assistant_service import InvestmentAssistant, UserQuery
+from config import settings
+from src.services.investment_service import (
+    InvestmentProductAI, InvestmentCriteria, ProductComparison, RecommendedProduct, ComparisonResult, ExplanationBatch
+)
+from ..services.investment_assistant_service import (
+    InvestmentAssistant, UserQuery, AnswerResponse, BenefitsResponse, ComparisonResponse
+)
+from ..services.serpapi_transport import serpapi_transport
+from ..core.http import json_bytes
 
 router = APIRouter(prefix="/api/investments", tags=["investments"])
 
@@ -12,6 +20,9 @@ router = APIRouter(prefix="/api/investments", tags=["investments"])
 investment_service = InvestmentProductAI()
 assistant_service = InvestmentAssistant()
 
+# Engines the app may query through the search proxy
+PROXY_ENGINES = {"google_finance", "google_shopping"}
+
 # Request/Response Models
 class InvestmentCriteriaRequest(BaseModel):
     categories: List[str] = Field(default=[])
@@ -21,11 +32,16 @@ class InvestmentCriteriaRequest(BaseModel):
     tax_free_growth: bool = Field(default=True)
     goal: Optional[str] = Field(default=None)
     user_id: Optional[str] = Field(default=None)
+    include_reasoning: bool = Field(default=True, description="False skips the model and returns scores only")
 
 class ProductIdRequest(BaseModel):
     product_id: str = Field(...)
     user_id: Optional[str] = Field(default=None)
 
+class ExplainBatchRequest(BaseModel):
+    product_ids: List[str] = Field(...)
+    user_id: Optional[str] = Field(default=None)
+
 class ComparisonRequest(BaseModel):
     product_ids: List[str] = Field(...)
     factors: List[str] = Field(default=["return", "risk", "fees", "liquidity", "tax_efficiency"])
@@ -37,8 +53,28 @@ class AssistantQueryRequest(BaseModel):
     user_id: Optional[str] = Field(default=None)
     conversation_history: Optional[List[Dict[str, str]]] = Field(default=None)
 
+class ExplanationResponse(BaseModel):
+    explanation: str
+
+# Search proxy for the app, so the SerpAPI key never ships to clients
+@router.get("/search", response_model=Dict[str, Any])
+async def search_investments(
+    engine: str = Query(..., description="google_finance or google_shopping"),
+    q: str = Query(..., description="Search query")
+):
+    """
+    Proxy a SerpAPI search through the shared pooled transport and result cache
+    """
+    if engine not in PROXY_ENGINES:
+        raise HTTPException(status_code=400, detail=f"Unsupported engine: {engine}")
+
+    results = await serpapi_transport.search({"engine": engine, "q": q})
+    if "error" in results and not results.get("search_metadata"):
+        raise HTTPException(status_code=502, detail=results["error"])
+    return results
+
 # Routes for investment products and recommendations
-@router.post("/recommend", response_model=List[Dict[str, Any]])
+@router.post("/recommend", response_model=List[RecommendedProduct])
 async def recommend_products(criteria: InvestmentCriteriaRequest):
     """
     Get personalized investment product recommendations based on user criteria
@@ -51,7 +87,21 @@ async def recommend_products(criteria: InvestmentCriteriaRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get recommendations: {str(e)}")
 
-@router.post("/products/explain", response_model=Dict[str, Any])
+@router.post("/recommend/stream")
+async def recommend_products_stream(criteria: InvestmentCriteriaRequest):
+    """
+    Stream ranked recommendations as newline-delimited JSON, one product per line, as
+    soon as the reasoning for each one has been generated
+    """
+    internal_criteria = InvestmentCriteria(**criteria.dict())
+
+    async def ndjson():
+        async for product in investment_service.stream_recommendations(internal_criteria):
+            yield json_bytes(product) + b"\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@router.post("/products/explain", response_model=ExplanationResponse)
 async def explain_product_benefits(request: ProductIdRequest):
     """
     Explain why a specific product might be beneficial for the user
@@ -61,11 +111,27 @@ async def explain_product_benefits(request: ProductIdRequest):
             product_id=request.product_id,
             user_id=request.user_id
         )
-        return {"explanation": explanation}
+        return ExplanationResponse(explanation=explanation)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to explain product benefits: {str(e)}")
 
-@router.post("/compare", response_model=Dict[str, Any])
+@router.post("/explain-batch", response_model=ExplanationBatch)
+async def explain_products_batch(request: ExplainBatchRequest):
+    """
+    Explain several products in one request, keyed by product id; ids that could
+    not be explained are listed in unavailable
+    """
+    if not request.product_ids:
+        raise HTTPException(status_code=400, detail="At least one product id is required")
+    if len(set(request.product_ids)) > settings.EXPLAIN_BATCH_MAX_PRODUCTS:
+        raise HTTPException(status_code=400,
+                            detail=f"At most {settings.EXPLAIN_BATCH_MAX_PRODUCTS} products can be explained at once")
+    try:
+        return await investment_service.explain_batch(request.product_ids, request.user_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to explain products: {str(e)}")
+
+@router.post("/compare", response_model=ComparisonResult)
 async def compare_products(comparison: ComparisonRequest):
     """
     Generate a detailed comparison between selected products
@@ -79,7 +145,7 @@ async def compare_products(comparison: ComparisonRequest):
         raise HTTPException(status_code=500, detail=f"Failed to compare products: {str(e)}")
 
 # Routes for investment assistant
-@router.post("/assistant/query", response_model=Dict[str, Any])
+@router.post("/assistant/query", response_model=AnswerResponse)
 async def query_assistant(query: AssistantQueryRequest):
     """
     Get investment advice from the AI assistant
@@ -97,7 +163,7 @@ async def query_assistant(query: AssistantQueryRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get answer: {str(e)}")
 
-@router.post("/assistant/explain-product", response_model=Dict[str, Any])
+@router.post("/assistant/explain-product", response_model=BenefitsResponse)
 async def explain_product_assistant(request: Dict[str, Any]):
     """
     Get AI assistant explanation of a product's benefits
@@ -114,7 +180,7 @@ async def explain_product_assistant(request: Dict[str, Any]):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to explain product: {str(e)}")
 
-@router.post("/assistant/compare-products", response_model=Dict[str, Any])
+@router.post("/assistant/compare-products", response_model=ComparisonResponse)
 async def compare_products_assistant(request: Dict[str, Any]):
     """
     Get AI assistant comparison of multiple products
@@ -1,8 +1,19 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+import asyncio
+import base64
+import binascii
 import json
 import logging
+from config import settings
 from ..services.news_service import NewsApiService
+from ..services.news_personalization import news_personalizer
+from ..services.news_sentiment import news_sentiment
+from ..data_manager.market_history import market_history
+from ..services.market_stream import market_stream
+from ..core.cache import StaleWhileRevalidateCache
+from ..core.schemas import NewsArticle, SentimentResult, MarketTrend, MarketHistory
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
@@ -10,52 +21,93 @@ logger = logging.getLogger(__name__)
 # Router object
 router = APIRouter(prefix="/api/news", tags=["news"])
 
-# Data models
-class NewsSource(BaseModel):
-    name: str
-    url: Optional[str] = None
-
-class NewsResponse(BaseModel):
-    title: str
-    url: Optional[str] = None
-    description: Optional[str] = None
-    source: Optional[Dict[str, Any]] = None
-    urlToImage: Optional[str] = None
-    publishedAt: Optional[str] = None
-    category: Optional[str] = None
+# Shared service and per-endpoint response caches keyed by (endpoint, country, language)
+news_service = NewsApiService()
+route_caches = {
+    endpoint: StaleWhileRevalidateCache(soft_ttl, settings.NEWS_ROUTE_HARD_TTL_SECONDS)
+    for endpoint, soft_ttl in settings.NEWS_ROUTE_SOFT_TTL_SECONDS.items()
+}
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _encode_cursor(after_id: str, offset: int) -> str:
+    raw = json.dumps({"after": after_id, "offset": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+        return {"after": str(position["after"]), "offset": int(position["offset"])}
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
+def _paginate(articles: list, limit: int, cursor: Optional[str], response: Response) -> list:
+    """
+    One page of a cached article list. The cursor names the last article id
+    returned, so pages stay aligned when a background refresh reorders the list;
+    the offset is only used if that article has dropped out. The cursor for the
+    next page, if any, is returned in the X-Next-Cursor header.
+    """
+    start = 0
+    if cursor:
+        position = _decode_cursor(cursor)
+        ids = [article.get("id") for article in articles]
+        start = ids.index(position["after"]) + 1 if position["after"] in ids else position["offset"]
+    page = articles[start:start + limit]
+    end = start + len(page)
+    if page and end < len(articles):
+        response.headers[NEXT_CURSOR_HEADER] = _encode_cursor(page[-1].get("id", ""), end)
+    return page
+
+# Data models
 class NewsRequest(BaseModel):
     query: str
     country: str = "in"
     language: str = "en"
     limit: int = 10
 
-@router.get("/trending", response_model=List[Dict[str, Any]])
+class PersonalizedNewsRequest(BaseModel):
+    user_id: Optional[str] = None
+    interests: List[str] = []
+    limit: int = 10
+
+class SentimentItem(BaseModel):
+    id: Optional[str] = None
+    text: Optional[str] = None
+
+class SentimentRequest(BaseModel):
+    articles: List[SentimentItem]
+
+@router.get("/trending", response_model=List[NewsArticle], response_model_exclude_none=True)
 async def get_trending_news(
+    response: Response,
     country: str = Query("in", description="Country code (e.g., 'in')"),
     language: str = Query("en", description="Language code (e.g., 'en')"),
-    limit: int = Query(10, description="Number of news items to return")
+    limit: int = Query(10, ge=1, le=100, description="Number of news items to return"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page")
 ):
     """Get trending financial news articles"""
     try:
-        news_service = NewsApiService()
-        news_json = news_service.get_specific_news("trending", country=country, language=language)
-        news_data = json.loads(news_json)
-        
-        if isinstance(news_data, dict) and "error" in news_data:
-            raise HTTPException(status_code=500, detail=news_data["error"])
-        
-        return news_data[:limit] if isinstance(news_data, list) else []
+        news_data = await route_caches["trending"].get(
+            ("trending", country, language),
+            lambda: news_service.get_specific_news("trending", country=country, language=language)
+        )
+        return _paginate(news_data, limit, cursor, response)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching trending news: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/category/{category}", response_model=List[Dict[str, Any]])
+@router.get("/category/{category}", response_model=List[NewsArticle], response_model_exclude_none=True)
 async def get_news_by_category(
     category: str,
+    response: Response,
     country: str = Query("in", description="Country code (e.g., 'in')"),
     language: str = Query("en", description="Language code (e.g., 'en')"),
-    limit: int = Query(10, description="Number of news items to return")
+    limit: int = Query(10, ge=1, le=100, description="Number of news items to return"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page")
 ):
     """
     Get news articles by category
@@ -63,50 +115,104 @@ async def get_news_by_category(
     Categories include: investments, market & economy, startups, business & fintech
     """
     try:
-        news_service = NewsApiService()
-        news_json = news_service.get_specific_news(category, country=country, language=language)
-        news_data = json.loads(news_json)
-        
-        if isinstance(news_data, dict) and "error" in news_data:
-            raise HTTPException(status_code=500, detail=news_data["error"])
-        
-        return news_data[:limit] if isinstance(news_data, list) else []
+        news_data = await route_caches["category"].get(
+            (f"category:{category.lower()}", country, language),
+            lambda: news_service.get_specific_news(category, country=country, language=language)
+        )
+        return _paginate(news_data, limit, cursor, response)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching news for category {category}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/search", response_model=List[Dict[str, Any]])
+@router.post("/search", response_model=List[NewsArticle], response_model_exclude_none=True)
 async def search_news(request: NewsRequest):
-    """Search for news articles based on query"""
+    """Search for news articles based on query, from the local index when possible"""
     try:
-        news_service = NewsApiService()
-        news_json = news_service.get_specific_news(
+        return await news_service.search_news(
             request.query, 
             country=request.country,
-            language=request.language
+            language=request.language,
+            limit=request.limit
         )
-        news_data = json.loads(news_json)
-        
-        if isinstance(news_data, dict) and "error" in news_data:
-            raise HTTPException(status_code=500, detail=news_data["error"])
-        
-        return news_data[:request.limit] if isinstance(news_data, list) else []
     except Exception as e:
         logger.error(f"Error searching news for query '{request.query}': {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/markets", response_model=List[Dict[str, Any]])
+@router.post("/personalized", response_model=List[NewsArticle], response_model_exclude_none=True)
+async def get_personalized_news(request: PersonalizedNewsRequest):
+    """
+    Rank already-fetched articles against the user's recorded news interests
+    (and any interests sent with the request)
+    """
+    try:
+        return await asyncio.to_thread(news_personalizer.rank_for_user, request.user_id,
+                                       request.interests, max(1, min(request.limit, 100)))
+    except Exception as e:
+        logger.error(f"Error ranking personalized news for user {request.user_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/sentiment", response_model=List[SentimentResult])
+async def get_news_sentiment(request: SentimentRequest):
+    """
+    Lexicon-based sentiment for a batch of articles, by stored article id or raw
+    text. Returns {id, sentiment, score, confidence} per item, in request order.
+    """
+    if len(request.articles) > settings.NEWS_SENTIMENT_MAX_BATCH:
+        raise HTTPException(status_code=400,
+                            detail=f"At most {settings.NEWS_SENTIMENT_MAX_BATCH} articles per request")
+    try:
+        items = [{"id": item.id, "text": item.text} for item in request.articles]
+        return await asyncio.to_thread(news_sentiment.score_items, items)
+    except Exception as e:
+        logger.error(f"Error scoring news sentiment: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/markets", response_model=List[MarketTrend])
 async def get_market_data():
     """Get market trend data from Google Finance"""
     try:
-        news_service = NewsApiService()
-        market_json = news_service.get_market_data()
-        market_data = json.loads(market_json)
-        
-        if isinstance(market_data, dict) and "error" in market_data:
-            raise HTTPException(status_code=500, detail=market_data["error"])
-        
-        return market_data
+        return await route_caches["markets"].get(("markets", "", ""), news_service.get_market_data)
     except Exception as e:
         logger.error(f"Error fetching market data: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/markets/history", response_model=MarketHistory)
+async def get_market_history(symbol: str = Query(..., description="Index symbol, e.g. NIFTY_50:INDEXNSE"),
+                             range: str = Query("1d", description="One of 1d, 5d, 1m, 3m, 6m, 1y, max")):
+    """Recorded quotes for one index over a range, downsampled for charts"""
+    if range not in settings.MARKET_HISTORY_RANGES:
+        raise HTTPException(status_code=400,
+                            detail=f"range must be one of {', '.join(settings.MARKET_HISTORY_RANGES)}")
+    history = await asyncio.to_thread(market_history.history, symbol, settings.MARKET_HISTORY_RANGES[range])
+    if history is None:
+        raise HTTPException(status_code=404, detail=f"No history recorded for '{symbol}'")
+    history["range"] = range
+    return history
+
+@router.get("/markets/stream")
+async def stream_market_data_sse():
+    """
+    Server-sent events: a 'snapshot' event with the full market_trends list, then
+    'diff' events with {seq, quotes: {stock: result}} for the quotes that changed
+    """
+    async def events():
+        async for event, data in market_stream.subscribe():
+            yield ": ping\n\n" if event == "ping" else f"event: {event}\ndata: {data}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.websocket("/markets/stream")
+async def stream_market_data_ws(websocket: WebSocket):
+    """Same frames as the SSE stream, as {"type": ..., "data": ...} text messages"""
+    await websocket.accept()
+    frames = market_stream.subscribe()
+    try:
+        async for event, data in frames:
+            await websocket.send_text(f'{{"type": "{event}", "data": {data or "null"}}}')
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await frames.aclose()
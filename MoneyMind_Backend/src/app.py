@@ -1,6 +1,8 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import RedirectResponse, JSONResponse
+import asyncio
 import logging
 import os
 from fastapi.staticfiles import StaticFiles
@@ -9,6 +11,33 @@ from src.models.community_models import Base
 from src.api.community_routes import router as community_router
 from src.api import news_routes  
 from src.api import investment_routes 
+from src.services.resilience import upstream_stats
+from src.services.gemini_service import gemini_service
+from src.services.serpapi_cache import serpapi_cache
+from src.services.serpapi_transport import serpapi_transport
+from src.services.serpapi_quota import serpapi_quota, PREFETCH
+from src.services.serpapi_service import serpapi_service
+from src.services.news_prefetcher import news_prefetcher
+from src.data_manager.article_store import article_store
+from src.services.markets_snapshot import markets_snapshot
+from src.data_manager.market_history import market_history
+from src.services.market_stream import market_stream
+from src.services.news_ingestion import news_ingestion
+from src.data_manager.instrument_catalog import instrument_catalog
+from src.services.product_details_cache import product_details_cache
+from src.core.http import ETagMiddleware
+from config import settings
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+try:
+    # Starlette versions that can leave streaming content types uncompressed
+    from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
+except ImportError:
+    DEFAULT_EXCLUDED_CONTENT_TYPES = None
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -28,8 +57,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# ETags are computed on the uncompressed body; compression wraps it
+app.add_middleware(ETagMiddleware)
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES,
+                       excluded_handlers=[r"^/api/news/markets/stream$", r"^/api/investments/recommend/stream$"])
+elif DEFAULT_EXCLUDED_CONTENT_TYPES is not None:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES,
+                       exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES + ("application/x-ndjson",))
+else:
+    # Older Starlette would gzip (and so buffer) the SSE/NDJSON streams too
+    logger.warning("Response compression disabled: this Starlette version cannot exclude streaming responses.")
+
 
 from src.api.chat_routes import process_chat
 from src.api.webhook_routes import process_whatsapp_webhook
@@ -76,11 +118,38 @@ async def api_redirect():
 async def health_check():
     return {"status": "OK"}
 
+@app.get("/api/health/upstreams")
+async def upstream_health():
+    return {
+        "upstreams": upstream_stats(),
+        "models": gemini_service.router.stats(),
+        "serpapi_transport": serpapi_transport.stats(),
+        "news_prefetch": news_prefetcher.stats(),
+        "article_store": article_store.stats(),
+        "markets_snapshot": markets_snapshot.stats(),
+        "market_history": market_history.stats(),
+        "market_stream": market_stream.stats(),
+        "news_ingestion": news_ingestion.stats(),
+        "instrument_catalog": instrument_catalog.stats(),
+        "caches": {
+            "serpapi": serpapi_cache.stats(),
+            "gemini_responses": gemini_service.response_cache.stats(),
+            "news_routes": {endpoint: cache.stats() for endpoint, cache in news_routes.route_caches.items()},
+            "product_details": product_details_cache.stats(),
+            "recommendations": investment_routes.investment_service.recommendation_cache.stats(),
+            "product_explanations": investment_routes.investment_service.explanation_cache.stats(),
+        },
+    }
+
+@app.get("/api/health/quota")
+async def quota_health():
+    return {"serpapi": serpapi_quota.stats()}
+
 # Error handler for 404 errors
 @app.exception_handler(404)
 async def custom_404_handler(request, exc):
-    return {
-        "detail": "Not Found",
+    return JSONResponse(status_code=404, content={
+        "detail": getattr(exc, "detail", "Not Found"),
         "available_endpoints": [
             "/",
             "/api/health",
@@ -90,7 +159,19 @@ async def custom_404_handler(request, exc):
             "/docs",
             "/redoc"
         ]
-    }
+    })
+
+@app.on_event("startup")
+async def start_background_jobs():
+    news_prefetcher.start(lambda topic: serpapi_service.get_news(topic, priority=PREFETCH))
+    news_ingestion.start()
+    await asyncio.to_thread(product_details_cache.warm, instrument_catalog.products())
+
+@app.on_event("shutdown")
+async def close_upstream_clients():
+    news_prefetcher.stop()
+    news_ingestion.stop()
+    await serpapi_transport.aclose()
 
 # Initialize database
 try:
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+def json_sizeof(value) -> int:
+    """Approximate in-memory footprint of a JSON-like value by its serialized size."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 1024
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL and hit/miss counters. Optionally
+    bounded by total size as well as entry count (max_bytes, measured by sizeof),
+    and able to keep expired entries for stale_seconds so get(allow_stale=True)
+    can still serve them.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 600.0,
+                 max_bytes: int | None = None, sizeof=json_sizeof, stale_seconds: float = 0.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.stale_seconds = stale_seconds
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def _evict(self, key):
+        entry = self._data.pop(key)
+        self._bytes -= entry[2]
+
+    def get(self, key, default=None, allow_stale: bool = False):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            now = time.monotonic()
+            if entry is not _MISSING and entry[0] < now:
+                if entry[0] + self.stale_seconds < now:
+                    self._evict(key)
+                    entry = _MISSING
+                elif allow_stale:
+                    self.stale_hits += 1
+                    return entry[1]
+                else:
+                    entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl_seconds: float | None = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        size = self.sizeof(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._evict(key)
+            self._data[key] = (time.monotonic() + ttl, value, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                self._evict(next(iter(self._data)))
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and entry[0] >= time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+        if self.max_bytes:
+            stats["bytes"] = self._bytes
+        if self.stale_seconds:
+            stats["stale_hits"] = self.stale_hits
+        return stats
+
+class SqliteCacheTier:
+    """
+    On-disk cache tier (JSON values with an absolute expiry) shared by every worker
+    process on the host through one SQLite file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, allow_stale: bool = False):
+        """
+        Returns (value, seconds_left) or None if missing/expired. With allow_stale,
+        expired rows not yet purged are returned too (seconds_left is then negative).
+        """
+        try:
+            row = self._connect().execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache read failed ({self.path}): {e}")
+            return None
+        if row is None or (row[1] < time.time() and not allow_stale):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0]), row[1] - time.time()
+
+    def set(self, key: str, value, ttl_seconds: float):
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, default=str), time.time() + ttl_seconds),
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache write failed ({self.path}): {e}")
+
+    def purge_expired(self, grace_seconds: float = 0.0):
+        try:
+            self._connect().execute("DELETE FROM cache WHERE expires_at < ?", (time.time() - grace_seconds,))
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache purge failed ({self.path}): {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0}
+
+class StaleWhileRevalidateCache:
+    """
+    Async cache for one event loop: entries younger than soft_ttl_seconds are served
+    as is, entries up to hard_ttl_seconds old are served immediately while a single
+    background refresh runs, and misses are loaded once however many callers wait.
+    Loader exceptions are never cached.
+    """
+
+    def __init__(self, soft_ttl_seconds: float, hard_ttl_seconds: float, max_entries: int = 256):
+        self.soft_ttl_seconds = soft_ttl_seconds
+        self.hard_ttl_seconds = hard_ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    async def get(self, key, loader):
+        """Returns the cached value for key, calling the coroutine function loader() to (re)load it."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[1]
+            if age < self.hard_ttl_seconds:
+                self._entries.move_to_end(key)
+                if age >= self.soft_ttl_seconds:
+                    self.stale_hits += 1
+                    self._refresh_in_background(key, loader)
+                else:
+                    self.hits += 1
+                return entry[0]
+        self.misses += 1
+        task = self._inflight.get(key) or self._start_load(key, loader)
+        return await asyncio.shield(task)
+
+    def _start_load(self, key, loader) -> asyncio.Task:
+        task = asyncio.ensure_future(self._load(key, loader))
+        self._inflight[key] = task
+        return task
+
+    async def _load(self, key, loader):
+        try:
+            value = await loader()
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def _refresh_in_background(self, key, loader):
+        if key in self._inflight:
+            return
+        self.refreshes += 1
+        task = self._start_load(key, loader)
+        task.add_done_callback(lambda t: self._on_refresh_done(key, t))
+
+    def _on_refresh_done(self, key, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            self.refresh_errors += 1
+            logger.warning(f"Background refresh failed for {key}, keeping stale value: {task.exception()}")
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+        }
@@ -0,0 +1,69 @@
+import hashlib
+import json
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def json_bytes(content) -> bytes:
+    """Compact JSON encoding for hand-built payloads (streams, frames); orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode()
+
+class ETagMiddleware:
+    """
+    Adds a weak ETag (hash of the body) to successful JSON GET responses and
+    answers a matching If-None-Match with an empty 304, so clients re-polling an
+    unchanged list skip the download. Streaming responses (SSE, NDJSON) have
+    other content types and pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match", "")
+        start = None
+        chunks = []
+
+        async def send_with_etag(message):
+            nonlocal start
+            if start is None and message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (message["status"] != 200 or "etag" in headers
+                        or not headers.get("content-type", "").startswith("application/json")):
+                    start = False
+                    await send(message)
+                else:
+                    start = message
+                return
+            if not start or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            headers = MutableHeaders(raw=start["headers"])
+            headers["ETag"] = etag
+            headers.setdefault("Cache-Control", "no-cache")
+            if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+                del headers["content-length"]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_etag)
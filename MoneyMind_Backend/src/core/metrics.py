@@ -0,0 +1,54 @@
+import threading
+import time
+from collections import deque
+
+class LatencyWindow:
+    """Rolling window of call latencies and outcomes, bounded by count and age."""
+
+    def __init__(self, max_samples: int = 100, max_age_seconds: float = 300.0):
+        self.max_age_seconds = max_age_seconds
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def record(self, latency_seconds: float, ok: bool = True):
+        """Records one call's latency and whether it succeeded."""
+        with self._lock:
+            self._samples.append((time.monotonic(), latency_seconds, ok))
+
+    def _recent(self) -> list:
+        cutoff = time.monotonic() - self.max_age_seconds
+        with self._lock:
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+            return list(self._samples)
+
+    def count(self) -> int:
+        return len(self._recent())
+
+    def percentile(self, pct: float) -> float | None:
+        """Returns the given latency percentile (0-100) or None without samples."""
+        latencies = sorted(s[1] for s in self._recent())
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, max(0, int(round(pct / 100.0 * len(latencies))) - 1))
+        return latencies[index]
+
+    def p95(self) -> float | None:
+        return self.percentile(95)
+
+    def error_rate(self) -> float:
+        samples = self._recent()
+        if not samples:
+            return 0.0
+        return sum(1 for s in samples if not s[2]) / len(samples)
+
+    def snapshot(self) -> dict:
+        """Summary suitable for logging or a health endpoint."""
+        p50 = self.percentile(50)
+        p95 = self.p95()
+        return {
+            "samples": self.count(),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": round(self.error_rate(), 3),
+        }
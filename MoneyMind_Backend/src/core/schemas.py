@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Any, List
 
 
 class NewsSource(BaseModel):
@@ -23,4 +23,54 @@ class NewsRequest(BaseModel):
     query: str
     country: str = "in"
     language: str = "en"
-    limit: int = 10
\ No newline at end of file
+    limit: int = 10
+
+
+class NewsArticle(NewsResponse):
+    """Schema for a stored news article, as returned by the news endpoints"""
+    id: Optional[str] = None
+    score: Optional[float] = None
+
+class SentimentResult(BaseModel):
+    """Schema for one article's lexicon sentiment"""
+    id: Optional[str] = None
+    sentiment: str
+    score: float
+    confidence: float
+
+class PriceMovement(BaseModel):
+    movement: Optional[str] = None
+    value: Optional[float] = None
+    percentage: Optional[float] = None
+
+class MarketQuote(BaseModel):
+    """Schema for one quote in a Google Finance market trend (extra SerpApi fields are kept)"""
+    stock: Optional[str] = None
+    name: Optional[str] = None
+    price: Optional[Any] = None
+    price_movement: Optional[PriceMovement] = None
+
+    class Config:
+        extra = "allow"
+
+class MarketTrend(BaseModel):
+    """Schema for a Google Finance market trend section"""
+    title: Optional[str] = None
+    results: List[MarketQuote] = Field(default=[])
+
+    class Config:
+        extra = "allow"
+
+class MarketHistoryPoint(BaseModel):
+    t: float
+    price: float
+    change_pct: float
+
+class MarketHistory(BaseModel):
+    """Schema for a downsampled index price history"""
+    symbol: str
+    name: str
+    range: str
+    points: List[MarketHistoryPoint]
+    change: Optional[float] = None
+    change_pct: Optional[float] = None
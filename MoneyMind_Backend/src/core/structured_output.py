@@ -0,0 +1,299 @@
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+_FENCED_JSON = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+_PARTIAL_LITERAL = re.compile(r"(?<=[\s:\[,])(?:t|tr|tru|f|fa|fal|fals|n|nu|nul)$")
+
+class StructuredOutputError(ValueError):
+    """Raised when a model response cannot be parsed or validated against its schema."""
+
+def extract_json(text: str, expected: type = dict):
+    """
+    Extracts the JSON object (expected=dict) or array (expected=list) embedded in a
+    model response, tolerating ```json fences and surrounding prose.
+    Raises ValueError if no JSON of the expected type can be parsed.
+    """
+    if not text:
+        raise ValueError("Empty response")
+
+    fenced = _FENCED_JSON.search(text)
+    candidate = fenced.group(1) if fenced else text
+
+    open_char, close_char = ("[", "]") if expected is list else ("{", "}")
+    start = candidate.find(open_char)
+    end = candidate.rfind(close_char) + 1
+    if start < 0 or end <= start:
+        raise ValueError(f"No JSON {expected.__name__} found in response")
+
+    parsed = json.loads(candidate[start:end])
+    if not isinstance(parsed, expected):
+        raise ValueError(f"Expected JSON {expected.__name__}, got {type(parsed).__name__}")
+    return parsed
+
+# --- Local repair of damaged JSON ---
+
+def _string_start(text: str) -> int:
+    """Index of the opening quote of the string that ends at the last character of text."""
+    i = len(text) - 2
+    while i >= 0:
+        if text[i] == '"':
+            backslashes = 0
+            j = i - 1
+            while j >= 0 and text[j] == '\\':
+                backslashes += 1
+                j -= 1
+            if backslashes % 2 == 0:
+                return i
+        i -= 1
+    return 0
+
+def _trim_dangling(text: str, stack: list) -> str:
+    """Drops trailing commas, dangling keys and half-written literals left by truncation."""
+    while True:
+        text = text.rstrip()
+        if text.endswith(","):
+            text = text[:-1]
+            continue
+        if text.endswith(":"):
+            text = text[:-1].rstrip()
+            if text.endswith('"'):
+                text = text[:_string_start(text)]
+            continue
+        literal = _PARTIAL_LITERAL.search(text)
+        if literal:
+            text = text[:literal.start()]
+            continue
+        if text and text[-1] in ".-+eE" and re.search(r"[\d.][eE+\-.]*$", text) and not text.endswith('"'):
+            text = text[:-1]
+            continue
+        if stack and stack[-1] == "}" and text.endswith('"'):
+            before = text[:_string_start(text)].rstrip()
+            if before.endswith("{") or before.endswith(","):
+                # A key with no value yet
+                text = before
+                continue
+        return text
+
+def repair_json(text: str) -> str:
+    """
+    Best-effort local repair of model JSON: strips fences and prose, removes
+    trailing commas, and closes strings/brackets cut off by truncation.
+    """
+    if not text:
+        return text
+    fenced = _FENCED_JSON.search(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return text
+    text = text[min(starts):]
+
+    out = []
+    stack = []
+    in_string = False
+    escape = False
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+        elif ch in "}]":
+            if not stack or stack[-1] != ch:
+                continue
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                break
+        else:
+            out.append(ch)
+
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    repaired = _trim_dangling("".join(out), stack)
+    return repaired + "".join(reversed(stack))
+
+# --- Pydantic schema helpers ---
+
+def validate_model(schema, data):
+    """Validates data against a Pydantic model (v1 or v2)."""
+    if hasattr(schema, "model_validate"):
+        return schema.model_validate(data)
+    return schema.parse_obj(data)
+
+def model_to_dict(instance) -> dict:
+    if hasattr(instance, "model_dump"):
+        return instance.model_dump(by_alias=True)
+    return instance.dict(by_alias=True)
+
+class _UnsupportedSchema(Exception):
+    pass
+
+def _convert_schema(node: dict, defs: dict) -> dict:
+    if "$ref" in node:
+        return _convert_schema(defs[node["$ref"].split("/")[-1]], defs)
+    if "allOf" in node and len(node["allOf"]) == 1:
+        return _convert_schema(node["allOf"][0], defs)
+    if "anyOf" in node:
+        options = [option for option in node["anyOf"] if option.get("type") != "null"]
+        if len(options) != 1:
+            raise _UnsupportedSchema("Unions are not supported")
+        converted = _convert_schema(options[0], defs)
+        converted["nullable"] = True
+        return converted
+
+    converted = {}
+    if node.get("description"):
+        converted["description"] = node["description"]
+    if "enum" in node:
+        converted.update({"type": "string", "enum": [str(value) for value in node["enum"]]})
+        return converted
+
+    node_type = node.get("type")
+    if node_type == "object":
+        properties = node.get("properties")
+        if not properties:
+            raise _UnsupportedSchema("Free-form objects are not supported")
+        converted["type"] = "object"
+        converted["properties"] = {name: _convert_schema(value, defs) for name, value in properties.items()}
+        if node.get("required"):
+            converted["required"] = list(node["required"])
+    elif node_type == "array":
+        if not node.get("items"):
+            raise _UnsupportedSchema("Arrays need an item type")
+        converted["type"] = "array"
+        converted["items"] = _convert_schema(node["items"], defs)
+    elif node_type in ("string", "integer", "number", "boolean"):
+        converted["type"] = node_type
+    else:
+        raise _UnsupportedSchema(f"Unsupported type: {node_type}")
+    return converted
+
+def to_gemini_schema(schema, many: bool = False) -> dict | None:
+    """
+    Converts a Pydantic model into Gemini's response_schema subset (OpenAPI-style).
+    Returns None when the model uses constructs Gemini cannot express (e.g. free-form
+    dicts), in which case callers should fall back to plain JSON mode.
+    """
+    raw = schema.model_json_schema() if hasattr(schema, "model_json_schema") else schema.schema()
+    defs = raw.get("$defs") or raw.get("definitions") or {}
+    try:
+        converted = _convert_schema(raw, defs)
+    except _UnsupportedSchema as e:
+        logger.debug(f"Schema {schema.__name__} not expressible as Gemini response_schema: {e}")
+        return None
+    return {"type": "array", "items": converted} if many else converted
+
+def parse_structured(text: str, schema=None, many: bool = False):
+    """
+    Parses a model response into JSON, repairing it locally if needed, and validates
+    it against schema (a Pydantic model). With many=True the response is a list and
+    invalid items are dropped. Raises StructuredOutputError if nothing usable remains.
+    """
+    expected = list if many else dict
+    try:
+        data = extract_json(text, expected)
+    except ValueError:
+        try:
+            data = json.loads(repair_json(text))
+        except ValueError as e:
+            raise StructuredOutputError(f"Response is not valid JSON: {e}") from e
+        if not isinstance(data, expected):
+            raise StructuredOutputError(f"Expected JSON {expected.__name__}, got {type(data).__name__}")
+        logger.info("Model JSON repaired locally.")
+
+    if schema is None:
+        return data
+    if not many:
+        try:
+            return validate_model(schema, data)
+        except ValueError as e:
+            raise StructuredOutputError(f"Response failed {schema.__name__} validation: {e}") from e
+
+    items = []
+    for item in data:
+        try:
+            items.append(validate_model(schema, item))
+        except ValueError as e:
+            logger.warning(f"Dropping item that failed {schema.__name__} validation: {e}")
+    if data and not items:
+        raise StructuredOutputError(f"No items passed {schema.__name__} validation")
+    return items
+
+class IncrementalJsonParser:
+    """
+    Parses a streamed JSON response as it arrives. feed() returns the elements of a
+    top-level array (objects or arrays) as soon as each one is complete; partial()
+    returns a repaired snapshot of the whole document so far.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._root = None
+        self._in_string = False
+        self._escape = False
+        self._item_start = None
+
+    def feed(self, chunk: str) -> list:
+        self.buffer += chunk
+        completed = []
+        while self._pos < len(self.buffer):
+            ch = self.buffer[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"' and self._root is not None:
+                self._in_string = True
+            elif ch in "{[":
+                if self._root is None:
+                    self._root = ch
+                self._depth += 1
+                if self._root == "[" and self._depth == 2:
+                    self._item_start = self._pos
+            elif ch in "}]" and self._root is not None:
+                if self._root == "[" and self._depth == 2 and self._item_start is not None:
+                    fragment = self.buffer[self._item_start:self._pos + 1]
+                    try:
+                        completed.append(json.loads(fragment))
+                    except ValueError:
+                        try:
+                            completed.append(json.loads(repair_json(fragment)))
+                        except ValueError:
+                            logger.warning(f"Skipping unparseable streamed item: {fragment[:100]}")
+                    self._item_start = None
+                self._depth -= 1
+            self._pos += 1
+        return completed
+
+    def partial(self):
+        """Best-effort parse of everything received so far, or None."""
+        try:
+            return json.loads(repair_json(self.buffer))
+        except ValueError:
+            return None
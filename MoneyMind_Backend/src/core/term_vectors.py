@@ -0,0 +1,46 @@
+import re
+import zlib
+
+import numpy as np
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9&']*")
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "at", "by", "with", "from", "as", "is", "are",
+    "was", "were", "be", "been", "it", "its", "this", "that", "these", "those", "after", "before", "over", "into",
+    "about", "news", "latest", "today", "says", "said", "will", "what", "how", "why", "new", "s",
+}
+
+def tokenize(text: str, bigrams: bool = True) -> list:
+    """Lowercased content words of text, plus adjacent-word bigrams (e.g. 'repo rate')."""
+    words = [word for word in _WORD.findall((text or "").lower()) if word not in STOPWORDS]
+    if bigrams:
+        words += [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return words
+
+def hashed_indices(terms: list, dim: int) -> np.ndarray:
+    """Column of each term in a hashed feature space of size dim (stable across processes)."""
+    return np.fromiter((zlib.crc32(term.encode()) % dim for term in terms), dtype=np.int64, count=len(terms))
+
+class SparseTermMatrix:
+    """
+    Document x term matrix in coordinate form, built from each document's column
+    indices (and optional per-entry values). dot() multiplies it by a dense term
+    vector with one gather and one bincount, so scoring thousands of documents
+    against a vector costs a few vectorized passes.
+    """
+
+    def __init__(self, doc_columns: list, doc_values: list | None = None):
+        self.n_docs = len(doc_columns)
+        self.lengths = np.fromiter((len(columns) for columns in doc_columns), dtype=np.int64, count=self.n_docs)
+        self.rows = np.repeat(np.arange(self.n_docs), self.lengths)
+        self.cols = np.concatenate(doc_columns) if self.n_docs else np.empty(0, dtype=np.int64)
+        self.values = None
+        if doc_values is not None:
+            self.values = np.concatenate(doc_values) if self.n_docs else np.empty(0)
+
+    def dot(self, vector: np.ndarray) -> np.ndarray:
+        weights = vector[self.cols]
+        if self.values is not None:
+            weights = weights * self.values
+        return np.bincount(self.rows, weights=weights, minlength=self.n_docs)
@@ -0,0 +1,356 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_TRACKING_PARAMS = {"gclid", "fbclid", "ocid", "cmpid", "ref", "ref_src", "src", "mc_cid", "mc_eid", "ito", "guccounter"}
+# Trailing " - Source" / " | Source" publishers append to syndicated headlines
+_SOURCE_SUFFIX = re.compile(r"\s+[-|\u2013\u2014]\s+[^-|\u2013\u2014]{1,40}$")
+_SIMHASH_BANDS = 4
+_BAND_BITS = 64 // _SIMHASH_BANDS
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalizes an article URL so the same story from different links maps to one
+    key: lowercased host without www./m., no fragment, tracking params or AMP suffix.
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    for prefix in ("www.", "m.", "amp."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    path = re.sub(r"/(amp|amp\.html)/?$", "", parts.path) or "/"
+    if path != "/":
+        path = path.rstrip("/")
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS)
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme, host, path, urlencode(query), ""))
+
+def _tokens(text: str) -> list:
+    return re.findall(r"[a-z0-9]+", _SOURCE_SUFFIX.sub("", text or "").lower())
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of a headline over word unigrams and bigrams."""
+    tokens = _tokens(text)
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+    weights = [0] * 64
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+def _to_signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+def _bands(value: int) -> list:
+    mask = (1 << _BAND_BITS) - 1
+    return [(value >> (band * _BAND_BITS)) & mask for band in range(_SIMHASH_BANDS)]
+
+def _source_name(source) -> str:
+    while isinstance(source, dict):
+        source = source.get("name")
+    return str(source) if source else ""
+
+def article_id_for(canonical_url: str, title: str = "") -> str:
+    """Stable article id derived from the canonical URL (or the headline if there is no URL)."""
+    return hashlib.sha1((canonical_url or title.lower()).encode()).hexdigest()[:16]
+
+class ArticleStore:
+    """
+    Persistent SQLite store of every news article fetched. Articles are keyed by
+    canonical URL and near-duplicate headlines (SimHash within
+    ARTICLE_SIMHASH_MAX_DISTANCE bits) are folded into the first copy seen, so
+    each story has one stable id however many sources or endpoints return it.
+    """
+
+    def __init__(self, path: str = settings.ARTICLE_STORE_PATH,
+                 max_distance: int = settings.ARTICLE_SIMHASH_MAX_DISTANCE):
+        self.path = path
+        self.max_distance = max_distance
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id TEXT PRIMARY KEY,
+                canonical_url TEXT,
+                url TEXT,
+                title TEXT NOT NULL,
+                description TEXT,
+                image TEXT,
+                source TEXT,
+                published_at TEXT,
+                category TEXT,
+                simhash INTEGER NOT NULL,
+                band0 INTEGER, band1 INTEGER, band2 INTEGER, band3 INTEGER,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                seen_count INTEGER NOT NULL DEFAULT 1
+            );
+            CREATE TABLE IF NOT EXISTS article_urls (
+                canonical_url TEXT PRIMARY KEY,
+                article_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_band0 ON articles(band0);
+            CREATE INDEX IF NOT EXISTS idx_articles_band1 ON articles(band1);
+            CREATE INDEX IF NOT EXISTS idx_articles_band2 ON articles(band2);
+            CREATE INDEX IF NOT EXISTS idx_articles_band3 ON articles(band3);
+            CREATE INDEX IF NOT EXISTS idx_articles_category_seen ON articles(category, last_seen);
+        """)
+        self._add_missing_columns(conn)
+        self.fts_enabled = self._create_fts_index(conn)
+        self.ingested = 0
+        self.duplicates = 0
+
+    @staticmethod
+    def _add_missing_columns(conn):
+        """Columns added after the table was first created."""
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(articles)")}
+        for column, definition in (("sentiment", "REAL"), ("sentiment_version", "INTEGER")):
+            if column not in existing:
+                conn.execute(f"ALTER TABLE articles ADD COLUMN {column} {definition}")
+
+    @staticmethod
+    def _create_fts_index(conn) -> bool:
+        """Full-text index over headlines and descriptions, kept in sync by triggers."""
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'").fetchone()
+        try:
+            conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                    title, description, content='articles', content_rowid='rowid', tokenize='porter unicode61'
+                );
+                CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+                    INSERT INTO articles_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, description ON articles BEGIN
+                    INSERT INTO articles_fts(articles_fts, rowid, title, description)
+                        VALUES ('delete', old.rowid, old.title, old.description);
+                    INSERT INTO articles_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+                    INSERT INTO articles_fts(articles_fts, rowid, title, description)
+                        VALUES ('delete', old.rowid, old.title, old.description);
+                END;
+            """)
+            if not exists:
+                # Index articles stored before the index existed
+                conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite FTS5 unavailable, local article search disabled: {e}")
+            return False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    # --- Matching ---
+
+    def _find_by_url(self, conn, canonical_url: str):
+        if not canonical_url:
+            return None
+        row = conn.execute("SELECT article_id FROM article_urls WHERE canonical_url = ?", (canonical_url,)).fetchone()
+        return row["article_id"] if row else None
+
+    def _find_near_duplicate(self, conn, fingerprint: int):
+        """Any stored headline within max_distance bits; with 4 bands and a distance
+        of 3 or less, at least one band must match exactly."""
+        bands = _bands(fingerprint)
+        rows = conn.execute(
+            "SELECT id, simhash FROM articles WHERE band0 = ? OR band1 = ? OR band2 = ? OR band3 = ?", bands
+        ).fetchall()
+        for row in rows:
+            if bin((row["simhash"] & ((1 << 64) - 1)) ^ fingerprint).count("1") <= self.max_distance:
+                return row["id"]
+        return None
+
+    # --- Ingestion ---
+
+    def ingest(self, articles: list) -> list:
+        """
+        Stores articles (news route format: title, description, url, urlToImage,
+        publishedAt, source{name}, category) and returns them deduplicated, in order,
+        as stored copies with their stable "id".
+        """
+        seen_ids = []
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for article in articles:
+                    title = (article.get("title") or "").strip()
+                    if not title:
+                        continue
+                    article_id = self._ingest_one(conn, article, title, now)
+                    if article_id not in seen_ids:
+                        seen_ids.append(article_id)
+                conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                conn.execute("ROLLBACK")
+                logger.error(f"Article store ingest failed: {e}")
+                return articles
+        self.ingested += len(articles)
+        return self.get_many(seen_ids)
+
+    def _ingest_one(self, conn, article: dict, title: str, now: float) -> str:
+        canonical_url = canonicalize_url(article.get("url", ""))
+        fingerprint = simhash(title)
+        article_id = self._find_by_url(conn, canonical_url) or self._find_near_duplicate(conn, fingerprint)
+        if article_id:
+            self.duplicates += 1
+            conn.execute(
+                """UPDATE articles SET last_seen = ?, seen_count = seen_count + 1,
+                       sentiment = CASE WHEN COALESCE(description, '') = '' AND ? != '' THEN NULL ELSE sentiment END,
+                       description = COALESCE(NULLIF(description, ''), ?),
+                       image = COALESCE(NULLIF(image, ''), ?)
+                   WHERE id = ?""",
+                (now, article.get("description") or "", article.get("description", ""),
+                 article.get("urlToImage", ""), article_id),
+            )
+        else:
+            article_id = article_id_for(canonical_url, title)
+            conn.execute(
+                f"""INSERT OR IGNORE INTO articles
+                    (id, canonical_url, url, title, description, image, source, published_at, category,
+                     simhash, band0, band1, band2, band3, first_seen, last_seen, seen_count)
+                    VALUES ({", ".join("?" * 17)})""",
+                (article_id, canonical_url, article.get("url", ""), title, article.get("description", ""),
+                 article.get("urlToImage", ""), _source_name(article.get("source")),
+                 article.get("publishedAt", ""), article.get("category", ""), _to_signed(fingerprint),
+                 *_bands(fingerprint), now, now, 1),
+            )
+        if canonical_url:
+            conn.execute("INSERT OR IGNORE INTO article_urls (canonical_url, article_id) VALUES (?, ?)",
+                         (canonical_url, article_id))
+        return article_id
+
+    # --- Reads ---
+
+    @staticmethod
+    def _to_article(row) -> dict:
+        return {
+            "id": row["id"],
+            "title": row["title"],
+            "description": row["description"] or "",
+            "url": row["url"] or "",
+            "urlToImage": row["image"] or "",
+            "publishedAt": row["published_at"] or "",
+            "source": {"name": row["source"] or "Unknown Source"},
+            "category": row["category"] or "",
+        }
+
+    def get_many(self, article_ids: list) -> list:
+        if not article_ids:
+            return []
+        rows = self._connect().execute(
+            f"SELECT * FROM articles WHERE id IN ({', '.join('?' * len(article_ids))})", article_ids
+        ).fetchall()
+        by_id = {row["id"]: self._to_article(row) for row in rows}
+        return [by_id[article_id] for article_id in article_ids if article_id in by_id]
+
+    def get(self, article_id: str):
+        articles = self.get_many([article_id])
+        return articles[0] if articles else None
+
+    def recent(self, category: str | None = None, limit: int = 20, max_age_seconds: float | None = None) -> list:
+        """Most recently seen articles, optionally for one category, e.g. when upstream is unavailable."""
+        clauses, params = [], []
+        if category:
+            clauses.append("category = ? COLLATE NOCASE")
+            params.append(category)
+        if max_age_seconds:
+            clauses.append("last_seen >= ?")
+            params.append(time.time() - max_age_seconds)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(
+            f"SELECT * FROM articles {where} ORDER BY last_seen DESC, first_seen DESC LIMIT ?", (*params, limit)
+        ).fetchall()
+        return [self._to_article(row) for row in rows]
+
+    def candidates(self, limit: int = 2000, max_age_seconds: float | None = None) -> list:
+        """(article, last_seen epoch seconds) pairs for the most recently seen articles, for ranking."""
+        params = []
+        where = ""
+        if max_age_seconds:
+            where = "WHERE last_seen >= ?"
+            params.append(time.time() - max_age_seconds)
+        rows = self._connect().execute(
+            f"SELECT * FROM articles {where} ORDER BY last_seen DESC LIMIT ?", (*params, limit)
+        ).fetchall()
+        return [(self._to_article(row), row["last_seen"]) for row in rows]
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        """All query words must match; the last one as a prefix (search-as-you-type)."""
+        words = _tokens(query)
+        if not words:
+            return ""
+        terms = [f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*']
+        return " ".join(terms)
+
+    def search(self, query: str, limit: int = 10, max_age_seconds: float | None = None) -> list:
+        """BM25-ranked full-text search (headline weighted over description) of stored articles."""
+        expression = self._match_expression(query)
+        if not self.fts_enabled or not expression:
+            return []
+        params = [expression]
+        age_clause = ""
+        if max_age_seconds:
+            age_clause = "AND a.last_seen >= ?"
+            params.append(time.time() - max_age_seconds)
+        try:
+            rows = self._connect().execute(
+                f"""SELECT a.* FROM articles_fts JOIN articles a ON a.rowid = articles_fts.rowid
+                    WHERE articles_fts MATCH ? {age_clause}
+                    ORDER BY bm25(articles_fts, 5.0, 1.0), a.last_seen DESC LIMIT ?""",
+                (*params, limit),
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Article search failed for '{query}': {e}")
+            return []
+        return [self._to_article(row) for row in rows]
+
+    # --- Sentiment ---
+
+    def get_sentiments(self, article_ids: list, version: int) -> dict:
+        """Cached sentiment scores by article id, for articles scored with this lexicon version."""
+        if not article_ids:
+            return {}
+        rows = self._connect().execute(
+            f"""SELECT id, sentiment FROM articles
+                WHERE id IN ({', '.join('?' * len(article_ids))}) AND sentiment IS NOT NULL AND sentiment_version = ?""",
+            (*article_ids, version),
+        ).fetchall()
+        return {row["id"]: row["sentiment"] for row in rows}
+
+    def set_sentiments(self, scores: dict, version: int):
+        with self._lock:
+            self._connect().executemany("UPDATE articles SET sentiment = ?, sentiment_version = ? WHERE id = ?",
+                                        [(score, version, article_id) for article_id, score in scores.items()])
+
+    def stats(self) -> dict:
+        count = self._connect().execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        return {"articles": count, "ingested": self.ingested, "duplicates": self.duplicates}
+
+article_store = ArticleStore()
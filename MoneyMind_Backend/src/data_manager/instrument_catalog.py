@@ -0,0 +1,157 @@
+import csv
+import logging
+import re
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+RISK_LEVELS = ("Low", "Moderate", "High")
+# App time horizons and the years each one covers
+HORIZON_YEARS = {"1 year": 1, "2-3 years": 3, "5+ years": 5}
+
+def horizon_years(time_horizon: str) -> int:
+    """Years covered by an app horizon ('1 year', '2-3 years', '5+ years'), or the largest number in free text."""
+    if time_horizon in HORIZON_YEARS:
+        return HORIZON_YEARS[time_horizon]
+    numbers = [int(n) for n in re.findall(r"\d+", time_horizon or "")]
+    return max(numbers) if numbers else HORIZON_YEARS["2-3 years"]
+
+def _horizon_label(years: int) -> str:
+    if years <= 1:
+        return "1 year"
+    return "2-3 years" if years <= 3 else "5+ years"
+
+def _format_inr(amount: float) -> str:
+    return f"₹{amount:,.0f}"
+
+class InstrumentCatalog:
+    """
+    Local catalog of Indian instruments (mutual fund schemes, ETFs, SGBs, bonds,
+    small savings schemes, FDs) loaded once from a bulk CSV. Display attributes
+    are precomputed at load and ids are indexed by category, risk and horizon,
+    so finding candidates for a recommendation is a few set intersections.
+    """
+
+    def __init__(self, path: str = settings.INSTRUMENT_CATALOG_PATH):
+        self.path = path
+        self._products = {}
+        self._by_category = {}
+        self._by_risk = {risk: set() for risk in RISK_LEVELS}
+        self._by_horizon = {years: set() for years in HORIZON_YEARS.values()}
+        self._tax_advantaged = set()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+        except IOError as e:
+            logger.error(f"Instrument catalog not loaded from {self.path}: {e}")
+            return
+        for row in rows:
+            try:
+                self._add(row)
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Skipping catalog row {row.get('id')}: {e}")
+        logger.info(f"Instrument catalog loaded: {len(self._products)} instruments.")
+
+    def _add(self, row: dict):
+        risk = row["risk"].strip().title()
+        if risk not in RISK_LEVELS:
+            raise ValueError(f"unknown risk level '{row['risk']}'")
+        min_years = int(row["min_horizon_years"])
+        lock_in = int(row["lock_in_years"] or 0)
+        product = {
+            "id": row["id"],
+            "name": row["name"],
+            "type": row["category"],
+            "issuer": row["issuer"],
+            "return": f"{float(row['expected_return_pct']):.1f}%",
+            "risk": risk,
+            "timeHorizon": _horizon_label(max(min_years, 1)),
+            "expenseRatio": f"{float(row['expense_ratio_pct']):.2f}%",
+            "minInvestment": _format_inr(float(row["min_investment_inr"])),
+            "taxAdvantaged": row["tax_advantaged"].strip().lower() == "true",
+            "lockIn": f"{lock_in} years" if lock_in else "None",
+            "liquidity": row["liquidity"],
+            "description": row["description"],
+            # Numeric copies for ranking
+            "expected_return_pct": float(row["expected_return_pct"]),
+            "expense_ratio_pct": float(row["expense_ratio_pct"]),
+            "min_investment_inr": float(row["min_investment_inr"]),
+            "min_horizon_years": min_years,
+            "lock_in_years": lock_in,
+        }
+        product_id = product["id"]
+        self._products[product_id] = product
+        self._by_category.setdefault(product["type"].lower(), set()).add(product_id)
+        self._by_risk[risk].add(product_id)
+        for years, ids in self._by_horizon.items():
+            if min_years <= years:
+                ids.add(product_id)
+        if product["taxAdvantaged"]:
+            self._tax_advantaged.add(product_id)
+
+    def _risk_ids(self, risk_tolerance: str) -> set:
+        """Instruments at or below a risk tolerance."""
+        tolerance = (risk_tolerance or "").strip().title()
+        allowed = RISK_LEVELS[:RISK_LEVELS.index(tolerance) + 1] if tolerance in RISK_LEVELS else RISK_LEVELS
+        return set().union(*(self._by_risk[risk] for risk in allowed))
+
+    def _horizon_ids(self, time_horizon: str) -> set:
+        years = horizon_years(time_horizon)
+        fitting = [bucket for bucket in sorted(self._by_horizon) if bucket <= years]
+        return self._by_horizon[fitting[-1] if fitting else min(self._by_horizon)]
+
+    def search(self, categories: list, risk_tolerance: str, time_horizon: str,
+               tax_free_growth: bool = False, limit: int = settings.INSTRUMENT_CANDIDATE_LIMIT) -> list:
+        """
+        Instruments in the categories (all if none) that fit the horizon, best
+        first. Risk tolerance is a hard ceiling: if too few fit, the horizon
+        filter is relaxed first, then in-tolerance instruments from other
+        categories are added after the requested ones. Returns fewer than limit
+        rather than anything riskier than tolerated.
+        """
+        pool = set()
+        if categories:
+            pool = set().union(*(self._by_category.get(category.lower(), set()) for category in categories))
+        if not pool:
+            pool = set(self._products)
+        risk_ids = self._risk_ids(risk_tolerance)
+        horizon_ids = self._horizon_ids(time_horizon)
+        matches = pool & risk_ids & horizon_ids
+        if len(matches) < limit:
+            matches |= pool & risk_ids
+        if len(matches) < limit:
+            matches |= risk_ids & horizon_ids
+        if len(matches) < limit:
+            matches |= risk_ids
+
+        def rank(product_id):
+            product = self._products[product_id]
+            return (
+                product_id not in pool,
+                product_id not in horizon_ids,
+                tax_free_growth and product_id not in self._tax_advantaged,
+                -product["expected_return_pct"],
+                product["expense_ratio_pct"],
+            )
+
+        return [dict(self._products[product_id]) for product_id in sorted(matches, key=rank)[:limit]]
+
+    def get(self, product_id: str):
+        product = self._products.get(product_id)
+        return dict(product) if product else None
+
+    def products(self) -> list:
+        return [dict(product) for product in self._products.values()]
+
+    def categories(self) -> list:
+        return sorted({product["type"] for product in self._products.values()})
+
+    def stats(self) -> dict:
+        return {"instruments": len(self._products),
+                "categories": {category: len(ids) for category, ids in self._by_category.items()}}
+
+instrument_catalog = InstrumentCatalog()
@@ -17,6 +17,10 @@ class JsonManager:
         safe_user_id = "".join(c for c in user_id if c.isalnum() or c in ('_', '-'))
         return os.path.join(self.data_dir, f"user_{safe_user_id}_data.json")
 
+    def user_exists(self, user_id: str) -> bool:
+        """Checks for a user's data file without creating one."""
+        return os.path.exists(self._get_user_filepath(user_id))
+
     def load_user_data(self, user_id: str) -> dict:
         """Loads user data from a JSON file. Creates default if not found."""
         filepath = self._get_user_filepath(user_id)
@@ -0,0 +1,180 @@
+import contextlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# One append-only file per symbol of fixed-width float64 records
+COLUMNS = ("t", "price", "change_pct")
+RECORD_BYTES = 8 * len(COLUMNS)
+
+def _to_float(value):
+    """Quote values arrive as numbers or strings like '24,812.35' / '-0.41%'."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(",", "").replace("%", "").strip())
+    except ValueError:
+        return None
+
+class MarketHistoryStore:
+    """
+    Time series of index quotes from every markets snapshot. Each symbol has one
+    append-only file of fixed-width float64 records (timestamp, price, change %);
+    reads memory-map it as an n x 3 array, so a year of 5-minute points for a
+    symbol is a few MB on disk and slicing a range touches only the pages it
+    needs. Ranges are downsampled server-side to at most max_points closes.
+    Writers in all worker processes serialise on a file lock, and a record torn
+    by a crash is cut off before the next append.
+    """
+
+    def __init__(self, directory: str = settings.MARKET_HISTORY_DIR,
+                 max_points: int = settings.MARKET_HISTORY_MAX_POINTS):
+        self.directory = directory
+        self.max_points = max_points
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._meta_path = os.path.join(directory, "symbols.json")
+        self._lock_path = os.path.join(directory, ".lock")
+        self._symbols = self._load_symbols()
+        self.appended = 0
+
+    def _load_symbols(self) -> dict:
+        try:
+            with open(self._meta_path, 'r') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def _path(self, symbol: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", symbol)
+        return os.path.join(self.directory, f"{safe}.f8")
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Exclusive lock across threads and worker processes for appends and metadata updates."""
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # --- Writes ---
+
+    def record(self, market_trends: list, timestamp: float | None = None) -> int:
+        """Appends one point per quoted symbol in a google_finance_markets market_trends list."""
+        timestamp = timestamp or time.time()
+        rows = {}
+        for trend in market_trends:
+            for item in trend.get("results", []):
+                symbol = item.get("stock")
+                price = _to_float(item.get("extracted_price", item.get("price")))
+                if not symbol or price is None:
+                    continue
+                movement = item.get("price_movement", {})
+                change_pct = _to_float(movement.get("percentage", 0)) or 0.0
+                if str(movement.get("movement", "")).lower() == "down":
+                    change_pct = -abs(change_pct)
+                rows[symbol] = (item.get("name", symbol), (timestamp, price, change_pct))
+
+        with self._file_lock():
+            symbols = self._load_symbols()
+            for symbol, (name, values) in rows.items():
+                path = self._path(symbol)
+                with open(path, "ab") as f:
+                    size = f.tell()
+                    complete = size - size % RECORD_BYTES
+                    if complete != size:
+                        # A crash mid-append left a partial record; drop it so fields stay aligned
+                        f.truncate(complete)
+                        logger.warning(f"Dropped a torn market history record for {symbol}.")
+                    last = self._read_records(symbol)
+                    if len(last) and last[-1, 0] >= timestamp:
+                        continue
+                    f.write(np.array(values, dtype=np.float64).tobytes())
+                symbols[symbol] = name
+                self.appended += 1
+            tmp_path = f"{self._meta_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(symbols, f)
+            os.replace(tmp_path, self._meta_path)
+            self._symbols = symbols
+        return len(rows)
+
+    # --- Reads ---
+
+    def _read_records(self, symbol: str) -> np.ndarray:
+        """n x len(COLUMNS) view of a symbol's complete records."""
+        path = self._path(symbol)
+        count = (os.path.getsize(path) if os.path.exists(path) else 0) // RECORD_BYTES
+        if not count:
+            return np.empty((0, len(COLUMNS)))
+        return np.memmap(path, dtype=np.float64, mode="r", shape=(count, len(COLUMNS)))
+
+    def _known(self, symbol: str) -> bool:
+        """Whether symbol has been recorded, re-reading the metadata other workers may have updated."""
+        if symbol not in self._symbols:
+            self._symbols = self._load_symbols()
+        return symbol in self._symbols
+
+    def symbols(self) -> dict:
+        """Recorded symbols and their display names."""
+        self._symbols = self._load_symbols()
+        return dict(self._symbols)
+
+    def history(self, symbol: str, range_seconds: float | None, max_points: int | None = None) -> dict | None:
+        """
+        {symbol, name, points: [{t, price, change_pct}], change, change_pct} for
+        the last range_seconds (all history if None), or None for an unknown symbol.
+        Each point is the last quote in its time bucket.
+        """
+        if not self._known(symbol):
+            return None
+        records = self._read_records(symbol)
+        length = len(records)
+        t, price, change_pct = records[:, 0], records[:, 1], records[:, 2]
+
+        start = 0
+        if range_seconds and length:
+            start = int(np.searchsorted(t, t[-1] - range_seconds, side="left"))
+        t, price, change_pct = t[start:], price[start:], change_pct[start:]
+
+        points = max_points or self.max_points
+        if len(t) > points:
+            edges = np.linspace(t[0], t[-1], points + 1)[1:]
+            picks = np.unique(np.searchsorted(t, edges, side="right") - 1)
+            t, price, change_pct = t[picks], price[picks], change_pct[picks]
+
+        result = {
+            "symbol": symbol,
+            "name": self._symbols[symbol],
+            "points": [{"t": ts, "price": p, "change_pct": c}
+                       for ts, p, c in zip(t.tolist(), price.tolist(), change_pct.tolist())],
+            "change": None,
+            "change_pct": None,
+        }
+        if len(price) >= 2 and price[0]:
+            result["change"] = round(float(price[-1] - price[0]), 4)
+            result["change_pct"] = round(float((price[-1] / price[0] - 1) * 100), 4)
+        return result
+
+    def stats(self) -> dict:
+        return {"symbols": len(self._symbols), "appended": self.appended}
+
+market_history = MarketHistoryStore()
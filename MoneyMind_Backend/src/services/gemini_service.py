@@ -2,10 +2,21 @@ import google.generativeai as genai
 from config import settings
 import logging
 import json
+import time
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
+from src.services.model_router import ModelRouter
+from src.services.resilience import get_upstream
+from src.core.cache import TTLCache
+from src.services.tool_compaction import ToolOutputCompactor
+from src.core.structured_output import (
+    IncrementalJsonParser, StructuredOutputError, parse_structured, to_gemini_schema, validate_model
+)
 
 logger = logging.getLogger(__name__)
 
+class GeminiGenerationError(Exception):
+    """Raised by the async API when Gemini returns no usable text."""
+
 class GeminiService:
     def __init__(self, api_key=settings.GEMINI_API_KEY):
         """Initializes the Gemini Service."""
@@ -23,18 +34,27 @@ class GeminiService:
             HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
             HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
         }
+        self.router = ModelRouter()
+        self.upstream = get_upstream("gemini")
+        self.response_cache = TTLCache(max_entries=settings.GEMINI_RESPONSE_CACHE_SIZE,
+                                       ttl_seconds=settings.GEMINI_RESPONSE_CACHE_TTL_SECONDS)
+        self._models = {}
         logger.info("Gemini Service Initialized")
 
-    def get_model(self, model_name=settings.GEMINI_FAST_MODEL, tools=None):
-        """Initializes and returns a generative model instance."""
+    def get_model(self, model_name=settings.GEMINI_FAST_MODEL, tools=None, generation_config=None):
+        """Returns a (cached) generative model instance; instances share the underlying client."""
         resolved_model_name = model_name if model_name else settings.GEMINI_FAST_MODEL
+        config = {"temperature": 0.7, **(generation_config or {})}
+        cache_key = (resolved_model_name,
+                     tuple(getattr(t, "name", repr(t)) for t in tools or []),
+                     json.dumps(config, sort_keys=True, default=str))
+        if cache_key in self._models:
+            return self._models[cache_key]
         try:
             model_params = {
                 "model_name": resolved_model_name,
                 "safety_settings": self.safety_settings,
-                "generation_config": {
-                    "temperature": 0.7,
-                }
+                "generation_config": config,
             }
             if tools:
                 if not isinstance(tools, list) or not all(isinstance(t, genai.types.FunctionDeclaration) for t in tools):
@@ -43,18 +63,199 @@ class GeminiService:
                     model_params["tools"] = tools
 
             logger.debug(f"Initializing model: {resolved_model_name} with params: {model_params}")
-            return genai.GenerativeModel(**model_params)
+            model = genai.GenerativeModel(**model_params)
+            self._models[cache_key] = model
+            return model
         except Exception as e:
             logger.error(f"Error initializing Gemini model {resolved_model_name}: {e}", exc_info=True)
             raise
 
-    def generate_text(self, prompt: str, model_name=None) -> str:
+    def resolve_model(self, model_name=None, task=None) -> str:
+        """Returns model_name if given, otherwise the router's pick for the task class."""
+        return model_name if model_name else self.router.choose(task)
+
+    def _timed_call(self, model_name: str, fn, *args, key=None, idempotent=False):
+        """
+        Runs a model call through the shared Gemini circuit breaker and records its
+        latency/outcome with the router. key enables the last-good-answer fallback.
+        """
+        start = time.monotonic()
+        try:
+            result = self.upstream.call(fn, *args, key=key, idempotent=idempotent,
+                                        cache_result=lambda r: bool(getattr(r, "candidates", None)))
+        except Exception:
+            self.router.record(model_name, time.monotonic() - start, ok=False)
+            raise
+        self.router.record(model_name, time.monotonic() - start, ok=True)
+        return result
+
+    async def _timed_call_async(self, model_name: str, fn, *args, key=None, idempotent=False):
+        """Async counterpart of _timed_call for generate_content_async."""
+        start = time.monotonic()
+        try:
+            result = await self.upstream.acall(fn, *args, key=key, idempotent=idempotent,
+                                               cache_result=lambda r: bool(getattr(r, "candidates", None)))
+        except Exception:
+            self.router.record(model_name, time.monotonic() - start, ok=False)
+            raise
+        self.router.record(model_name, time.monotonic() - start, ok=True)
+        return result
+
+    @staticmethod
+    def _response_text(response) -> str | None:
+        """Returns the response text, joining candidate parts if needed; None if blocked/empty."""
+        if not response.candidates:
+            return None
+        try:
+            if response.text:
+                return response.text
+        except (ValueError, AttributeError):
+            pass
+        try:
+            parts = response.candidates[0].content.parts
+            return "".join(part.text for part in parts if hasattr(part, 'text')) or None
+        except (IndexError, AttributeError):
+            return None
+
+    async def generate_text_async(self, prompt: str, model_name=None, task="synthesis", use_cache=True) -> str:
+        """
+        Async text generation sharing the model cache, response cache, router and
+        circuit breaker with the sync API. Raises GeminiGenerationError instead of
+        returning an apology string, so callers can apply their own fallbacks.
+        """
+        # An explicit model is part of the key so a pinned call never gets another model's answer
+        cache_key = (task, model_name, prompt)
+        if use_cache:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Gemini response cache hit (task: {task}).")
+                return cached
+
+        model_to_use = self.resolve_model(model_name, task)
+        try:
+            model = self.get_model(model_to_use)
+            logger.info(f"Generating text (async) with model: {model_to_use} (task: {task})")
+            response = await self._timed_call_async(model_to_use, model.generate_content_async, prompt, key=cache_key)
+        except Exception as e:
+            logger.error(f"Error during async Gemini generation with {model_to_use}: {e}", exc_info=True)
+            raise GeminiGenerationError(str(e)) from e
+
+        text = self._response_text(response)
+        if not text:
+            logger.warning(f"Gemini returned no usable text (async) for prompt: {prompt[:100]}...")
+            raise GeminiGenerationError("Gemini returned an empty or blocked response")
+        if use_cache:
+            self.response_cache.set(cache_key, text)
+        return text
+
+    @staticmethod
+    def _json_generation_config(schema=None, many=False) -> dict:
+        """JSON mode, constrained by the schema when Gemini can express it."""
+        config = {"response_mime_type": "application/json"}
+        gemini_schema = to_gemini_schema(schema, many=many) if schema is not None else None
+        if gemini_schema:
+            config["response_schema"] = gemini_schema
+        return config
+
+    def generate_json(self, prompt: str, schema=None, many=False, model_name=None, task="extraction"):
+        """
+        Generates JSON in Gemini's JSON mode (with a response schema derived from the
+        Pydantic model when possible), repairs it locally if damaged and validates it.
+        Returns a schema instance (or list of instances with many=True), or raw
+        dict/list when no schema is given. Raises StructuredOutputError on failure.
+        """
+        cache_key = (task, "json", model_name, getattr(schema, "__name__", None), many, prompt)
+        text = self.response_cache.get(cache_key)
+        fresh = text is None
+        if fresh:
+            model_to_use = self.resolve_model(model_name, task)
+            try:
+                model = self.get_model(model_to_use, generation_config=self._json_generation_config(schema, many))
+                logger.info(f"Generating JSON with model: {model_to_use} (task: {task})")
+                response = self._timed_call(model_to_use, model.generate_content, prompt, key=cache_key)
+            except Exception as e:
+                logger.error(f"Error during Gemini JSON generation with {model_to_use}: {e}", exc_info=True)
+                raise StructuredOutputError(f"Generation failed: {e}") from e
+            text = self._response_text(response)
+            if not text:
+                raise StructuredOutputError("Gemini returned an empty or blocked response")
+
+        result = parse_structured(text, schema, many)
+        if fresh:
+            # Only fresh generations are stored, so hits don't keep extending the TTL
+            self.response_cache.set(cache_key, text)
+        return result
+
+    async def generate_json_async(self, prompt: str, schema=None, many=False, model_name=None, task="extraction"):
+        """Async counterpart of generate_json."""
+        cache_key = (task, "json", model_name, getattr(schema, "__name__", None), many, prompt)
+        text = self.response_cache.get(cache_key)
+        fresh = text is None
+        if fresh:
+            model_to_use = self.resolve_model(model_name, task)
+            try:
+                model = self.get_model(model_to_use, generation_config=self._json_generation_config(schema, many))
+                logger.info(f"Generating JSON (async) with model: {model_to_use} (task: {task})")
+                response = await self._timed_call_async(model_to_use, model.generate_content_async, prompt, key=cache_key)
+            except Exception as e:
+                logger.error(f"Error during async Gemini JSON generation with {model_to_use}: {e}", exc_info=True)
+                raise StructuredOutputError(f"Generation failed: {e}") from e
+            text = self._response_text(response)
+            if not text:
+                raise StructuredOutputError("Gemini returned an empty or blocked response")
+
+        result = parse_structured(text, schema, many)
+        if fresh:
+            self.response_cache.set(cache_key, text)
+        return result
+
+    async def stream_json_async(self, prompt: str, schema=None, model_name=None, task="extraction"):
+        """
+        Streams a JSON array response and yields each element (validated against
+        schema when given) as soon as it is complete, so callers can render early.
+        """
+        model_to_use = self.resolve_model(model_name, task)
+        if not self.upstream.breaker.allow_request():
+            raise StructuredOutputError("Gemini is temporarily unavailable")
+
+        model = self.get_model(model_to_use, generation_config=self._json_generation_config(schema, many=True))
+        parser = IncrementalJsonParser()
+        start = time.monotonic()
+        logger.info(f"Streaming JSON with model: {model_to_use} (task: {task})")
+        try:
+            response = await model.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                text = self._response_text(chunk)
+                if not text:
+                    continue
+                for item in parser.feed(text):
+                    if schema is None:
+                        yield item
+                        continue
+                    try:
+                        yield validate_model(schema, item)
+                    except ValueError as e:
+                        logger.warning(f"Dropping streamed item that failed {schema.__name__} validation: {e}")
+        except Exception as e:
+            self.router.record(model_to_use, time.monotonic() - start, ok=False)
+            self.upstream.breaker.record_failure()
+            logger.error(f"Error during Gemini JSON streaming with {model_to_use}: {e}", exc_info=True)
+            raise StructuredOutputError(f"Streaming failed: {e}") from e
+        self.router.record(model_to_use, time.monotonic() - start, ok=True)
+        self.upstream.breaker.record_success()
+
+    def generate_text(self, prompt: str, model_name=None, task="synthesis") -> str:
         """Generates text content based on a prompt."""
-        model_to_use = model_name if model_name else settings.GEMINI_FAST_MODEL
+        cache_key = (task, model_name, prompt)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Gemini response cache hit (task: {task}).")
+            return cached
+        model_to_use = self.resolve_model(model_name, task)
         try:
             model = self.get_model(model_to_use)
-            logger.info(f"Generating text with model: {model_to_use}")
-            response = model.generate_content(prompt)
+            logger.info(f"Generating text with model: {model_to_use} (task: {task})")
+            response = self._timed_call(model_to_use, model.generate_content, prompt, key=cache_key)
             logger.debug(f"Raw text generation response: {response}")
 
             if not response.candidates:
@@ -70,6 +271,7 @@ class GeminiService:
 
             if hasattr(response, 'text') and response.text:
                 logger.info(f"Gemini text generation successful for model {model_to_use}.")
+                self.response_cache.set(cache_key, response.text)
                 return response.text
             else:
                 logger.warning(f"Gemini returned no text for prompt: {prompt[:100]}... Candidates: {response.candidates}")
@@ -87,15 +289,21 @@ class GeminiService:
             logger.error(f"Error during Gemini text generation with {model_to_use}: {e}", exc_info=True)
             return "Sorry, I encountered an error trying to generate a response."
 
-    def generate_with_tools(self, prompt: str, tools: list, tool_functions: dict, model_name=None) -> str:
-        """Generates content using function calling/tools, passing dict for response."""
-        model_to_use = model_name if model_name else settings.GEMINI_FAST_MODEL
+    def generate_with_tools(self, prompt: str, tools: list, tool_functions: dict, model_name=None, task="synthesis",
+                            compact_tool_output=True) -> str:
+        """
+        Generates content using function calling/tools, passing dict for response.
+        Tool results are compacted (see ToolOutputCompactor) before being sent back
+        to the model, and link ids in the final text are expanded to URLs.
+        """
+        model_to_use = self.resolve_model(model_name, task)
+        compactor = ToolOutputCompactor() if compact_tool_output else None
 
         try:
-            logger.info(f"Generating with tools using model: {model_to_use}")
+            logger.info(f"Generating with tools using model: {model_to_use} (task: {task})")
             model = self.get_model(model_to_use, tools=tools)
             chat = model.start_chat()
-            response = chat.send_message(prompt)
+            response = self._timed_call(model_to_use, chat.send_message, prompt)
             logger.debug(f"Initial response from model (Tools): {response}")
 
             while True:
@@ -129,6 +337,8 @@ class GeminiService:
                     logger.error(f"Error executing tool function {tool_name}: {e}", exc_info=True)
                     function_response_content = json.dumps({"error": f"Error executing tool {tool_name}: {str(e)}"})
 
+                if compactor:
+                    function_response_content = compactor.compact(tool_name, function_response_content)
                 logger.debug(f"Tool function response content (first 200 chars): {str(function_response_content)[:200]}...")
 
                 try:
@@ -141,7 +351,7 @@ class GeminiService:
                             }
                         }
                     }
-                    response = chat.send_message(tool_response_dict)
+                    response = self._timed_call(model_to_use, chat.send_message, tool_response_dict)
                     logger.debug(f"Response after sending tool result dict back to model: {response}")
                 except Exception as e:
                     logger.error(f"Error sending tool response dict back to model: {e}", exc_info=True)
@@ -161,7 +371,7 @@ class GeminiService:
 
             if hasattr(response, 'text') and response.text:
                 logger.info("Final response text received.")
-                return response.text
+                return compactor.expand(response.text) if compactor else response.text
             else:
                 logger.warning(f"Gemini returned no final text after tool use for prompt: {prompt[:100]}... Candidates: {response.candidates}")
                 try:
@@ -171,7 +381,7 @@ class GeminiService:
                         fallback_text = "".join(part.text for part in final_content.parts if hasattr(part, 'text'))
                         if fallback_text:
                             logger.warning("Using joined text from final parts as fallback.")
-                            return fallback_text
+                            return compactor.expand(fallback_text) if compactor else fallback_text
                 except Exception as e:
                     logger.error(f"Error accessing final candidate content details: {e}")
                 return "Sorry, I wasn't able to formulate a final text response after using the required tools. Please try again."
@@ -186,7 +396,7 @@ class GeminiService:
         Args: user_input, possible_intents list, optional model_name.
         Returns: Classified intent string or "Unclear/General".
         """
-        model_to_use = model_name if model_name else settings.GEMINI_FAST_MODEL
+        model_to_use = self.resolve_model(model_name, "classification")
         logger.debug(f"Using model '{model_to_use}' for intent classification.")
 
         intent_list_str = "\n".join([f"- {intent}" for intent in possible_intents])
@@ -202,7 +412,8 @@ class GeminiService:
         try:
             model = self.get_model(model_to_use)
             logger.info(f"Classifying intent with model: {model_to_use}")
-            response = model.generate_content(prompt)
+            response = self._timed_call(model_to_use, model.generate_content, prompt,
+                                        key=("classification", prompt), idempotent=True)
             logger.debug(f"Raw intent classification response: {response}")
 
             if not response.candidates:
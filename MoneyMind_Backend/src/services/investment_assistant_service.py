@@ -1,10 +1,9 @@
 # services/investment_assistant_service.py
-import os
 import logging
 import json
 from typing import List, Dict, Any, Optional
-import google.generativeai as genai
 from pydantic import BaseModel, Field
+from src.services.gemini_service import gemini_service
 
 logger = logging.getLogger(__name__)
 
@@ -14,17 +13,26 @@ class UserQuery(BaseModel):
     user_id: Optional[str] = Field(default=None, description="User ID for personalization")
     conversation_history: Optional[List[Dict[str, str]]] = Field(default=None, description="Previous conversation")
 
+# --- LLM response schemas ---
+class AnswerResponse(BaseModel):
+    answer: str
+    follow_up_questions: List[str] = Field(default=[])
+    resources: List[str] = Field(default=[])
+
+class BenefitsResponse(BaseModel):
+    summary: str
+    benefits: List[str] = Field(default=[])
+    considerations: List[str] = Field(default=[])
+    ideal_for: str = Field(default="")
+
+class ComparisonResponse(BaseModel):
+    overview: str
+    key_differences: List[str] = Field(default=[])
+    recommendation: str = Field(default="")
+    considerations: List[str] = Field(default=[])
+
 class InvestmentAssistant:
-    def __init__(self):
-        self.gemini_api_key = os.getenv("GEMINI_API_KEY")
-        self.setup_gemini()
-        
-    def setup_gemini(self):
-        """Configure Gemini API"""
-        genai.configure(api_key=self.gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
-    
-    async def answer_question(self, query: UserQuery) -> Dict[str, Any]:
+    async def answer_question(self, query: UserQuery) -> AnswerResponse:
         """
         Answer user's investment-related questions using Gemini.
         """
@@ -38,28 +46,17 @@ class InvestmentAssistant:
                 
             prompt = self._build_answer_prompt(query, user_context)
             
-            response = await self._generate_response(prompt)
-            
-            try:
-                structured_response = self._parse_structured_response(response)
-                return structured_response
-            except Exception as e:
-                logger.warning(f"Failed to parse structured response: {str(e)}")
-                return {
-                    "answer": response,
-                    "follow_up_questions": [],
-                    "resources": []
-                }
+            return await gemini_service.generate_json_async(prompt, schema=AnswerResponse, task="synthesis")
                 
         except Exception as e:
             logger.error(f"Error answering question: {str(e)}", exc_info=True)
-            return {
-                "answer": f"I'm sorry, I couldn't process your question due to a technical issue. Please try asking in a different way.",
-                "follow_up_questions": [],
-                "resources": []
-            }
+            return AnswerResponse(
+                answer=f"I'm sorry, I couldn't process your question due to a technical issue. Please try asking in a different way.",
+                follow_up_questions=[],
+                resources=[]
+            )
     
-    async def explain_product_benefits(self, product: Dict[str, Any], user_id: Optional[str] = None) -> Dict[str, Any]:
+    async def explain_product_benefits(self, product: Dict[str, Any], user_id: Optional[str] = None) -> BenefitsResponse:
         """
         Explain the benefits of a specific investment product.
         """
@@ -70,58 +67,34 @@ class InvestmentAssistant:
                 
             prompt = self._build_benefits_prompt(product, user_context)
             
-            response = await self._generate_response(prompt)
-            
-            try:
-                structured_response = self._parse_benefits_response(response)
-                return structured_response
-            except Exception as e:
-                logger.warning(f"Failed to parse benefits response: {str(e)}")
-                return {
-                    "summary": response,
-                    "benefits": [],
-                    "considerations": [],
-                    "ideal_for": ""
-                }
+            return await gemini_service.generate_json_async(prompt, schema=BenefitsResponse, task="synthesis")
                 
         except Exception as e:
             logger.error(f"Error explaining product benefits: {str(e)}")
-            return {
-                "summary": "I'm sorry, I couldn't analyze this product due to a technical issue.",
-                "benefits": [],
-                "considerations": [],
-                "ideal_for": ""
-            }
+            return BenefitsResponse(
+                summary="I'm sorry, I couldn't analyze this product due to a technical issue.",
+                benefits=[],
+                considerations=[],
+                ideal_for=""
+            )
     
-    async def compare_products_conversation(self, products: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def compare_products_conversation(self, products: List[Dict[str, Any]]) -> ComparisonResponse:
         """
         Generate a conversational comparison of multiple investment products.
         """
         try:
             prompt = self._build_comparison_prompt(products)
             
-            response = await self._generate_response(prompt)
-        
-            try:
-                structured_response = self._parse_comparison_response(response)
-                return structured_response
-            except Exception as e:
-                logger.warning(f"Failed to parse comparison response: {str(e)}")
-                return {
-                    "overview": response,
-                    "key_differences": [],
-                    "recommendation": "",
-                    "considerations": []
-                }
+            return await gemini_service.generate_json_async(prompt, schema=ComparisonResponse, task="synthesis")
                 
         except Exception as e:
             logger.error(f"Error comparing products: {str(e)}")
-            return {
-                "overview": "I'm sorry, I couldn't compare these products due to a technical issue.",
-                "key_differences": [],
-                "recommendation": "",
-                "considerations": []
-            }
+            return ComparisonResponse(
+                overview="I'm sorry, I couldn't compare these products due to a technical issue.",
+                key_differences=[],
+                recommendation="",
+                considerations=[]
+            )
             
     async def _fetch_user_context(self, user_id: str) -> Dict[str, Any]:
         """Fetch user context for personalized responses"""
@@ -133,15 +106,6 @@ class InvestmentAssistant:
             "time_horizon": "5-10 years"
         }
     
-    async def _generate_response(self, prompt: str) -> str:
-        """Generate response from the Gemini model"""
-        try:
-            response = await self.model.generate_content_async(prompt)
-            return response.text
-        except Exception as e:
-            logger.error(f"Error generating AI response: {str(e)}")
-            raise ValueError(f"Failed to generate response: {str(e)}")
-    
     def _build_answer_prompt(self, query: UserQuery, user_context: Dict[str, Any]) -> str:
         """Build prompt for answering investment questions"""
         # products if available
@@ -241,88 +205,3 @@ class InvestmentAssistant:
         - recommendation: a nuanced recommendation that acknowledges different investor needs
         - considerations: an array of important factors the investor should keep in mind when deciding
         """
-    
-    def _parse_structured_response(self, response: str) -> Dict[str, Any]:
-        """Parse structured response from Gemini"""
-        try:
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = response[json_start:json_end]
-                parsed_response = json.loads(json_str)
-                
-                if 'answer' in parsed_response:
-                    return parsed_response
-            
-            return {
-                "answer": response.strip(),
-                "follow_up_questions": [],
-                "resources": []
-            }
-            
-        except Exception as e:
-            logger.warning(f"Error parsing response as JSON: {str(e)}")
-            return {
-                "answer": response.strip(),
-                "follow_up_questions": [],
-                "resources": []
-            }
-    
-    def _parse_benefits_response(self, response: str) -> Dict[str, Any]:
-        """Parse structured benefits response from Gemini"""
-        try:
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = response[json_start:json_end]
-                parsed_response = json.loads(json_str)
-                
-                if 'summary' in parsed_response and 'benefits' in parsed_response:
-                    return parsed_response
-            
-            return {
-                "summary": response.strip(),
-                "benefits": [],
-                "considerations": [],
-                "ideal_for": ""
-            }
-            
-        except Exception as e:
-            logger.warning(f"Error parsing benefits response as JSON: {str(e)}")
-            return {
-                "summary": response.strip(),
-                "benefits": [],
-                "considerations": [],
-                "ideal_for": ""
-            }
-    
-    def _parse_comparison_response(self, response: str) -> Dict[str, Any]:
-        """Parse structured comparison response from Gemini"""
-        try:
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = response[json_start:json_end]
-                parsed_response = json.loads(json_str)
-                
-                if 'overview' in parsed_response and 'key_differences' in parsed_response:
-                    return parsed_response
-        
-            return {
-                "overview": response.strip(),
-                "key_differences": [],
-                "recommendation": "",
-                "considerations": []
-            }
-            
-        except Exception as e:
-            logger.warning(f"Error parsing comparison response as JSON: {str(e)}")
-            return {
-                "overview": response.strip(),
-                "key_differences": [],
-                "recommendation": "",
-                "considerations": []
-            }
\ No newline at end of file
@@ -1,12 +1,20 @@
 # services/investment_service.py
-import os
+import asyncio
 import logging
 import json
+import math
 from typing import List, Dict, Any, Optional
-import google.generativeai as genai
-from serpapi import GoogleSearch
 from fastapi import Depends, HTTPException, BackgroundTasks
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+from config import settings
+from src.services.serpapi_transport import serpapi_transport
+from src.services.serpapi_cache import SerpApiCache
+from src.data_manager.instrument_catalog import instrument_catalog, horizon_years
+from src.services.product_details_cache import product_details_cache
+from src.services.product_scoring import product_scorer
+from src.services.gemini_service import gemini_service, GeminiGenerationError
+from src.core.structured_output import StructuredOutputError
+from src.core.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -18,68 +26,186 @@ class InvestmentCriteria(BaseModel):
     tax_free_growth: bool = Field(default=True)
     goal: Optional[str] = Field(default=None)
     user_id: Optional[str] = Field(default=None)
+    include_reasoning: bool = Field(default=True)
 
 class ProductComparison(BaseModel):
     product_ids: List[str] = Field(...)
     factors: List[str] = Field(default=["return", "risk", "fees", "liquidity", "tax_efficiency"])
     user_id: Optional[str] = Field(default=None)
 
+# --- LLM response schemas ---
+class RecommendedProduct(BaseModel):
+    id: str
+    name: str
+    type: Optional[str] = None
+    expected_return: Optional[str] = Field(default=None, alias="return")
+    risk: Optional[str] = None
+    timeHorizon: Optional[str] = None
+    expenseRatio: Optional[str] = None
+    minInvestment: Optional[str] = None
+    match_score: Optional[float] = None
+    allocation: Optional[float] = None
+    allocation_amount: Optional[float] = None
+    reasoning: Optional[str] = None
+    pros: List[str] = Field(default=[])
+    cons: List[str] = Field(default=[])
+
+    model_config = ConfigDict(extra="allow")
+
+class ProductReasoning(BaseModel):
+    id: str
+    reasoning: str = Field(default="")
+    pros: List[str] = Field(default=[])
+    cons: List[str] = Field(default=[])
+
+class ProductExplanation(BaseModel):
+    id: str
+    summary: str = Field(default="")
+    benefits: List[str] = Field(default=[])
+    considerations: List[str] = Field(default=[])
+    ideal_for: str = Field(default="")
+
+class ExplanationBatch(BaseModel):
+    explanations: Dict[str, ProductExplanation] = Field(default={})
+    unavailable: List[str] = Field(default=[])
+
+class ComparisonResult(BaseModel):
+    products: List[Dict[str, Any]]
+    comparison_table: Dict[str, Any]
+    overall_analysis: str = Field(default="")
+    best_for: Dict[str, Any] = Field(default={})
+    unavailable: List[str] = Field(default=[])
+
+def recommendation_bucket(criteria: InvestmentCriteria) -> tuple:
+    """
+    Cache key for a recommendation request: categories sorted, risk and horizon
+    canonicalised, the amount on a log scale (RECOMMEND_CACHE_AMOUNT_STEP wide
+    buckets) and the goal with case and spacing ignored.
+    """
+    amount = max(criteria.investment_amount, 1.0)
+    return (
+        tuple(sorted({category.strip().lower() for category in criteria.categories})),
+        (criteria.risk_tolerance or "").strip().title(),
+        horizon_years(criteria.time_horizon),
+        criteria.tax_free_growth,
+        math.floor(math.log(amount, settings.RECOMMEND_CACHE_AMOUNT_STEP)),
+        " ".join((criteria.goal or "").lower().split()),
+        criteria.include_reasoning,
+    )
+
 class InvestmentProductAI:
     def __init__(self):
-        self.gemini_api_key = os.getenv("GEMINI_API_KEY")
-        self.serpapi_api_key = os.getenv("SERPAPI_API_KEY")
-        self.product_cache = {}
-        self.setup_gemini()
-        
-    def setup_gemini(self):
-        """Configure Gemini API"""
-        genai.configure(api_key=self.gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
-        
-    async def recommend_products(self, criteria: InvestmentCriteria) -> List[Dict[str, Any]]:
+        self.product_cache = product_details_cache
+        # Ranked lists with reasoning per criteria bucket; amount-dependent fields are recomputed per request
+        self.recommendation_cache = TTLCache(max_entries=settings.RECOMMEND_CACHE_MAX_ENTRIES,
+                                             ttl_seconds=settings.RECOMMEND_CACHE_TTL_SECONDS)
+        # Explanations by (product id, user context)
+        self.explanation_cache = TTLCache(max_entries=settings.EXPLAIN_CACHE_MAX_ENTRIES,
+                                          ttl_seconds=settings.EXPLAIN_CACHE_TTL_SECONDS)
+
+    async def recommend_products(self, criteria: InvestmentCriteria) -> List[RecommendedProduct]:
+        """
+        Get personalized product recommendations based on user criteria. Ranking,
+        match scores and allocations come from the local scorer; the model only
+        writes the reasoning, pros and cons. Results are cached per criteria bucket.
+        """
+        bucket = recommendation_bucket(criteria)
+        cached = self.recommendation_cache.get(bucket)
+        if cached is not None:
+            return [RecommendedProduct(**product) for product in product_scorer.rank(cached, criteria)]
+
+        ranked = await self._rank_products(criteria)
+        if not ranked:
+            return []
+
+        complete = True
+        if criteria.include_reasoning:
+            try:
+                reasons = await gemini_service.generate_json_async(
+                    self._build_recommendation_prompt(criteria, ranked),
+                    schema=ProductReasoning, many=True, task="synthesis"
+                )
+                self._merge_reasoning(ranked, reasons or [])
+            except StructuredOutputError as e:
+                logger.error("Failed to generate recommendation reasoning: %s", str(e))
+                complete = False
+        if complete:
+            self.recommendation_cache.set(bucket, ranked)
+        return [RecommendedProduct(**product) for product in ranked]
+        
+    async def stream_recommendations(self, criteria: InvestmentCriteria):
         """
-        Get personalized product recommendations based on user criteria.
+        Yield ranked recommendations as the model's reasoning for each one streams
+        in; products the model skipped follow in rank order without reasoning.
         """
+        bucket = recommendation_bucket(criteria)
+        cached = self.recommendation_cache.get(bucket)
+        if cached is not None:
+            for product in product_scorer.rank(cached, criteria):
+                yield product
+            return
+
+        ranked = await self._rank_products(criteria)
+        if not ranked:
+            return
+
+        pending = {product["id"]: product for product in ranked}
+        complete = True
+        if criteria.include_reasoning:
+            try:
+                async for reason in gemini_service.stream_json_async(
+                    self._build_recommendation_prompt(criteria, ranked), schema=ProductReasoning, task="synthesis"
+                ):
+                    product = pending.pop(reason.id, None)
+                    if product is not None:
+                        self._merge_reasoning([product], [reason])
+                        yield product
+            except StructuredOutputError as e:
+                logger.error("Failed to stream recommendation reasoning: %s", str(e))
+                complete = False
+        for product in pending.values():
+            yield product
+        if complete:
+            self.recommendation_cache.set(bucket, ranked)
+
+    async def _rank_products(self, criteria: InvestmentCriteria) -> List[Dict[str, Any]]:
         base_products = await self._fetch_relevant_products(criteria)
-        
         if not base_products:
             logger.warning("No base products found for criteria: %s", criteria)
             return []
-            
-        prompt = self._build_recommendation_prompt(criteria, base_products)
-        response = await self._generate_response(prompt)
-        
-        try:
-            enhanced_products = self._parse_recommendations(response, base_products)
-            return enhanced_products
-        except Exception as e:
-            logger.error("Failed to process recommendations: %s", str(e))
-            return base_products
-        
-    async def compare_products(self, comparison: ProductComparison) -> Dict[str, Any]:
+        ranked = product_scorer.rank(base_products, criteria)
+        if not ranked:
+            logger.warning("No candidate within risk tolerance for criteria: %s", criteria)
+        return ranked
+
+    def _merge_reasoning(self, ranked: List[Dict[str, Any]], reasons: List[ProductReasoning]):
+        """Copies the model's reasoning onto the ranked products by id (scores are never taken from it)."""
+        by_id = {reason.id: reason for reason in reasons}
+        for product in ranked:
+            reason = by_id.get(product["id"])
+            if reason:
+                product.update(reasoning=reason.reasoning, pros=reason.pros, cons=reason.cons)
+
+    async def compare_products(self, comparison: ProductComparison) -> ComparisonResult:
         """
         Generate detailed comparison between selected products.
         """
-        products = []
-        for product_id in comparison.product_ids:
-            try:
-                product = await self._fetch_product_details(product_id)
-                products.append(product)
-            except Exception as e:
-                logger.error(f"Error fetching product {product_id}: {str(e)}")
+        products, unavailable = await self._fetch_products(comparison.product_ids)
         
         if len(products) < 2:
             raise HTTPException(status_code=400, detail="At least two valid products are required for comparison")
             
         prompt = self._build_comparison_prompt(products, comparison.factors)
-        response = await self._generate_response(prompt)
         
         try:
-            comparison_data = self._parse_comparison(response, products)
-            return comparison_data
-        except Exception as e:
+            result = await gemini_service.generate_json_async(
+                prompt, schema=ComparisonResult, task="synthesis"
+            )
+        except StructuredOutputError as e:
             logger.error(f"Failed to process comparison: {str(e)}")
-            return self._generate_basic_comparison(products, comparison.factors)
+            result = ComparisonResult(**self._generate_basic_comparison(products, comparison.factors))
+        result.unavailable = unavailable
+        return result
     
     async def explain_benefits(self, product_id: str, user_id: Optional[str] = None) -> str:
         """
@@ -96,151 +222,105 @@ class InvestmentProductAI:
         response = await self._generate_response(prompt)
         return response
     
+    async def explain_batch(self, product_ids: List[str], user_id: Optional[str] = None) -> ExplanationBatch:
+        """
+        Explanations for many products keyed by id. Cached ones are reused; the
+        rest are fetched concurrently and explained together in one model call.
+        Products that can't be fetched or explained are listed as unavailable.
+        """
+        user_context = await self._fetch_user_context(user_id) if user_id else {}
+        context_key = json.dumps(user_context, sort_keys=True)
+        product_ids = list(dict.fromkeys(product_ids))
+
+        explanations = {}
+        for product_id in product_ids:
+            cached = self.explanation_cache.get((product_id, context_key))
+            if cached is not None:
+                explanations[product_id] = cached
+        missing = [product_id for product_id in product_ids if product_id not in explanations]
+        if not missing:
+            return ExplanationBatch(explanations=explanations)
+
+        products, unavailable = await self._fetch_products(missing)
+        if products:
+            try:
+                generated = await gemini_service.generate_json_async(
+                    self._build_batch_explanation_prompt(products, user_context),
+                    schema=ProductExplanation, many=True, task="synthesis"
+                )
+            except StructuredOutputError as e:
+                logger.error(f"Failed to generate batch explanations: {str(e)}")
+                generated = []
+            by_id = {explanation.id: explanation for explanation in generated or []}
+            for product in products:
+                explanation = by_id.get(product["id"])
+                if explanation is None:
+                    unavailable.append(product["id"])
+                    continue
+                self.explanation_cache.set((product["id"], context_key), explanation)
+                explanations[product["id"]] = explanation
+
+        return ExplanationBatch(
+            explanations={product_id: explanations[product_id] for product_id in product_ids if product_id in explanations},
+            unavailable=[product_id for product_id in product_ids if product_id in unavailable],
+        )
+
     async def _fetch_relevant_products(self, criteria: InvestmentCriteria) -> List[Dict[str, Any]]:
-        """Fetch relevant investment products based on criteria"""
-        search_terms = []
-        
-        if criteria.categories:
-            search_terms.extend(criteria.categories)
-        
-        search_terms.append(criteria.risk_tolerance.lower() + " risk")
-        search_terms.append(criteria.time_horizon)
-        
-        if criteria.tax_free_growth:
-            search_terms.append("tax free")
-            
-        search_query = " ".join(search_terms)
-        
-        try:
-            params = {
-                "engine": "google_shopping",
-                "q": search_query + " investment",
-                "api_key": self.serpapi_api_key
-            }
-            
-            search = GoogleSearch(params)
-            results = search.get_dict()
-            
-            if "shopping_results" in results:
-                products = []
-                for item in results.get("shopping_results", [])[:5]:
-                    product = {
-                        "id": item.get("product_id", ""),
-                        "name": item.get("title", ""),
-                        "type": self._categorize_product(item),
-                        "return": self._estimate_return(item),
-                        "risk": criteria.risk_tolerance,
-                        "timeHorizon": criteria.time_horizon,
-                        "expenseRatio": self._extract_expense_ratio(item),
-                        "minInvestment": self._extract_min_investment(item),
-                        "price": item.get("price", ""),
-                        "rating": item.get("rating", 0),
-                        "taxAdvantaged": criteria.tax_free_growth,
-                    }
-                    products.append(product)
-                return products
-            
-            return []
-            
-        except Exception as e:
-            logger.error(f"Error fetching products: {str(e)}")
-            return []
-    
-    def _categorize_product(self, item: Dict[str, Any]) -> str:
-        """Determine product category from search result"""
-        title = item.get("title", "").lower()
-        
-        if "etf" in title:
-            return "ETF"
-        elif "bond" in title:
-            return "Bonds"
-        elif "gold" in title:
-            return "Gold"
-        elif "silver" in title:
-            return "Silver"
-        elif "ipo" in title:
-            return "IPO's"
-        elif "mutual fund" in title:
-            return "Mutual Funds"
-        elif "deposit" in title:
-            return "Fixed Deposit"
-        elif "crypto" in title or "bitcoin" in title:
-            return "Crypto"
-        else:
-            return "Stocks"
-    
-    def _estimate_return(self, item: Dict[str, Any]) -> str:
-        """Estimate return percentage based on product type"""
-        category = self._categorize_product(item)
-        
-        return_mapping = {
-            "ETF": "9.5%",
-            "Stocks": "10.2%",
-            "Bonds": "5.1%",
-            "Gold": "7.8%",
-            "Silver": "7.2%",
-            "IPO's": "12.8%",
-            "Mutual Funds": "8.7%",
-            "Fixed Deposit": "4.5%",
-            "Crypto": "15.4%",
-        }
-        
-        return return_mapping.get(category, "8.0%")
-    
-    def _extract_expense_ratio(self, item: Dict[str, Any]) -> str:
-        """Extract expense ratio or provide an estimate"""
-        category = self._categorize_product(item)
-        
-        expense_mapping = {
-            "ETF": "0.05%",
-            "Stocks": "0.00%",
-            "Bonds": "0.25%",
-            "Gold": "0.25%",
-            "Silver": "0.50%",
-            "IPO's": "0.60%",
-            "Mutual Funds": "0.75%",
-            "Fixed Deposit": "0.00%",
-            "Crypto": "1.00%",
-        }
-        
-        return expense_mapping.get(category, "0.50%")
-    
-    def _extract_min_investment(self, item: Dict[str, Any]) -> str:
-        """Extract minimum investment or provide an estimate"""
-        price = item.get("extracted_price", 0)
-        if price:
-            return f"${price}"
-        
-        category = self._categorize_product(item)
-        min_investment_mapping = {
-            "ETF": "$50",
-            "Stocks": "$1",
-            "Bonds": "$1000", 
-            "Gold": "$50",
-            "Silver": "$25",
-            "IPO's": "$500",
-            "Mutual Funds": "$1000",
-            "Fixed Deposit": "$500",
-            "Crypto": "$10",
-        }
-        
-        return min_investment_mapping.get(category, "$100")
-        
+        """Candidate products for the criteria from the local instrument catalog"""
+        return instrument_catalog.search(
+            criteria.categories, criteria.risk_tolerance, criteria.time_horizon, criteria.tax_free_growth
+        )
+
+    async def _fetch_products(self, product_ids: List[str]) -> tuple:
+        """
+        Fetches products concurrently, at most COMPARE_FETCH_CONCURRENCY at a time
+        and each bounded by COMPARE_FETCH_TIMEOUT_SECONDS. Returns (products in
+        request order, ids that failed or timed out).
+        """
+        semaphore = asyncio.Semaphore(settings.COMPARE_FETCH_CONCURRENCY)
+
+        async def fetch(product_id):
+            async with semaphore:
+                return await asyncio.wait_for(self._fetch_product_details(product_id),
+                                              settings.COMPARE_FETCH_TIMEOUT_SECONDS)
+
+        product_ids = list(dict.fromkeys(product_ids))
+        results = await asyncio.gather(*(fetch(product_id) for product_id in product_ids), return_exceptions=True)
+        products, unavailable = [], []
+        for product_id, result in zip(product_ids, results):
+            if isinstance(result, BaseException):
+                reason = "timed out" if isinstance(result, asyncio.TimeoutError) else str(result)
+                logger.error(f"Error fetching product {product_id}: {reason}")
+                unavailable.append(product_id)
+            else:
+                products.append(result)
+        return products, unavailable
+
     async def _fetch_product_details(self, product_id: str) -> Dict[str, Any]:
         """Fetch detailed information about a specific product"""
-        if product_id in self.product_cache:
-            return self.product_cache[product_id]
-            
+        product = self.product_cache.get(product_id)
+        if product:
+            return product
+
+        product = instrument_catalog.get(product_id)
+        if product:
+            self.product_cache.set(product_id, product)
+            return product
+
+        self.product_cache.record_upstream_fetch()
+        
         try:
             params = {
                 "engine": "google_product",
                 "product_id": product_id,
-                "api_key": self.serpapi_api_key
             }
             
-            search = GoogleSearch(params)
-            results = search.get_dict()
+            results = await self._serpapi_search(params)
             
+            # The transport reports failures as {"error": ...}; only "no results" means the product doesn't exist
+            if "error" in results and not SerpApiCache.is_empty(results):
+                raise HTTPException(status_code=502, detail=f"Failed to retrieve product {product_id}: {results['error']}")
+
             if "product_results" in results:
                 product_data = results["product_results"]
                 
@@ -262,11 +342,13 @@ class InvestmentProductAI:
                     "specs": product_data.get("specs_results", {})
                 }
                 
-                self.product_cache[product_id] = product
+                self.product_cache.set(product_id, product)
                 return product
             
             raise HTTPException(status_code=404, detail=f"Product not found: {product_id}")
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error fetching product details: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Failed to retrieve product: {str(e)}")
@@ -289,8 +371,8 @@ class InvestmentProductAI:
         return "ETF"
     
     def _infer_return(self, product_data: Dict[str, Any]) -> str:
-        """Infer estimated return from product data"""
-        return "8.5%"
+        """Estimated return; product listings don't carry one, so it is left unknown rather than guessed"""
+        return "N/A"
     
     def _infer_risk_level(self, product_data: Dict[str, Any]) -> str:
         """Infer risk level from product data"""
@@ -320,46 +402,15 @@ class InvestmentProductAI:
         return "2-3 years"  
     
     def _infer_expense_ratio(self, product_data: Dict[str, Any]) -> str:
-        """Infer expense ratio from product data"""
-        product_type = self._infer_product_type(product_data)
-        
-        expense_mapping = {
-            "ETF": "0.05%",
-            "Stocks": "0.00%",
-            "Bonds": "0.25%",
-            "Gold": "0.25%",
-            "Silver": "0.50%",
-            "IPO's": "0.60%",
-            "Mutual Funds": "0.75%",
-            "Fixed Deposit": "0.00%",
-            "Crypto": "1.00%",
-        }
-        
-        return expense_mapping.get(product_type, "0.50%")
+        """Expense ratio; product listings don't carry one, so it is left unknown rather than guessed"""
+        return "N/A"
     
     def _infer_min_investment(self, product_data: Dict[str, Any]) -> str:
-        """Infer minimum investment from product data"""
+        """Minimum investment from a rupee listing price, otherwise unknown"""
         price = product_data.get("price", "")
-        if price and isinstance(price, str) and price.startswith("$"):
-            try:
-                return price
-            except:
-                pass
-                
-        product_type = self._infer_product_type(product_data)
-        min_investment_mapping = {
-            "ETF": "$50",
-            "Stocks": "$1",
-            "Bonds": "$1000", 
-            "Gold": "$50",
-            "Silver": "$25",
-            "IPO's": "$500",
-            "Mutual Funds": "$1000",
-            "Fixed Deposit": "$500",
-            "Crypto": "$10",
-        }
-        
-        return min_investment_mapping.get(product_type, "$100")
+        if isinstance(price, str) and price.strip().startswith(("₹", "Rs", "INR")):
+            return price.strip()
+        return "N/A"
     
     async def _fetch_user_context(self, user_id: str) -> Dict[str, Any]:
         """Fetch user context for personalized recommendations"""
@@ -370,80 +421,49 @@ class InvestmentProductAI:
             "age_group": "30-40"
         }
     
-    async def _generate_response(self, prompt: str) -> str:
-        """Generate response from the Gemini model"""
+    async def _serpapi_search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a SerpApi search through the shared pooled transport"""
+        return await serpapi_transport.search(params)
+
+    async def _generate_response(self, prompt: str, task: str = "synthesis") -> str:
+        """Generate response through the shared Gemini client"""
         try:
-            response = await self.model.generate_content_async(prompt)
-            return response.text
-        except Exception as e:
+            return await gemini_service.generate_text_async(prompt, task=task)
+        except GeminiGenerationError as e:
             logger.error(f"Error generating AI response: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Failed to generate response: {str(e)}")
     
-    def _build_recommendation_prompt(self, criteria: InvestmentCriteria, base_products: List[Dict[str, Any]]) -> str:
-        """Build prompt for product recommendations"""
-        products_str = json.dumps(base_products, indent=2)
+    def _build_recommendation_prompt(self, criteria: InvestmentCriteria, ranked: List[Dict[str, Any]]) -> str:
+        """Build prompt for the reasoning behind already ranked recommendations"""
+        products_str = json.dumps(ranked, indent=2)
         
         return f"""
-        You are a financial advisor helping a client find investment products.
+        You are a financial advisor explaining investment recommendations to a client.
         
         Client's investment criteria:
-        - Categories of interest: {', '.join(criteria.categories)}
+        - Categories of interest: {', '.join(criteria.categories) or 'Any'}
         - Risk tolerance: {criteria.risk_tolerance}
         - Time horizon: {criteria.time_horizon}
-        - Investment amount: ${criteria.investment_amount:,.2f}
+        - Investment amount: ₹{criteria.investment_amount:,.2f}
         - Requires tax-free growth: {"Yes" if criteria.tax_free_growth else "No"}
         - Investment goal: {criteria.goal or 'Not specified'}
         
-        I have found these potential investment products:
+        These products have already been ranked for the client, best first. Each has a
+        match_score (0-100) and an allocation percentage that are final; do not change
+        or re-rank them:
         {products_str}
         
-        Based on the client's criteria and these products:
-        1. Rank these products from most to least suitable for the client
-        2. For each product, explain why it matches or doesn't match the client's needs
-        3. Add any missing information to make these recommendations more helpful
-        4. Suggest a recommended allocation percentage for each product
+        For each product, in the same order, explain why it does or doesn't suit the
+        client. Don't quote its exact score, allocation or rupee amounts, as those are
+        recalculated for clients with similar criteria.
         
         Format your response as a JSON array of objects with these fields:
-        - id: the product ID
-        - name: the product name
-        - type: the product type/category
-        - return: expected return percentage
-        - risk: risk level (Low/Moderate/High)
-        - timeHorizon: recommended time horizon
-        - expenseRatio: expense ratio percentage
-        - minInvestment: minimum investment amount
-        - match_score: a score from 1-100 indicating how well it matches the client's criteria
-        - allocation: recommended allocation percentage (should sum to 100%)
-        - reasoning: explanation of why this product is suitable
+        - id: the product ID, exactly as given
+        - reasoning: explanation of why this product is or isn't suitable
         - pros: list of advantages of this product for the client
         - cons: list of disadvantages of this product for the client
         """
     
-    def _parse_recommendations(self, response: str, base_products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Parse the AI response into structured recommendations"""
-        try:
-            json_start = response.find('[')
-            json_end = response.rfind(']') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = response[json_start:json_end]
-                recommendations = json.loads(json_str)
-                
-                validated_recs = []
-                for rec in recommendations:
-                    if 'id' in rec and 'name' in rec:
-                        validated_recs.append(rec)
-                
-                if validated_recs:
-                    return validated_recs
-            
-            logger.warning("Could not parse AI recommendations, using base products")
-            return base_products
-            
-        except Exception as e:
-            logger.error(f"Error parsing recommendations: {str(e)}")
-            return base_products
-    
     def _build_comparison_prompt(self, products: List[Dict[str, Any]], factors: List[str]) -> str:
         """Build prompt for product comparison"""
         products_str = json.dumps(products, indent=2)
@@ -469,26 +489,6 @@ class InvestmentProductAI:
         - best_for: categories of investors and which product is best for them
         """
     
-    def _parse_comparison(self, response: str, products: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Parse the AI response into structured comparison data"""
-        try:
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = response[json_start:json_end]
-                comparison_data = json.loads(json_str)
-                
-                if 'products' in comparison_data and 'comparison_table' in comparison_data:
-                    return comparison_data
-                
-            logger.warning("Could not parse AI comparison, using basic comparison")
-            return self._generate_basic_comparison(products)
-            
-        except Exception as e:
-            logger.error(f"Error parsing comparison: {str(e)}")
-            return self._generate_basic_comparison(products)
-    
     def _generate_basic_comparison(self, products: List[Dict[str, Any]], factors: List[str] = None) -> Dict[str, Any]:
         """Generate a basic comparison when AI parsing fails"""
         if not factors:
@@ -515,6 +515,32 @@ class InvestmentProductAI:
             "best_for": {"General investing": products[0]["name"] if products else "No recommendation"}
         }
     
+    def _build_batch_explanation_prompt(self, products: List[Dict[str, Any]], user_context: Dict[str, Any]) -> str:
+        """Build prompt for explaining several products in one response"""
+        # Images and raw specs only cost tokens here
+        products_str = json.dumps([{key: value for key, value in product.items() if key not in ("images", "specs")}
+                                   for product in products], indent=2)
+        context_str = json.dumps(user_context, indent=2)
+        
+        return f"""
+        As a financial advisor, explain to an investor what each of these investment products
+        offers them:
+        {products_str}
+        
+        User context:
+        {context_str}
+        
+        Give a balanced view of each product on its own terms: its key benefits, what to watch
+        out for, and who it suits. Keep the language clear and jargon-free.
+        
+        Format your response as a JSON array with one object per product, with these fields:
+        - id: the product ID, exactly as given
+        - summary: a brief overview of the product and its key benefits (2-3 sentences)
+        - benefits: an array of specific benefits (3-5 items)
+        - considerations: an array of important considerations or potential drawbacks (2-4 items)
+        - ideal_for: a description of the ideal investor profile for this product
+        """
+    
     def _build_benefits_prompt(self, product: Dict[str, Any], user_context: Dict[str, Any]) -> str:
         """Build prompt for explaining product benefits"""
         product_str = json.dumps(product, indent=2)
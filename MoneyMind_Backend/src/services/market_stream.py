@@ -0,0 +1,105 @@
+import asyncio
+import logging
+
+from config import settings
+from src.core.http import json_bytes
+from src.services.markets_snapshot import markets_snapshot
+
+logger = logging.getLogger(__name__)
+
+def _quotes_by_symbol(market_trends: list) -> dict:
+    return {item.get("stock"): item for trend in market_trends for item in trend.get("results", []) if item.get("stock")}
+
+def _layout(market_trends: list) -> list:
+    """Which symbols each trend section lists, in order."""
+    return [(trend.get("title"), [item.get("stock") for item in trend.get("results", [])]) for trend in market_trends]
+
+class MarketStreamHub:
+    """
+    Fan-out hub for the live market ticker. One refresher task reads the shared
+    markets snapshot every interval while anyone is connected and broadcasts
+    only the quotes that changed. Each frame is encoded once and the same string
+    is queued for every subscriber, so per-client cost is a queue put. A client
+    that falls behind has its backlog dropped and is resynced with a snapshot.
+    """
+
+    def __init__(self, interval_seconds: float = settings.MARKET_STREAM_INTERVAL_SECONDS,
+                 queue_size: int = settings.MARKET_STREAM_QUEUE_SIZE,
+                 heartbeat_seconds: float = settings.MARKET_STREAM_HEARTBEAT_SECONDS):
+        self.interval_seconds = interval_seconds
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscribers = set()
+        self._market_trends = None
+        self._seq = 0
+        self._task = None
+        self.frames_sent = 0
+        self.resyncs = 0
+
+    def _snapshot_frame(self) -> tuple:
+        return "snapshot", json_bytes({"seq": self._seq, "market_trends": self._market_trends}).decode()
+
+    def _offer(self, queue: asyncio.Queue, frame: tuple):
+        try:
+            queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(self._snapshot_frame())
+            self.resyncs += 1
+
+    def _broadcast(self, frame: tuple):
+        for queue in self._subscribers:
+            self._offer(queue, frame)
+        self.frames_sent += len(self._subscribers)
+
+    def _apply(self, market_trends: list):
+        """Updates the current state and broadcasts a diff (or a snapshot if the layout changed)."""
+        previous = self._market_trends
+        self._market_trends = market_trends
+        if previous is None or _layout(previous) != _layout(market_trends):
+            self._seq += 1
+            self._broadcast(self._snapshot_frame())
+            return
+        old_quotes = _quotes_by_symbol(previous)
+        changed = {symbol: item for symbol, item in _quotes_by_symbol(market_trends).items()
+                   if old_quotes.get(symbol) != item}
+        if changed:
+            self._seq += 1
+            self._broadcast(("diff", json_bytes({"seq": self._seq, "quotes": changed}).decode()))
+
+    async def _run(self):
+        while self._subscribers:
+            try:
+                snapshot = await markets_snapshot.get()
+                self._apply(snapshot["market_trends"])
+            except Exception as e:
+                logger.error(f"Market stream refresh failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+        self._task = None
+
+    async def subscribe(self):
+        """
+        Yields (event, json data) frames for one client, starting with a full
+        snapshot; ("ping", None) when nothing was sent for heartbeat_seconds.
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        if self._market_trends is not None:
+            queue.put_nowait(self._snapshot_frame())
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield "ping", None
+        finally:
+            self._subscribers.discard(queue)
+
+    def stats(self) -> dict:
+        return {"subscribers": len(self._subscribers), "seq": self._seq,
+                "frames_sent": self.frames_sent, "resyncs": self.resyncs}
+
+market_stream = MarketStreamHub()
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import logging
+import re
+import time
+
+from config import settings
+from src.core.cache import StaleWhileRevalidateCache
+from src.data_manager.article_store import article_store
+from src.data_manager.market_history import market_history
+from src.services.serpapi_cache import SerpApiCache
+from src.services.serpapi_transport import serpapi_transport
+
+logger = logging.getLogger(__name__)
+
+MARKETS_PARAMS = {"engine": "google_finance_markets", "trend": "indexes"}
+
+_MARKET_SUBJECT = re.compile(r"\b(nifty|sensex|bse|nse|stock market|share market|market|indices|indexes)\b", re.IGNORECASE)
+# Explicit quote/status words; time words alone ("today", "now") don't count
+_MARKET_STATUS = re.compile(r"\b(status|performance|level|levels|points|close|closing|quote|quotes|doing|trading)\b",
+                            re.IGNORECASE)
+_NEWS_REQUEST = re.compile(r"\b(news|headlines?|articles?|stories)\b", re.IGNORECASE)
+_INDIAN_INDEX = re.compile(r"nifty|sensex|bse|nse|india", re.IGNORECASE)
+
+def is_market_status_query(query: str) -> bool:
+    """
+    True for 'how is the market doing' style queries, e.g. 'Sensex current status';
+    anything asking for news, headlines or articles stays a news search.
+    """
+    query = query or ""
+    return (bool(_MARKET_SUBJECT.search(query)) and bool(_MARKET_STATUS.search(query))
+            and not _NEWS_REQUEST.search(query))
+
+class MarketsSnapshot:
+    """
+    One shared in-memory snapshot of the Google Finance markets page. A single
+    google_finance_markets request per refresh interval feeds both its slices:
+    the trending news (news_results) and the index quotes (market_trends). The
+    snapshot lives on the SerpApi transport loop so async routes and sync tool
+    calls share the same copy and refresh.
+    """
+
+    def __init__(self, transport=serpapi_transport,
+                 refresh_seconds: float = settings.MARKETS_SNAPSHOT_REFRESH_SECONDS,
+                 max_age_seconds: float = settings.MARKETS_SNAPSHOT_MAX_AGE_SECONDS):
+        self.transport = transport
+        self._cache = StaleWhileRevalidateCache(refresh_seconds, max_age_seconds, max_entries=1)
+
+    @staticmethod
+    def _parse_news(data: dict) -> list:
+        return [
+            {
+                "title": article.get("snippet", "No Title"),
+                "description": article.get("snippet", ""),
+                "url": article.get("link", ""),
+                "urlToImage": article.get("thumbnail", ""),
+                "publishedAt": article.get("date", ""),
+                "source": {"name": article.get("source", "Unknown Source")},
+                "category": "Trending"
+            }
+            for article in data.get("news_results", [])
+        ]
+
+    async def _fetch(self) -> dict:
+        data = await self.transport.search(MARKETS_PARAMS)
+        if "error" in data and not SerpApiCache.is_empty(data):
+            raise ValueError(data["error"])
+        fetched_at = time.time()
+        news = await asyncio.to_thread(article_store.ingest, self._parse_news(data))
+        try:
+            await asyncio.to_thread(market_history.record, data.get("market_trends", []), fetched_at)
+        except OSError as e:
+            logger.error(f"Failed to record market history: {e}")
+        logger.info("Markets snapshot refreshed")
+        return {"news": news, "market_trends": data.get("market_trends", []), "fetched_at": fetched_at}
+
+    async def _get(self) -> dict:
+        return await self._cache.get("indexes", self._fetch)
+
+    async def get(self) -> dict:
+        """The current snapshot ({news, market_trends, fetched_at}); raises ValueError if unavailable."""
+        return await asyncio.wrap_future(self.transport.submit(self._get()))
+
+    def get_sync(self) -> dict:
+        """Blocking variant of get() for sync callers (e.g. Gemini tool functions)."""
+        return self.transport.submit(self._get()).result()
+
+    def market_status(self, max_items: int = 10) -> str:
+        """Index quotes as a JSON list in search-result shape, Indian indexes first, for the news tool."""
+        quotes = []
+        for trend in self.get_sync()["market_trends"]:
+            for item in trend.get("results", []):
+                movement = item.get("price_movement", {})
+                quotes.append({
+                    "title": f"{item.get('name', item.get('stock', ''))}: {item.get('price', '')}",
+                    "snippet": f"{movement.get('movement', '')} {movement.get('value', '')} "
+                               f"({movement.get('percentage', '')}%)".strip(),
+                    "source": "Google Finance",
+                    "link": item.get("link", ""),
+                })
+        quotes.sort(key=lambda quote: not _INDIAN_INDEX.search(quote["title"]))
+        return json.dumps(quotes[:max_items])
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+markets_snapshot = MarketsSnapshot()
@@ -0,0 +1,69 @@
+import logging
+import threading
+
+from config import settings
+from src.core.metrics import LatencyWindow
+
+logger = logging.getLogger(__name__)
+
+class ModelRouter:
+    """
+    Chooses a Gemini model per task class and degrades to lighter models
+    when the observed p95 latency or error rate of a model exceeds its budget.
+    """
+
+    def __init__(self,
+                 task_models=settings.GEMINI_TASK_MODELS,
+                 p95_budgets=settings.GEMINI_TASK_P95_BUDGET_SECONDS,
+                 max_error_rate=settings.GEMINI_MAX_ERROR_RATE,
+                 min_samples=settings.GEMINI_ROUTER_MIN_SAMPLES):
+        self.task_models = task_models
+        self.p95_budgets = p95_budgets
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def _window(self, model_name: str) -> LatencyWindow:
+        with self._lock:
+            if model_name not in self._windows:
+                self._windows[model_name] = LatencyWindow(
+                    max_samples=settings.GEMINI_ROUTER_WINDOW_SIZE,
+                    max_age_seconds=settings.GEMINI_ROUTER_WINDOW_SECONDS,
+                )
+            return self._windows[model_name]
+
+    def record(self, model_name: str, latency_seconds: float, ok: bool = True):
+        """Records the outcome of one call made with model_name."""
+        self._window(model_name).record(latency_seconds, ok)
+
+    def _is_healthy(self, model_name: str, budget: float | None) -> bool:
+        window = self._window(model_name)
+        if window.count() < self.min_samples:
+            return True
+        if window.error_rate() > self.max_error_rate:
+            return False
+        p95 = window.p95()
+        return budget is None or p95 is None or p95 <= budget
+
+    def choose(self, task: str | None = None) -> str:
+        """Returns the model to use for the given task class."""
+        task = task if task in self.task_models else settings.DEFAULT_GEMINI_TASK
+        candidates = self.task_models.get(task) or [settings.GEMINI_FAST_MODEL]
+        budget = self.p95_budgets.get(task)
+
+        for model_name in candidates:
+            if self._is_healthy(model_name, budget):
+                if model_name != candidates[0]:
+                    logger.warning(f"Model router: degrading task '{task}' from {candidates[0]} to {model_name}.")
+                return model_name
+
+        # Nothing within budget: fall back to whichever candidate is currently fastest.
+        fastest = min(candidates, key=lambda m: self._window(m).p95() or 0.0)
+        logger.warning(f"Model router: no model within budget for task '{task}', using fastest: {fastest}.")
+        return fastest
+
+    def stats(self) -> dict:
+        with self._lock:
+            names = list(self._windows)
+        return {name: self._window(name).snapshot() for name in names}
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import time
+
+from config import settings
+from src.data_manager.article_store import article_store
+from src.services.news_service import NewsApiService, NewsFetchError
+from src.services.serpapi_quota import PREFETCH
+
+logger = logging.getLogger(__name__)
+
+class NewsIngestionPipeline:
+    """
+    Scheduled pull of the configured news categories and the trending feed into
+    the article store, so /api/news/search can be answered from the local
+    full-text index. Runs at prefetch quota priority; popular user topics are
+    ingested by the news prefetcher.
+    """
+
+    def __init__(self, news_service: NewsApiService | None = None,
+                 feeds=None, interval_seconds: float = settings.NEWS_INGEST_INTERVAL_SECONDS):
+        self.news_service = news_service or NewsApiService()
+        self.feeds = feeds or ["trending", *settings.NEWS_CATEGORIES]
+        self.interval_seconds = interval_seconds
+        self.runs = 0
+        self.last_run = None
+        self.last_counts = {}
+        self._task = None
+
+    async def run_once(self):
+        counts = {}
+        for feed in self.feeds:
+            try:
+                articles = await self.news_service.get_specific_news(feed, priority=PREFETCH)
+                counts[feed] = len(articles)
+            except NewsFetchError as e:
+                logger.warning(f"News ingestion skipped '{feed}': {e}")
+                counts[feed] = 0
+        self.runs += 1
+        self.last_run = time.time()
+        self.last_counts = counts
+        logger.info(f"News ingestion run {self.runs}: {counts}")
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"News ingestion run failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        """Starts the periodic ingestion on the running event loop (call from app startup)."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"News ingestion started ({len(self.feeds)} feeds every {self.interval_seconds}s).")
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "last_run": self.last_run,
+            "last_counts": self.last_counts,
+            "index_enabled": article_store.fts_enabled,
+        }
+
+news_ingestion = NewsIngestionPipeline()
@@ -0,0 +1,105 @@
+import datetime
+import logging
+import time
+
+import numpy as np
+
+from config import settings
+from src.core.cache import TTLCache
+from src.core.term_vectors import tokenize, hashed_indices, SparseTermMatrix
+from src.data_manager.article_store import article_store
+from src.data_manager.json_manager import json_manager
+from src.services.news_prefetcher import IGNORED_TOPICS, normalize_topic
+
+logger = logging.getLogger(__name__)
+
+class NewsPersonalizer:
+    """
+    Ranks stored articles for a user. The user's interests (news topics, liked
+    companies, recent news requests and any interests sent with the request) are
+    folded into a hashed term vector with recency-decayed weights; candidate
+    articles form a sparse hashed term matrix, and one matrix-vector product
+    scores them all.
+    """
+
+    def __init__(self, dim: int = settings.NEWS_VECTOR_DIM):
+        self.dim = dim
+        # Term columns per article id, so repeat candidates are not re-tokenized
+        self._article_columns = TTLCache(max_entries=settings.NEWS_PERSONALIZED_CANDIDATES * 4,
+                                         ttl_seconds=settings.NEWS_SEARCH_MAX_AGE_SECONDS)
+
+    def _weighted_interests(self, user_data: dict, interests: list) -> list:
+        """(phrase, weight) pairs; older interests count for less."""
+        decay = settings.NEWS_INTEREST_DECAY
+        preferences = user_data.get("preferences", {})
+        weighted = [(interest, 1.0) for interest in interests]
+
+        topics = [t for t in preferences.get("news_interaction_topics", [])
+                  if t and normalize_topic(t) not in IGNORED_TOPICS]
+        weighted += [(topic, decay ** age) for age, topic in enumerate(reversed(topics))]
+        companies = preferences.get("liked_companies", [])
+        weighted += [(company, settings.NEWS_LIKED_COMPANY_WEIGHT * decay ** age)
+                     for age, company in enumerate(reversed(companies))]
+
+        now = datetime.datetime.now()
+        half_life = settings.NEWS_INTEREST_HALF_LIFE_DAYS
+        for entry in user_data.get("history", {}).get("news_log", [])[-50:]:
+            topic = entry.get("topic_identified_for_log", "")
+            if not topic or normalize_topic(topic) in IGNORED_TOPICS or entry.get("unexpected_failure"):
+                continue
+            try:
+                age_days = (now - datetime.datetime.fromisoformat(entry["timestamp"])).total_seconds() / 86400
+            except (KeyError, ValueError):
+                continue
+            weighted.append((topic, 0.5 ** (max(age_days, 0.0) / half_life)))
+        return weighted
+
+    def interest_vector(self, user_data: dict, interests: list) -> np.ndarray:
+        vector = np.zeros(self.dim)
+        for phrase, weight in self._weighted_interests(user_data, interests):
+            columns = hashed_indices(tokenize(phrase), self.dim)
+            np.add.at(vector, columns, weight)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _columns(self, article: dict) -> np.ndarray:
+        columns = self._article_columns.get(article["id"])
+        if columns is None:
+            columns = np.unique(hashed_indices(tokenize(f"{article['title']} {article['description']}"), self.dim))
+            self._article_columns.set(article["id"], columns)
+        return columns
+
+    def rank(self, user_data: dict, interests: list, limit: int = 10) -> list:
+        """The top-limit stored articles for the user; most recent ones if there are no interests."""
+        candidates = article_store.candidates(settings.NEWS_PERSONALIZED_CANDIDATES,
+                                              max_age_seconds=settings.NEWS_SEARCH_MAX_AGE_SECONDS)
+        if not candidates:
+            return []
+        articles = [article for article, _ in candidates]
+        vector = self.interest_vector(user_data, interests)
+        if not vector.any():
+            return articles[:limit]
+
+        matrix = SparseTermMatrix([self._columns(article) for article in articles])
+        relevance = matrix.dot(vector) / np.sqrt(np.maximum(matrix.lengths, 1))
+        age_hours = (time.time() - np.array([seen for _, seen in candidates])) / 3600
+        recency = np.exp2(-age_hours / settings.NEWS_RECENCY_HALF_LIFE_HOURS)
+        scores = relevance * (1.0 + settings.NEWS_RECENCY_WEIGHT * recency)
+
+        top = min(limit, len(articles))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+        ranked = [dict(articles[i], score=round(float(scores[i]), 4)) for i in best if scores[i] > 0]
+        if len(ranked) < top:
+            # Pad with the most recent unmatched articles
+            chosen = {article["id"] for article in ranked}
+            ranked += [article for article in articles if article["id"] not in chosen][:top - len(ranked)]
+        return ranked
+
+    def rank_for_user(self, user_id: str | None, interests: list, limit: int = 10) -> list:
+        user_data = {}
+        if user_id and json_manager.user_exists(user_id):
+            user_data = json_manager.load_user_data(user_id)
+        return self.rank(user_data, interests, limit)
+
+news_personalizer = NewsPersonalizer()
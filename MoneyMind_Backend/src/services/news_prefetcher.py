@@ -0,0 +1,106 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+import re
+from collections import Counter
+
+from config import settings
+from src.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Words that don't change which news a topic query is about
+_TOPIC_FILLER_WORDS = {
+    "news", "latest", "recent", "today", "todays", "current", "update", "updates", "headlines",
+    "india", "indian", "about", "on", "for", "in", "of", "the", "and",
+}
+
+def normalize_topic(text: str) -> str:
+    """Reduces a topic or tool query to its key words, e.g. 'Latest RBI news India' -> 'rbi'."""
+    words = re.findall(r"[a-z0-9&.]+", (text or "").lower())
+    return " ".join(word for word in words if word not in _TOPIC_FILLER_WORDS)
+
+# Placeholders news_agent logs when it could not identify a topic, normalized;
+# compare normalize_topic(topic) against these
+IGNORED_TOPICS = {normalize_topic(topic) for topic in
+                  ("Unknown/General", "General Financial Topic", "General Financial News", "Error")}
+
+class NewsPrefetcher:
+    """
+    Keeps news for the most popular topics warm. On a schedule it aggregates
+    preferences.news_interaction_topics across all user files, fetches news for
+    the top-K topics at prefetch priority and serves matching get_financial_news
+    tool calls from memory.
+    """
+
+    def __init__(self, data_dir=settings.DATA_DIR, top_k: int = settings.NEWS_PREFETCH_TOP_K,
+                 interval_seconds: float = settings.NEWS_PREFETCH_INTERVAL_SECONDS):
+        self.data_dir = data_dir
+        self.top_k = top_k
+        self.interval_seconds = interval_seconds
+        self.warm = TTLCache(max_entries=max(top_k, 1) * 2, ttl_seconds=settings.NEWS_PREFETCH_TTL_SECONDS)
+        self.topics = []
+        self.refreshes = 0
+        self._task = None
+
+    def aggregate_topics(self) -> list:
+        """Most common normalized topics across users, counted once per user."""
+        counts = Counter()
+        for path in glob.glob(os.path.join(self.data_dir, "user_*_data.json")):
+            try:
+                with open(path, 'r') as f:
+                    user_data = json.load(f)
+            except (IOError, ValueError) as e:
+                logger.warning(f"Skipping unreadable user file {path}: {e}")
+                continue
+            topics = user_data.get("preferences", {}).get("news_interaction_topics", [])
+            normalized = {normalize_topic(topic) for topic in topics}
+            counts.update(topic for topic in normalized if topic and topic not in IGNORED_TOPICS)
+        return [topic for topic, users in counts.most_common(self.top_k)
+                if users >= settings.NEWS_PREFETCH_MIN_USERS]
+
+    def refresh(self, fetch):
+        """Fetches news for the current top topics with fetch(topic) -> JSON string."""
+        self.topics = self.aggregate_topics()
+        warmed = 0
+        for topic in self.topics:
+            try:
+                results = fetch(topic)
+            except Exception as e:
+                logger.error(f"News prefetch failed for '{topic}': {e}")
+                continue
+            if results and results != "[]":
+                self.warm.set(topic, results)
+                warmed += 1
+        self.refreshes += 1
+        logger.info(f"News prefetch warmed {warmed}/{len(self.topics)} popular topics.")
+
+    def lookup(self, query: str):
+        """The prefetched JSON string for a tool query about a popular topic, or None."""
+        return self.warm.get(normalize_topic(query))
+
+    async def _run(self, fetch):
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh, fetch)
+            except Exception as e:
+                logger.error(f"News prefetch run failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self, fetch):
+        """Starts the periodic refresh on the running event loop (call from app startup)."""
+        if self._task is None and self.top_k > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run(fetch))
+            logger.info(f"News prefetcher started (top {self.top_k} topics every {self.interval_seconds}s).")
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"topics": self.topics, "refreshes": self.refreshes, "warm": self.warm.stats()}
+
+news_prefetcher = NewsPrefetcher()
@@ -0,0 +1,142 @@
+import logging
+
+import numpy as np
+
+from config import settings
+from src.core.term_vectors import tokenize, SparseTermMatrix
+from src.data_manager.article_store import article_store
+
+logger = logging.getLogger(__name__)
+
+# Bump when LEXICON changes so cached article scores are recomputed
+LEXICON_VERSION = 1
+
+# Finance-tuned term polarities in [-1, 1]; phrases are matched as word bigrams
+LEXICON = {
+    # Positive
+    "gain": 0.6, "gains": 0.6, "gained": 0.6, "rise": 0.5, "rises": 0.5, "rose": 0.5, "rising": 0.4,
+    "surge": 0.8, "surges": 0.8, "surged": 0.8, "soar": 0.8, "soars": 0.8, "soared": 0.8, "jump": 0.6,
+    "jumps": 0.6, "jumped": 0.6, "rally": 0.7, "rallies": 0.7, "rallied": 0.7, "climb": 0.5, "climbs": 0.5,
+    "climbed": 0.5, "high": 0.3, "record": 0.4, "boost": 0.6, "boosts": 0.6, "boosted": 0.6,
+    "growth": 0.5, "grow": 0.4, "grows": 0.4, "grew": 0.4, "profit": 0.6, "profits": 0.6,
+    "profitable": 0.6, "beat": 0.6, "beats": 0.6, "upgrade": 0.7, "upgrades": 0.7, "upgraded": 0.7,
+    "outperform": 0.6, "bullish": 0.8, "strong": 0.5, "stronger": 0.5, "robust": 0.5, "recovery": 0.5,
+    "recovers": 0.5, "rebound": 0.5, "rebounds": 0.5, "optimism": 0.6, "optimistic": 0.6,
+    "approval": 0.4, "approves": 0.4, "approved": 0.4, "dividend": 0.3, "buyback": 0.4, "expansion": 0.4,
+    "expands": 0.4, "upbeat": 0.6, "positive": 0.5, "inflows": 0.4, "win": 0.5, "wins": 0.5,
+    "raised": 0.3, "funding": 0.3, "milestone": 0.4, "improve": 0.4, "improves": 0.4, "improved": 0.4,
+    "rate cut": 0.5, "rate cuts": 0.5, "time high": 0.7, "record high": 0.7, "beats estimates": 0.8,
+    "higher": 0.4, "green": 0.2,
+    # Negative
+    "fall": -0.5, "falls": -0.5, "fell": -0.5, "falling": -0.4, "drop": -0.5, "drops": -0.5,
+    "dropped": -0.5, "decline": -0.5, "declines": -0.5, "declined": -0.5, "slump": -0.7, "slumps": -0.7,
+    "plunge": -0.8, "plunges": -0.8, "plunged": -0.8, "crash": -0.9, "crashes": -0.9, "crashed": -0.9,
+    "tumble": -0.7, "tumbles": -0.7, "tumbled": -0.7, "slide": -0.5, "slides": -0.5, "sink": -0.6,
+    "sinks": -0.6, "sank": -0.6, "low": -0.3, "loss": -0.6, "losses": -0.6, "lose": -0.5, "loses": -0.5,
+    "miss": -0.6, "misses": -0.6, "missed": -0.6, "downgrade": -0.7, "downgrades": -0.7,
+    "downgraded": -0.7, "underperform": -0.6, "bearish": -0.8, "weak": -0.5, "weaker": -0.5,
+    "weakness": -0.5, "recession": -0.8, "slowdown": -0.6, "inflation": -0.3, "default": -0.8,
+    "defaults": -0.8, "fraud": -0.9, "scam": -0.9, "probe": -0.5, "penalty": -0.6, "fine": -0.3,
+    "fined": -0.6, "lawsuit": -0.5, "ban": -0.5, "bans": -0.5, "banned": -0.6, "layoffs": -0.7,
+    "layoff": -0.7, "cuts jobs": -0.7, "bankruptcy": -0.9, "bankrupt": -0.9, "insolvency": -0.8,
+    "selloff": -0.7, "sell off": -0.7, "outflows": -0.4, "volatile": -0.3, "volatility": -0.3,
+    "concern": -0.4, "concerns": -0.4, "fear": -0.6, "fears": -0.6, "risk": -0.3, "risks": -0.3,
+    "uncertainty": -0.4, "pessimism": -0.6, "negative": -0.5, "warning": -0.5, "warns": -0.5,
+    "crisis": -0.8, "debt": -0.3, "tariff": -0.3, "tariffs": -0.3, "lower": -0.4, "red": -0.2,
+    "rate hike": -0.4, "rate hikes": -0.4, "profit booking": -0.4, "misses estimates": -0.8,
+    "week low": -0.6, "record low": -0.7,
+}
+
+# Words that flip the polarity of the next few terms
+_NEGATORS = {"not", "no", "never", "nor", "without", "cannot", "hardly", "isn't", "aren't", "wasn't",
+             "weren't", "doesn't", "don't", "didn't", "won't", "can't", "fails", "failed"}
+_NEGATION_WINDOW = 3
+
+class NewsSentimentScorer:
+    """
+    Scores headlines and snippets against LEXICON without any model call. Every
+    text in a batch becomes a row of a sparse document x vocabulary matrix whose
+    entries are +1, or -1 when a negator precedes the term, so one product with
+    the lexicon weights scores the whole batch. Raw sums are squashed into
+    [-1, 1] with raw / sqrt(raw^2 + alpha).
+    """
+
+    def __init__(self, lexicon: dict = LEXICON, alpha: float = settings.NEWS_SENTIMENT_ALPHA,
+                 neutral_band: float = settings.NEWS_SENTIMENT_NEUTRAL_BAND):
+        self.vocabulary = {term: column for column, term in enumerate(lexicon)}
+        self.weights = np.fromiter(lexicon.values(), dtype=float, count=len(lexicon))
+        self.alpha = alpha
+        self.neutral_band = neutral_band
+
+    def _terms(self, text: str) -> tuple:
+        """Vocabulary columns of the lexicon terms in text and their negation signs."""
+        words = tokenize(text, bigrams=False)
+        columns, signs = [], []
+        negated_until = -1
+        for position, word in enumerate(words):
+            if word in _NEGATORS or word.endswith("n't"):
+                negated_until = position + _NEGATION_WINDOW
+                continue
+            sign = -1.0 if position <= negated_until else 1.0
+            for term in (word, f"{words[position - 1]} {word}" if position else None):
+                if term in self.vocabulary:
+                    columns.append(self.vocabulary[term])
+                    signs.append(sign)
+        return np.array(columns, dtype=np.int64), np.array(signs)
+
+    def score_texts(self, texts: list) -> np.ndarray:
+        """Compound scores in [-1, 1], one per text."""
+        if not texts:
+            return np.empty(0)
+        columns, signs = zip(*(self._terms(text) for text in texts))
+        raw = SparseTermMatrix(list(columns), list(signs)).dot(self.weights)
+        return raw / np.sqrt(raw * raw + self.alpha)
+
+    def label(self, score: float) -> dict:
+        if score >= self.neutral_band:
+            sentiment = "positive"
+        elif score <= -self.neutral_band:
+            sentiment = "negative"
+        else:
+            sentiment = "neutral"
+        return {"sentiment": sentiment, "score": round(score, 4), "confidence": round(0.5 + abs(score) / 2, 4)}
+
+    def score_items(self, items: list) -> list:
+        """
+        Sentiment for items of {id?, text?} in request order. Stored articles are
+        looked up by id and their scores cached in the article store; items with
+        only text (or an unknown id) are scored from the text.
+        """
+        ids = [item.get("id") for item in items if item.get("id")]
+        cached = article_store.get_sentiments(ids, LEXICON_VERSION)
+        missing = [article_id for article_id in dict.fromkeys(ids) if article_id not in cached]
+        stored = {article["id"]: article for article in article_store.get_many(missing)}
+
+        texts, targets = [], []
+        for index, item in enumerate(items):
+            if item.get("id") in cached:
+                continue
+            article = stored.get(item.get("id"))
+            if article is not None:
+                texts.append(f"{article['title']}. {article['description']}")
+            else:
+                texts.append(item.get("text") or "")
+            targets.append(index)
+
+        scores = self.score_texts(texts)
+        fresh = {}
+        results = [None] * len(items)
+        for index, score in zip(targets, scores.tolist()):
+            article_id = items[index].get("id")
+            if article_id in stored:
+                fresh[article_id] = score
+            results[index] = score
+        if fresh:
+            article_store.set_sentiments(fresh, LEXICON_VERSION)
+
+        return [
+            dict(id=item.get("id"), **self.label(cached[item["id"]] if results[index] is None else results[index]))
+            for index, item in enumerate(items)
+        ]
+
+news_sentiment = NewsSentimentScorer()
@@ -1,24 +1,49 @@
 # src/services/news_service.py
+import asyncio
 import logging
-import json
-import requests
 from config import settings
+from src.data_manager.article_store import article_store
+from src.services.serpapi_transport import serpapi_transport
+from src.services.serpapi_quota import APP
+from src.services.serpapi_cache import SerpApiCache
+from src.services.markets_snapshot import markets_snapshot
 
 logger = logging.getLogger(__name__)
 
-# SerpAPI configuration
-SERPAPI_KEY = "97cefd646ce3aa29f9f42bc52fe8962fd749733acb7311472f322210256697ee" 
-SERPAPI_BASE_URL = "https://serpapi.com/search.json"
+class NewsFetchError(Exception):
+    """Raised when news could not be fetched and nothing usable is stored."""
 
 class NewsApiService:
-    def __init__(self, api_key=SERPAPI_KEY):
+    def __init__(self, api_key=settings.SERPAPI_API_KEY, transport=serpapi_transport):
         self.api_key = api_key
+        self.transport = transport
         if self.api_key:
             logger.info("SerpAPI News Service Initialized")
         else:
             logger.warning("SerpAPI key not provided, service may not work properly")
+
+    async def _get_json(self, params: dict, priority: str = APP) -> dict:
+        """
+        Performs a SerpAPI request through the shared transport. Raises ValueError for
+        upstream errors; "no results" responses come back as an empty result.
+        """
+        data = await self.transport.search(params, priority=priority)
+        if "error" in data and not SerpApiCache.is_empty(data):
+            raise ValueError(data["error"])
+        return data
+
+    @staticmethod
+    async def _stored_or_raise(category: str, error: str, limit: int | None = None) -> list:
+        """Already-fetched articles for the category when upstream fails, else NewsFetchError."""
+        stored = await asyncio.to_thread(article_store.recent, category=category, limit=limit or 20,
+                                         max_age_seconds=settings.ARTICLE_STALE_FALLBACK_SECONDS)
+        if stored:
+            logger.warning(f"Serving {len(stored)} stored '{category}' articles instead: {error}")
+            return stored
+        raise NewsFetchError(error)
     
-    def get_specific_news(self, query: str, country: str = "in", language: str = "en") -> str:
+    async def get_specific_news(self, query: str, country: str = "in", language: str = "en",
+                                limit: int | None = None, priority: str = APP) -> list:
         """
         Fetches news from SerpAPI Google News.
         
@@ -26,26 +51,37 @@ class NewsApiService:
             query: The search term (company, topic, or category).
             country: Country code (e.g., 'in' for India).
             language: Language code (e.g., 'en' for English).
+            limit: Maximum number of articles to parse and return (None for all).
+            priority: SerpApi quota class of the request.
         
         Returns:
-            A JSON string containing news results, or an error message.
+            A list of articles. Raises NewsFetchError if news could not be fetched.
         """
         if not self.api_key:
-            return json.dumps({"error": "API key not configured."})
+            raise NewsFetchError("API key not configured.")
         
-        try:
-            if query.lower() == "trending":
-                return self.get_finance_news()
-            elif query.lower() in ["investments", "market & economy", "startups", "business & fintech"]:
-                return self.get_google_news(f"finance {query}")
-            else:
-                return self.get_google_news(query, country, language)
-                
-        except Exception as e:
-            logger.error(f"Unexpected error in NewsApiService: {e}")
-            return json.dumps({"error": f"Failed to fetch news: {e}"})
+        if query.lower() == "trending":
+            return await self.get_finance_news(limit)
+        elif query.lower() in settings.NEWS_CATEGORIES:
+            return await self.get_google_news(f"finance {query}", limit=limit, priority=priority)
+        else:
+            return await self.get_google_news(query, country, language, limit, priority)
+
+    async def search_news(self, query: str, country: str = "in", language: str = "en", limit: int = 10) -> list:
+        """
+        Searches the local full-text index of ingested articles, going to SerpAPI
+        only when the index has too few recent matches (which also indexes them).
+        """
+        if query.lower() != "trending" and query.lower() not in settings.NEWS_CATEGORIES:
+            indexed = await asyncio.to_thread(article_store.search, query, limit,
+                                              max_age_seconds=settings.NEWS_SEARCH_MAX_AGE_SECONDS)
+            if len(indexed) >= min(limit, settings.NEWS_SEARCH_MIN_INDEX_HITS):
+                return indexed
+            logger.info(f"News index miss for '{query}' ({len(indexed)} hits), searching upstream")
+        return await self.get_specific_news(query, country, language, limit)
     
-    def get_google_news(self, query: str, country: str = "in", language: str = "en") -> str:
+    async def get_google_news(self, query: str, country: str = "in", language: str = "en",
+                              limit: int | None = None, priority: str = APP) -> list:
         """Fetch news from Google News via SerpAPI"""
         try:
             params = {
@@ -53,93 +89,45 @@ class NewsApiService:
                 "q": query,
                 "gl": country,
                 "hl": language,
-                "api_key": self.api_key
             }
             
-            response = requests.get(SERPAPI_BASE_URL, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = await self._get_json(params, priority)
             logger.info(f"Successfully fetched Google News for query: {query}")
             
-            # Extract and transform the news results
+            # Extract and transform only the news results that will be returned
             news_articles = []
-            if "news_results" in data:
-                for article in data["news_results"]:
-                    transformed_article = {
-                        "title": article.get("title", "No Title"),
-                        "description": article.get("snippet", ""),
-                        "url": article.get("link", ""),
-                        "urlToImage": article.get("thumbnail", ""),
-                        "publishedAt": article.get("date", ""),
-                        "source": {"name": article.get("source", {}).get("name", "Unknown Source")},
-                        "category": query.capitalize()
-                    }
-                    news_articles.append(transformed_article)
+            for article in data.get("news_results", [])[:limit]:
+                transformed_article = {
+                    "title": article.get("title", "No Title"),
+                    "description": article.get("snippet", ""),
+                    "url": article.get("link", ""),
+                    "urlToImage": article.get("thumbnail", ""),
+                    "publishedAt": article.get("date", ""),
+                    "source": {"name": article.get("source", {}).get("name", "Unknown Source")},
+                    "category": query.capitalize()
+                }
+                news_articles.append(transformed_article)
             
-            return json.dumps(news_articles)
+            return await asyncio.to_thread(article_store.ingest, news_articles)
             
-        except requests.exceptions.RequestException as e:
+        except ValueError as e:
             logger.error(f"Error fetching Google News from SerpAPI: {e}")
-            return json.dumps({"error": f"Failed to fetch news: {e}"})
+            return await self._stored_or_raise(query.capitalize(), f"Failed to fetch news: {e}", limit)
     
-    def get_finance_news(self) -> str:
-        """Fetch financial news from Google Finance Markets via SerpAPI"""
+    async def get_finance_news(self, limit: int | None = None) -> list:
+        """Trending financial news from the shared Google Finance markets snapshot"""
         try:
-            params = {
-                "engine": "google_finance_markets",
-                "trend": "indexes",
-                "api_key": self.api_key
-            }
-            
-            response = requests.get(SERPAPI_BASE_URL, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            logger.info("Successfully fetched Finance Market news")
-            
-            # Extract and transform the news results
-            news_articles = []
-            if "news_results" in data:
-                for article in data["news_results"]:
-                    transformed_article = {
-                        "title": article.get("snippet", "No Title"),
-                        "description": article.get("snippet", ""),
-                        "url": article.get("link", ""),
-                        "urlToImage": article.get("thumbnail", ""),
-                        "publishedAt": article.get("date", ""),
-                        "source": {"name": article.get("source", "Unknown Source")},
-                        "category": "Trending"
-                    }
-                    news_articles.append(transformed_article)
-            
-            return json.dumps(news_articles)
-            
-        except requests.exceptions.RequestException as e:
+            snapshot = await markets_snapshot.get()
+            return snapshot["news"][:limit]
+        except ValueError as e:
             logger.error(f"Error fetching Finance news from SerpAPI: {e}")
-            return json.dumps({"error": f"Failed to fetch finance news: {e}"})
+            return await self._stored_or_raise("Trending", f"Failed to fetch finance news: {e}", limit)
     
-    def get_market_data(self) -> str:
-        """Fetch market trend data from Google Finance Markets via SerpAPI"""
+    async def get_market_data(self) -> list:
+        """Market trend data from the shared Google Finance markets snapshot"""
         try:
-            params = {
-                "engine": "google_finance_markets",
-                "trend": "indexes",
-                "api_key": self.api_key
-            }
-            
-            response = requests.get(SERPAPI_BASE_URL, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            logger.info("Successfully fetched Market data")
-            
-            # Return full market data including trends and indices
-            if "market_trends" in data:
-                return json.dumps(data["market_trends"])
-            else:
-                return json.dumps([])
-            
-        except requests.exceptions.RequestException as e:
+            snapshot = await markets_snapshot.get()
+            return snapshot["market_trends"]
+        except ValueError as e:
             logger.error(f"Error fetching Market data from SerpAPI: {e}")
-            return json.dumps({"error": f"Failed to fetch market data: {e}"})
\ No newline at end of file
+            raise NewsFetchError(f"Failed to fetch market data: {e}") from e
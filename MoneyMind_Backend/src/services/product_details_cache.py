@@ -0,0 +1,63 @@
+import logging
+
+from config import settings
+from src.core.cache import TTLCache, SqliteCacheTier
+
+logger = logging.getLogger(__name__)
+
+class ProductDetailsCache:
+    """
+    Product details by id: a bounded in-memory LRU with a TTL in front of an
+    optional SQLite tier shared by every worker on the host, so a product looked
+    up (or fetched from google_product) by one worker is a disk hit for the rest.
+    Catalog instruments are loaded into both tiers at startup.
+    """
+
+    def __init__(self, path: str = settings.PRODUCT_DETAILS_CACHE_PATH,
+                 max_entries: int = settings.PRODUCT_DETAILS_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = settings.PRODUCT_DETAILS_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.memory = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.disk = None
+        if path:
+            try:
+                self.disk = SqliteCacheTier(path)
+            except Exception as e:
+                logger.warning(f"Product details disk cache disabled: {e}")
+        self.upstream_fetches = 0
+        self.warmed = 0
+
+    def get(self, product_id: str):
+        product = self.memory.get(product_id)
+        if product is None and self.disk:
+            entry = self.disk.get(product_id)
+            if entry is not None:
+                product, seconds_left = entry
+                self.memory.set(product_id, product, ttl_seconds=seconds_left)
+        return product
+
+    def set(self, product_id: str, product: dict, ttl_seconds: float | None = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.memory.set(product_id, product, ttl_seconds=ttl)
+        if self.disk:
+            self.disk.set(product_id, product, ttl)
+
+    def record_upstream_fetch(self):
+        self.upstream_fetches += 1
+
+    def warm(self, products: list):
+        """Loads products (e.g. the instrument catalog) into the cache, up to the memory bound."""
+        if self.disk:
+            self.disk.purge_expired()
+        for product in products[:self.memory.max_entries]:
+            self.set(product["id"], product)
+        self.warmed = min(len(products), self.memory.max_entries)
+        logger.info(f"Product details cache warmed with {self.warmed} catalog products.")
+
+    def stats(self) -> dict:
+        stats = {"memory": self.memory.stats(), "warmed": self.warmed, "upstream_fetches": self.upstream_fetches}
+        if self.disk:
+            stats["disk"] = self.disk.stats()
+        return stats
+
+product_details_cache = ProductDetailsCache()
@@ -0,0 +1,142 @@
+import logging
+
+import numpy as np
+
+from config import settings
+from src.data_manager.instrument_catalog import RISK_LEVELS, horizon_years
+
+logger = logging.getLogger(__name__)
+
+# Feature columns, in the order of the weight vector
+FEATURES = ("risk", "horizon", "tax", "expense", "min_investment")
+
+def largest_remainder(shares: np.ndarray, total: int = 100) -> np.ndarray:
+    """
+    Integer apportionment of total in proportion to shares: floors, then the
+    leftover units go to the largest remainders (ties to the earlier index), so
+    the result always sums to exactly total.
+    """
+    shares = np.asarray(shares, dtype=np.float64)
+    if not len(shares) or shares.sum() <= 0:
+        return np.zeros(len(shares), dtype=np.int64)
+    quotas = shares / shares.sum() * total
+    allocation = np.floor(quotas).astype(np.int64)
+    leftover = total - int(allocation.sum())
+    order = np.lexsort((np.arange(len(quotas)), -(quotas - allocation)))
+    allocation[order[:leftover]] += 1
+    return allocation
+
+class ProductScorer:
+    """
+    Deterministic match scores for recommendation candidates. Each product gets
+    a 0-1 fit per feature (risk, horizon, tax advantage, expense ratio, minimum
+    investment) computed as one array operation over the candidate set; the
+    match score is their weighted mean scaled to 0-100. Products riskier than
+    the tolerance are never recommended, and products in the requested
+    categories rank ahead of filler from other categories. Allocations split
+    100% over the best affordable products by how far each clears the cut-off
+    score, or by score across the best ones if none clears it; when a product
+    in the requested categories clears it, only those share the allocation.
+    """
+
+    def __init__(self, weights: dict = settings.RECOMMEND_SCORE_WEIGHTS,
+                 max_allocated: int = settings.RECOMMEND_MAX_ALLOCATED_PRODUCTS,
+                 min_allocation_score: float = settings.RECOMMEND_MIN_ALLOCATION_SCORE):
+        self.weights = np.array([weights[feature] for feature in FEATURES], dtype=np.float64)
+        self.max_allocated = max_allocated
+        self.min_allocation_score = min_allocation_score
+
+    @staticmethod
+    def risk_gap(products: list, criteria) -> np.ndarray:
+        """Risk levels each product sits above (+) or below (-) the tolerance; unknown risk counts as at it."""
+        tolerance = (criteria.risk_tolerance or "").strip().title()
+        tolerance_level = RISK_LEVELS.index(tolerance) if tolerance in RISK_LEVELS else len(RISK_LEVELS) - 1
+        risk_level = np.fromiter((RISK_LEVELS.index(p["risk"]) if p.get("risk") in RISK_LEVELS else tolerance_level
+                                  for p in products), dtype=np.float64, count=len(products))
+        return risk_level - tolerance_level
+
+    @staticmethod
+    def in_category(products: list, criteria) -> np.ndarray:
+        """Whether each product is in a requested category; all are when none is requested or none match."""
+        categories = {category.strip().lower() for category in criteria.categories or []}
+        matches = np.fromiter((str(p.get("type", "")).lower() in categories for p in products),
+                              dtype=bool, count=len(products))
+        return matches if matches.any() else np.ones(len(products), dtype=bool)
+
+    def features(self, products: list, criteria) -> np.ndarray:
+        """products x FEATURES matrix of fits in [0, 1]."""
+        n = len(products)
+        min_years = np.fromiter((p.get("min_horizon_years", 0) for p in products), dtype=np.float64, count=n)
+        tax = np.fromiter((bool(p.get("taxAdvantaged")) for p in products), dtype=np.float64, count=n)
+        expense = np.fromiter((p.get("expense_ratio_pct", 0.0) for p in products), dtype=np.float64, count=n)
+        min_investment = np.fromiter((p.get("min_investment_inr", 0.0) for p in products), dtype=np.float64, count=n)
+
+        gap = self.risk_gap(products, criteria)
+        # Riskier than tolerated is penalised hard, safer than needed only mildly
+        risk_fit = np.where(gap > 0, 1 - 0.6 * gap, 1 + 0.15 * gap)
+        years = max(horizon_years(criteria.time_horizon), 1)
+        horizon_fit = np.minimum(years / np.maximum(min_years, 1), 1.0)
+        tax_fit = tax if criteria.tax_free_growth else np.ones(n)
+        expense_fit = 1 - expense / settings.RECOMMEND_EXPENSE_RATIO_CEILING_PCT
+        amount = max(criteria.investment_amount, 0.0)
+        investment_fit = np.where(min_investment <= amount, 1.0, amount / np.maximum(min_investment, 1.0))
+        return np.clip(np.column_stack([risk_fit, horizon_fit, tax_fit, expense_fit, investment_fit]), 0.0, 1.0)
+
+    def score(self, products: list, criteria) -> np.ndarray:
+        """Match score 0-100 per product."""
+        if not products:
+            return np.empty(0)
+        return self.features(products, criteria) @ self.weights / self.weights.sum() * 100
+
+    def allocate(self, products: list, scores: np.ndarray, amount: float,
+                 preferred: np.ndarray | None = None) -> np.ndarray:
+        """
+        Whole-percent allocation per product (scores sorted best first) summing to
+        exactly 100. Affordable products are preferred, and among them the
+        preferred ones (requested categories) if any clears the cut-off score; if
+        none clears it, the best ones share it by score.
+        """
+        if not len(scores):
+            return np.zeros(0, dtype=np.int64)
+        min_investment = np.fromiter((p.get("min_investment_inr", 0.0) for p in products),
+                                     dtype=np.float64, count=len(products))
+        candidates = min_investment <= amount
+        if not candidates.any():
+            candidates = np.ones(len(scores), dtype=bool)
+        if preferred is not None and (candidates & preferred & (scores >= self.min_allocation_score)).any():
+            candidates &= preferred
+        clears = candidates & (scores >= self.min_allocation_score)
+        if clears.any():
+            # Shares grow with the margin above the cut-off, so close scores don't all get equal slices
+            shares = np.where(clears, scores - self.min_allocation_score + 1, 0.0)
+        else:
+            shares = np.where(candidates, np.maximum(scores, 1.0), 0.0)
+        shares[np.argsort(-shares, kind="stable")[self.max_allocated:]] = 0.0
+        return largest_remainder(shares)
+
+    def rank(self, products: list, criteria) -> list:
+        """
+        Copies of products best first with match_score, allocation (%) and
+        allocation_amount filled in: products in the requested categories
+        first, then by score, with ties broken by expected return. Products
+        riskier than the tolerance are left out, so an empty list means nothing
+        suitable.
+        """
+        products = [product for product, gap in zip(products, self.risk_gap(products, criteria)) if gap <= 0]
+        if not products:
+            return []
+        scores = np.round(self.score(products, criteria), 1)
+        returns = np.fromiter((p.get("expected_return_pct", 0.0) for p in products), dtype=np.float64,
+                              count=len(products))
+        in_category = self.in_category(products, criteria)
+        order = np.lexsort((-returns, -scores, ~in_category))
+        ranked = [dict(products[i]) for i in order]
+        scores = scores[order]
+        allocation = self.allocate(ranked, scores, criteria.investment_amount, in_category[order])
+        for product, score, percent in zip(ranked, scores.tolist(), allocation.tolist()):
+            product["match_score"] = score
+            product["allocation"] = float(percent)
+            product["allocation_amount"] = round(criteria.investment_amount * percent / 100, 2)
+        return ranked
+
+product_scorer = ProductScorer()
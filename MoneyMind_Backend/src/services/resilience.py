@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from config import settings
+from src.core.metrics import LatencyWindow
+
+logger = logging.getLogger(__name__)
+
+# Shared pool for running (and hedging) blocking upstream calls with a deadline.
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="upstream")
+
+class CircuitOpenError(Exception):
+    """Raised when an upstream's circuit is open and no fallback is available."""
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout_seconds:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+                logger.info(f"Circuit '{self.name}' half-open, allowing a probe request.")
+            return self._state
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN:
+            with self._lock:
+                if not self._probe_in_flight:
+                    self._probe_in_flight = True
+                    return True
+        return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit '{self.name}' closed after successful probe.")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit '{self.name}' opened after {self._failures} failure(s).")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+class Upstream:
+    """
+    Resilience wrapper for one upstream dependency: circuit breaker, deadline,
+    p95-based hedging for idempotent reads and a last-good-answer fallback.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout_seconds: float = 30.0,
+                 timeout_seconds: float = 30.0, hedge_min_delay_seconds: float = 0.5,
+                 hedge_max_delay_seconds: float = 5.0, fallback_cache_size: int = settings.UPSTREAM_FALLBACK_CACHE_SIZE):
+        self.name = name
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout_seconds)
+        self.latency = LatencyWindow()
+        self.timeout_seconds = timeout_seconds
+        self.hedge_min_delay_seconds = hedge_min_delay_seconds
+        self.hedge_max_delay_seconds = hedge_max_delay_seconds
+        self.fallback_cache_size = fallback_cache_size
+        self._last_good = OrderedDict()
+        self._lock = threading.Lock()
+        self.hedges_sent = 0
+        self.fallbacks_served = 0
+
+    def hedge_delay(self) -> float:
+        """Delay before a duplicate request is sent: the observed p95, clamped."""
+        p95 = self.latency.p95()
+        if p95 is None:
+            return self.hedge_max_delay_seconds
+        return min(self.hedge_max_delay_seconds, max(self.hedge_min_delay_seconds, p95))
+
+    def _remember(self, key, result):
+        with self._lock:
+            self._last_good[key] = result
+            self._last_good.move_to_end(key)
+            while len(self._last_good) > self.fallback_cache_size:
+                self._last_good.popitem(last=False)
+
+    def _fallback(self, key, error: Exception):
+        with self._lock:
+            if key is not None and key in self._last_good:
+                self.fallbacks_served += 1
+                logger.warning(f"Upstream '{self.name}' unavailable ({error}); serving last good response.")
+                return self._last_good[key]
+        raise error
+
+    def _on_result(self, start: float, ok: bool):
+        self.latency.record(time.monotonic() - start, ok)
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def call(self, fn, *args, key=None, idempotent: bool = False, cache_result=None, **kwargs):
+        """
+        Runs a blocking upstream call under the breaker and deadline.
+        key: identifies the request for the last-good fallback (None disables it).
+        idempotent: allows a hedged duplicate after the p95 delay.
+        cache_result: optional predicate deciding whether a result may be reused as a fallback.
+        """
+        if not self.breaker.allow_request():
+            return self._fallback(key, CircuitOpenError(f"Circuit for '{self.name}' is open"))
+
+        start = time.monotonic()
+        futures = [_executor.submit(fn, *args, **kwargs)]
+        deadline = start + self.timeout_seconds
+        hedge_at = start + self.hedge_delay() if idempotent else None
+        error = None
+
+        while futures:
+            now = time.monotonic()
+            if now >= deadline:
+                error = TimeoutError(f"Upstream '{self.name}' timed out after {self.timeout_seconds}s")
+                break
+            wait_until = min(deadline, hedge_at) if hedge_at else deadline
+            done, _ = wait(futures, timeout=max(0.0, wait_until - now), return_when=FIRST_COMPLETED)
+            if not done:
+                if hedge_at and time.monotonic() >= hedge_at:
+                    logger.info(f"Upstream '{self.name}' slower than {self.hedge_delay():.2f}s, sending hedged request.")
+                    self.hedges_sent += 1
+                    futures.append(_executor.submit(fn, *args, **kwargs))
+                    hedge_at = None
+                continue
+            for future in done:
+                futures.remove(future)
+                if future.exception() is None:
+                    result = future.result()
+                    self._on_result(start, ok=True)
+                    if key is not None and (cache_result is None or cache_result(result)):
+                        self._remember(key, result)
+                    return result
+                error = future.exception()
+            if not futures and hedge_at:
+                break
+
+        self._on_result(start, ok=False)
+        logger.error(f"Upstream '{self.name}' call failed: {error}")
+        return self._fallback(key, error)
+
+    async def acall(self, fn, *args, key=None, idempotent: bool = False, cache_result=None, **kwargs):
+        """Async counterpart of call(); fn must be a coroutine function."""
+        if not self.breaker.allow_request():
+            return self._fallback(key, CircuitOpenError(f"Circuit for '{self.name}' is open"))
+
+        start = time.monotonic()
+        tasks = {asyncio.ensure_future(fn(*args, **kwargs))}
+        deadline = start + self.timeout_seconds
+        hedge_at = start + self.hedge_delay() if idempotent else None
+        error = None
+
+        try:
+            while tasks:
+                now = time.monotonic()
+                if now >= deadline:
+                    error = TimeoutError(f"Upstream '{self.name}' timed out after {self.timeout_seconds}s")
+                    break
+                wait_until = min(deadline, hedge_at) if hedge_at else deadline
+                done, tasks = await asyncio.wait(tasks, timeout=max(0.0, wait_until - now),
+                                                 return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if hedge_at and time.monotonic() >= hedge_at:
+                        logger.info(f"Upstream '{self.name}' slower than {self.hedge_delay():.2f}s, sending hedged request.")
+                        self.hedges_sent += 1
+                        tasks.add(asyncio.ensure_future(fn(*args, **kwargs)))
+                        hedge_at = None
+                    continue
+                for task in done:
+                    if task.exception() is None:
+                        result = task.result()
+                        self._on_result(start, ok=True)
+                        if key is not None and (cache_result is None or cache_result(result)):
+                            self._remember(key, result)
+                        return result
+                    error = task.exception()
+                if not tasks and hedge_at:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        self._on_result(start, ok=False)
+        logger.error(f"Upstream '{self.name}' call failed: {error}")
+        return self._fallback(key, error)
+
+    def stats(self) -> dict:
+        return {
+            "state": self.breaker.state,
+            "latency": self.latency.snapshot(),
+            "hedges_sent": self.hedges_sent,
+            "fallbacks_served": self.fallbacks_served,
+        }
+
+_upstreams = {}
+_registry_lock = threading.Lock()
+
+def get_upstream(name: str) -> Upstream:
+    """Returns the shared Upstream for name, configured from settings.UPSTREAM_RESILIENCE."""
+    with _registry_lock:
+        if name not in _upstreams:
+            _upstreams[name] = Upstream(name, **settings.UPSTREAM_RESILIENCE.get(name, {}))
+        return _upstreams[name]
+
+def upstream_stats() -> dict:
+    with _registry_lock:
+        return {name: upstream.stats() for name, upstream in _upstreams.items()}
@@ -0,0 +1,110 @@
+import json
+import logging
+import os
+import re
+import time
+
+from config import settings
+from src.core.cache import TTLCache, SqliteCacheTier
+
+logger = logging.getLogger(__name__)
+
+_NORMALIZED_TEXT_PARAMS = ("q", "search_query")
+_EMPTY_RESULT_ERRORS = ("hasn't returned any results", "no results")
+
+def engine_for(params: dict) -> str:
+    """The engine a request hits, treating tbm=nws Google searches as news."""
+    engine = params.get("engine", "google")
+    if engine == "google" and params.get("tbm") == "nws":
+        return "google_news"
+    return engine
+
+class SerpApiCache:
+    """
+    Result cache for SerpApi requests keyed by normalized params (never the api_key),
+    with per-engine TTLs, negative caching of empty results, a byte-bounded
+    in-memory LRU and an optional SQLite tier shared across worker processes.
+    Expired results are kept for SERPAPI_CACHE_STALE_SECONDS so the quota
+    scheduler can serve them when a request is shed.
+    """
+
+    def __init__(self, cache_dir=settings.SERPAPI_CACHE_DIR):
+        self.memory = TTLCache(max_entries=settings.SERPAPI_CACHE_MAX_ENTRIES,
+                               max_bytes=settings.SERPAPI_CACHE_MAX_BYTES,
+                               stale_seconds=settings.SERPAPI_CACHE_STALE_SECONDS)
+        self.disk = None
+        if cache_dir:
+            try:
+                self.disk = SqliteCacheTier(os.path.join(cache_dir, "serpapi_cache.sqlite3"))
+            except Exception as e:
+                logger.warning(f"SerpApi disk cache disabled: {e}")
+        self.negative_hits = 0
+        self._next_purge = 0.0
+        self.purge_expired()
+
+    @staticmethod
+    def make_key(params: dict) -> str:
+        normalized = {}
+        for key, value in params.items():
+            if key == "api_key" or value is None:
+                continue
+            value = str(value)
+            if key in _NORMALIZED_TEXT_PARAMS:
+                value = re.sub(r"\s+", " ", value).strip().lower()
+            normalized[key] = value
+        return json.dumps(normalized, sort_keys=True)
+
+    @staticmethod
+    def is_empty(results: dict) -> bool:
+        if "error" in results:
+            return any(marker in str(results["error"]).lower() for marker in _EMPTY_RESULT_ERRORS)
+        return not any(value for key, value in results.items()
+                       if key.endswith("_results") or key == "market_trends")
+
+    @staticmethod
+    def is_cacheable(results: dict) -> bool:
+        """Successful results and empty results are cacheable; upstream errors are not."""
+        return "error" not in results or SerpApiCache.is_empty(results)
+
+    def ttl_for(self, params: dict, results: dict) -> float:
+        if self.is_empty(results):
+            return settings.SERPAPI_NEGATIVE_CACHE_TTL_SECONDS
+        ttls = settings.SERPAPI_CACHE_TTL_SECONDS
+        return ttls.get(engine_for(params), ttls["default"])
+
+    def get(self, params: dict, allow_stale: bool = False):
+        key = self.make_key(params)
+        results = self.memory.get(key, allow_stale=allow_stale)
+        if results is None and self.disk:
+            entry = self.disk.get(key, allow_stale=allow_stale)
+            if entry is not None:
+                results, seconds_left = entry
+                self.memory.set(key, results, ttl_seconds=seconds_left)
+        if results is not None and self.is_empty(results):
+            self.negative_hits += 1
+        return results
+
+    def set(self, params: dict, results: dict):
+        if not self.is_cacheable(results):
+            return
+        key = self.make_key(params)
+        ttl = self.ttl_for(params, results)
+        self.memory.set(key, results, ttl_seconds=ttl)
+        if self.disk:
+            self.disk.set(key, results, ttl)
+            if time.monotonic() >= self._next_purge:
+                self.purge_expired()
+
+    def purge_expired(self):
+        """Deletes disk rows past their stale window; runs at startup, then every purge interval from set()."""
+        if self.disk:
+            self.disk.purge_expired(settings.SERPAPI_CACHE_STALE_SECONDS)
+            self._next_purge = time.monotonic() + settings.SERPAPI_CACHE_PURGE_INTERVAL_SECONDS
+
+    def stats(self) -> dict:
+        stats = {"memory": self.memory.stats(), "negative_hits": self.negative_hits}
+        if self.disk:
+            stats["disk"] = self.disk.stats()
+        return stats
+
+serpapi_cache = SerpApiCache()
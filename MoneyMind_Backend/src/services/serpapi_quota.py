@@ -0,0 +1,189 @@
+import calendar
+import contextlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+APP = "app"
+PREFETCH = "prefetch"
+PRIORITIES = (INTERACTIVE, APP, PREFETCH)
+
+class SerpApiQuota:
+    """
+    Daily/monthly SerpApi budget with priority classes (interactive > app > prefetch).
+    Lower priorities stop being admitted as the day's budget runs low so that chat
+    users are the last to be refused. Counters are persisted to a small JSON file:
+    updates hold an exclusive flock on a sidecar lock file across load/modify/save
+    and checks re-read the file, so worker processes share one budget.
+    """
+
+    def __init__(self, monthly_quota: int = settings.SERPAPI_MONTHLY_QUOTA,
+                 daily_budget: int = settings.SERPAPI_DAILY_BUDGET,
+                 state_path: str = settings.SERPAPI_QUOTA_STATE_PATH):
+        self.monthly_quota = monthly_quota
+        self.configured_daily_budget = daily_budget
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self.shed = {priority: 0 for priority in PRIORITIES}
+        self.served_stale = {priority: 0 for priority in PRIORITIES}
+        self._state = self._load()
+
+    # --- Persistence ---
+
+    @staticmethod
+    def _empty_state(now: datetime) -> dict:
+        return {
+            "day": now.strftime("%Y-%m-%d"),
+            "month": now.strftime("%Y-%m"),
+            "day_used": 0,
+            "month_used": 0,
+            "day_used_by_priority": {priority: 0 for priority in PRIORITIES},
+        }
+
+    def _load(self) -> dict:
+        state = self._empty_state(datetime.now())
+        if self.state_path and os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'r') as f:
+                    state.update(json.load(f))
+            except (IOError, ValueError) as e:
+                logger.warning(f"Could not read SerpApi quota state ({self.state_path}): {e}")
+        return self._roll(state, datetime.now())
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Exclusive lock across worker processes for a read-modify-write of the state file."""
+        if not self.state_path or fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        with open(f"{self.state_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _save(self):
+        if not self.state_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._state, f)
+            os.replace(tmp_path, self.state_path)
+        except IOError as e:
+            logger.warning(f"Could not save SerpApi quota state ({self.state_path}): {e}")
+
+    def _refresh(self):
+        """Re-reads the shared counters (other workers may have spent quota since)."""
+        self._state = self._roll(self._load() if self.state_path else self._state, datetime.now())
+
+    def _roll(self, state: dict, now: datetime) -> dict:
+        """Resets the counters when the day or month has changed."""
+        if state["month"] != now.strftime("%Y-%m"):
+            return self._empty_state(now)
+        if state["day"] != now.strftime("%Y-%m-%d"):
+            state.update(day=now.strftime("%Y-%m-%d"), day_used=0,
+                         day_used_by_priority={priority: 0 for priority in PRIORITIES})
+        return state
+
+    # --- Budget ---
+
+    def daily_budget(self) -> int:
+        """The configured daily budget, or an even split of what the month has left."""
+        state = self._state
+        month_left_at_day_start = max(0, self.monthly_quota - (state["month_used"] - state["day_used"]))
+        if self.configured_daily_budget:
+            return min(self.configured_daily_budget, month_left_at_day_start)
+        now = datetime.now()
+        days_left = calendar.monthrange(now.year, now.month)[1] - now.day + 1
+        return math.ceil(month_left_at_day_start / days_left)
+
+    def _remaining_share(self) -> float:
+        budget = self.daily_budget()
+        if budget <= 0:
+            return 0.0
+        return max(0, budget - self._state["day_used"]) / budget
+
+    def admit(self, priority: str) -> bool:
+        """Whether a request of this priority class may spend quota right now."""
+        with self._lock:
+            self._refresh()
+            if self._state["month_used"] >= self.monthly_quota:
+                return False
+            if priority == INTERACTIVE:
+                return True
+            reserve = settings.SERPAPI_PRIORITY_RESERVE.get(priority, 0.0)
+            return self._remaining_share() > reserve
+
+    def allow_hedge(self, priority: str) -> bool:
+        """Hedged duplicates cost quota, so only send them while the day's budget is healthy."""
+        with self._lock:
+            if priority != INTERACTIVE:
+                return False
+            self._refresh()
+            return self._remaining_share() > settings.SERPAPI_HEDGE_MIN_BUDGET_SHARE
+
+    def record(self, priority: str):
+        """Counts one request actually sent to SerpApi."""
+        with self._lock, self._file_lock():
+            self._refresh()
+            self._state["day_used"] += 1
+            self._state["month_used"] += 1
+            by_priority = self._state.setdefault("day_used_by_priority", {})
+            by_priority[priority] = by_priority.get(priority, 0) + 1
+            self._save()
+            now = time.monotonic()
+            self._recent.append(now)
+            while self._recent and self._recent[0] < now - 3600:
+                self._recent.popleft()
+
+    def record_shed(self, priority: str, served_stale: bool):
+        with self._lock:
+            if served_stale:
+                self.served_stale[priority] += 1
+            else:
+                self.shed[priority] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()
+            state = self._state
+            budget = self.daily_budget()
+            now = datetime.now()
+            days_in_month = calendar.monthrange(now.year, now.month)[1]
+            elapsed_days = now.day - 1 + (now.hour * 3600 + now.minute * 60 + now.second) / 86400
+            cutoff = time.monotonic() - 3600
+            return {
+                "monthly_quota": self.monthly_quota,
+                "month_used": state["month_used"],
+                "month_remaining": max(0, self.monthly_quota - state["month_used"]),
+                "daily_budget": budget,
+                "day_used": state["day_used"],
+                "day_remaining": max(0, budget - state["day_used"]),
+                "day_used_by_priority": state.get("day_used_by_priority", {}),
+                "burn_rate_per_hour": sum(1 for t in self._recent if t >= cutoff),
+                "projected_month_usage": round(state["month_used"] / elapsed_days * days_in_month) if elapsed_days >= 1 else None,
+                "shed": dict(self.shed),
+                "served_stale": dict(self.served_stale),
+            }
+
+serpapi_quota = SerpApiQuota()
@@ -1,32 +1,27 @@
 #src/services/serpapi_service.py
-from serpapi import GoogleSearch
 from config import settings
+from src.services.serpapi_transport import serpapi_transport
+from src.services.serpapi_quota import INTERACTIVE
+from src.services.news_prefetcher import news_prefetcher
+from src.data_manager.article_store import article_store
+from src.services.markets_snapshot import markets_snapshot, is_market_status_query
 import logging
 import json
 
 logger = logging.getLogger(__name__)
 
 class SerpApiService:
-    def __init__(self, api_key=settings.SERPAPI_API_KEY):
+    def __init__(self, api_key=settings.SERPAPI_API_KEY, transport=serpapi_transport):
         if not api_key:
             raise ValueError("SerpApi API Key is required.")
         self.api_key = api_key
+        self.transport = transport
         logger.info("SerpApi Service Initialized")
 
-    def _search(self, params: dict) -> dict:
-        """Internal method to perform search and handle basic errors."""
-        params['api_key'] = self.api_key
-        try:
-            search = GoogleSearch(params)
-            results = search.get_dict()
-            if "error" in results:
-                logger.error(f"SerpApi Error: {results['error']}")
-                return {"error": results['error']}
-            logger.info(f"SerpApi search successful for query: {params.get('q') or params.get('search_query')}")
-            return results
-        except Exception as e:
-            logger.error(f"Exception during SerpApi search: {e}")
-            return {"error": f"An exception occurred: {e}"}
+    def _search(self, params: dict, priority: str = INTERACTIVE) -> dict:
+        """Internal method to perform search via the shared SerpApi transport (cached, pooled)."""
+        # Tool calls come from chat, where a user is waiting on the answer
+        return self.transport.search_sync(params, priority=priority)
 
     def google_search(self, query: str, num_results: int = 3) -> str:
         """Performs Google Search (organic results)."""
@@ -59,7 +54,7 @@ class SerpApiService:
         ]
         return json.dumps(filtered_results)
 
-    def get_news(self, query: str, num_results: int = 5) -> str:
+    def get_news(self, query: str, num_results: int = 5, priority: str = INTERACTIVE) -> str:
         """Performs Google News Search."""
         search_query = query
         if "india" not in query.lower():
@@ -72,11 +67,16 @@ class SerpApiService:
             "hl": "en",
             "num": num_results
         }
-        results = self._search(params)
+        results = self._search(params, priority)
         news_results = results.get("news_results", [])
-        filtered_results = [
-            {"title": r.get("title"), "link": r.get("link"), "snippet": r.get("snippet"), "source": r.get("source"), "date": r.get("date")}
+        articles = article_store.ingest([
+            {"title": r.get("title"), "url": r.get("link"), "description": r.get("snippet"),
+             "source": {"name": r.get("source")}, "publishedAt": r.get("date"), "category": query.capitalize()}
             for r in news_results[:num_results]
+        ])
+        filtered_results = [
+            {"title": a["title"], "link": a["url"], "snippet": a["description"], "source": a["source"]["name"], "date": a["publishedAt"]}
+            for a in articles
         ]
         return json.dumps(filtered_results)
 
@@ -97,6 +97,15 @@ def youtube_search_tool_func(query: str) -> str:
 def get_financial_news_tool_func(query: str) -> str:
     """Callable function for Financial News Tool."""
     logger.info(f"--- TOOL CALL: Fetching News for: {query} (India Focus) ---")
+    if is_market_status_query(query):
+        try:
+            return markets_snapshot.market_status()
+        except ValueError as e:
+            logger.warning(f"Markets snapshot unavailable, falling back to news search: {e}")
+    prefetched = news_prefetcher.lookup(query)
+    if prefetched is not None:
+        logger.info(f"Serving prefetched news for popular topic: {query}")
+        return prefetched
     return serpapi_service.get_news(query=query)
 
 # Dictionary mapping function names to actual functions
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import threading
+import time
+
+import httpx
+
+from config import settings
+from src.core.metrics import LatencyWindow
+from src.services.resilience import get_upstream, CircuitOpenError
+from src.services.serpapi_cache import serpapi_cache, engine_for
+from src.services.serpapi_quota import serpapi_quota, INTERACTIVE, APP
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+class SerpApiTransport:
+    """
+    The single HTTP path to SerpApi. Every caller (chat tools, news, investments)
+    goes through one pooled keep-alive httpx client running on a dedicated event
+    loop thread, so sync and async callers share connections, the result cache,
+    the quota scheduler, the circuit breaker and the request metrics.
+    """
+
+    def __init__(self, api_key=settings.SERPAPI_API_KEY, base_url=settings.SERPAPI_BASE_URL):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.cache = serpapi_cache
+        self.quota = serpapi_quota
+        self.upstream = get_upstream("serpapi")
+        self._loop = None
+        self._client = None
+        self._start_lock = threading.Lock()
+        self.requests_sent = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self._latency_by_engine = {}
+
+    # --- Event loop / client lifecycle ---
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="serpapi-transport", daemon=True)
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Only ever called on the transport loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(settings.UPSTREAM_RESILIENCE["serpapi"]["timeout_seconds"],
+                                      connect=settings.SERPAPI_CONNECT_TIMEOUT_SECONDS),
+                limits=httpx.Limits(max_connections=settings.SERPAPI_MAX_CONNECTIONS,
+                                    max_keepalive_connections=settings.SERPAPI_MAX_KEEPALIVE_CONNECTIONS,
+                                    keepalive_expiry=settings.SERPAPI_KEEPALIVE_EXPIRY_SECONDS),
+            )
+            logger.info(f"SerpApi transport client created (HTTP/2: {HTTP2_AVAILABLE})")
+        return self._client
+
+    def submit(self, coro):
+        """Schedules a coroutine on the transport loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    async def aclose(self):
+        """Closes the pooled client (e.g. on application shutdown)."""
+        if self._loop is None or self._client is None:
+            return
+        await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop))
+        self._client = None
+
+    # --- Requests ---
+
+    async def _request(self, params: dict, priority: str) -> dict:
+        # Quota state is a file shared (and flock'd) across workers; keep that I/O off the transport loop
+        await asyncio.to_thread(self.quota.record, priority)
+        response = await self._get_client().get(self.base_url, params=params)
+        # SerpApi reports bad queries/no results as JSON errors on 4xx; only
+        # throttling and server errors count as upstream failures.
+        if response.status_code == 429 or response.status_code >= 500:
+            response.raise_for_status()
+        data = response.json()
+        if response.status_code >= 400 and "error" not in data:
+            response.raise_for_status()
+        return data
+
+    async def _search(self, params: dict, use_cache: bool, priority: str) -> dict:
+        query = params.get("q") or params.get("search_query") or params.get("product_id")
+        engine = engine_for(params)
+        if use_cache:
+            cached = self.cache.get(params)
+            if cached is not None:
+                self.cache_hits += 1
+                logger.info(f"SerpApi cache hit ({engine}) for: {query}")
+                return cached
+
+        if not await asyncio.to_thread(self.quota.admit, priority):
+            stale = self.cache.get(params, allow_stale=True)
+            self.quota.record_shed(priority, served_stale=stale is not None)
+            if stale is not None:
+                logger.warning(f"SerpApi budget low, serving stale {engine} result ({priority}) for: {query}")
+                return stale
+            logger.warning(f"SerpApi budget low, shedding {priority} {engine} request for: {query}")
+            return {"error": "Search budget is exhausted for now. Please try again later."}
+
+        request_params = {**params, "api_key": self.api_key}
+        hedge = await asyncio.to_thread(self.quota.allow_hedge, priority)
+        start = time.monotonic()
+        self.requests_sent += 1
+        try:
+            results = await self.upstream.acall(self._request, request_params, priority,
+                                                key=self.cache.make_key(params),
+                                                idempotent=hedge,
+                                                cache_result=lambda r: "error" not in r)
+        except CircuitOpenError as e:
+            self.errors += 1
+            logger.warning(f"SerpApi circuit open, failing fast: {e}")
+            return {"error": "Search is temporarily unavailable. Please try again shortly."}
+        except Exception as e:
+            self.errors += 1
+            self._latency(engine).record(time.monotonic() - start, ok=False)
+            logger.error(f"Exception during SerpApi request ({engine}): {e}")
+            return {"error": f"An exception occurred: {e}"}
+
+        self._latency(engine).record(time.monotonic() - start, ok="error" not in results)
+        self.cache.set(params, results)
+        if "error" in results:
+            logger.error(f"SerpApi Error ({engine}): {results['error']}")
+        else:
+            logger.info(f"SerpApi request successful ({engine}) for: {query}")
+        return results
+
+    async def search(self, params: dict, use_cache: bool = True, priority: str = APP) -> dict:
+        """
+        Performs a SerpApi request (params without api_key) from any event loop.
+        priority is the quota class (see serpapi_quota). Never raises: failures and
+        shed requests come back as {"error": ...} like the SerpApi JSON.
+        """
+        return await asyncio.wrap_future(self.submit(self._search(dict(params), use_cache, priority)))
+
+    def search_sync(self, params: dict, use_cache: bool = True, priority: str = INTERACTIVE) -> dict:
+        """Blocking variant of search() for sync callers (e.g. Gemini tool functions)."""
+        return self.submit(self._search(dict(params), use_cache, priority)).result()
+
+    # --- Instrumentation ---
+
+    def _latency(self, engine: str) -> LatencyWindow:
+        if engine not in self._latency_by_engine:
+            self._latency_by_engine[engine] = LatencyWindow()
+        return self._latency_by_engine[engine]
+
+    def stats(self) -> dict:
+        return {
+            "requests_sent": self.requests_sent,
+            "cache_hits": self.cache_hits,
+            "errors": self.errors,
+            "http2": HTTP2_AVAILABLE,
+            "latency_by_engine": {engine: window.snapshot() for engine, window in self._latency_by_engine.items()},
+            "cache": self.cache.stats(),
+            "quota": self.quota.stats(),
+        }
+
+serpapi_transport = SerpApiTransport()
@@ -0,0 +1,99 @@
+import json
+import logging
+import re
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9]+")
+_LINK_ID = re.compile(r"\[?\blink(\d+)\b\]?")
+_CHARS_PER_TOKEN = 4
+
+def _title_tokens(title: str) -> set:
+    return set(_WORD.findall((title or "").lower()))
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts text to roughly max_tokens (~4 chars each) on a word boundary."""
+    max_chars = max_tokens * _CHARS_PER_TOKEN
+    if not text or len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0]
+    return cut.rstrip(" ,.;:-") + "…"
+
+class ToolOutputCompactor:
+    """
+    Shrinks search tool results before they are sent back to the model: drops
+    unused fields, removes near-duplicate headlines, truncates snippets and swaps
+    URLs for short ids (link1, link2, ...) that expand() restores in the answer.
+    One instance is used per conversation so ids stay stable across tool calls.
+    """
+
+    def __init__(self, fields=settings.TOOL_OUTPUT_FIELDS,
+                 snippet_tokens=settings.TOOL_OUTPUT_SNIPPET_TOKENS,
+                 dedupe_threshold=settings.TOOL_OUTPUT_DEDUPE_THRESHOLD):
+        self.fields = fields
+        self.snippet_tokens = snippet_tokens
+        self.dedupe_threshold = dedupe_threshold
+        self._links = {}
+        self._link_ids = {}
+
+    def _link_id(self, url: str) -> str:
+        if url not in self._link_ids:
+            link_id = f"link{len(self._link_ids) + 1}"
+            self._link_ids[url] = link_id
+            self._links[link_id] = url
+        return self._link_ids[url]
+
+    def _is_duplicate(self, tokens: set, seen: list) -> bool:
+        for other in seen:
+            union = tokens | other
+            if union and len(tokens & other) / len(union) >= self.dedupe_threshold:
+                return True
+        return False
+
+    def compact(self, tool_name: str, content):
+        """Returns the compacted tool output; anything that isn't a JSON list passes through."""
+        if not isinstance(content, str):
+            return content
+        try:
+            items = json.loads(content)
+        except ValueError:
+            return content
+        if not isinstance(items, list):
+            return content
+
+        keep = self.fields.get(tool_name)
+        compacted = []
+        seen_titles = []
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            tokens = _title_tokens(item.get("title"))
+            if tokens and self._is_duplicate(tokens, seen_titles):
+                continue
+            seen_titles.append(tokens)
+
+            entry = {}
+            for key, value in item.items():
+                if keep is not None and key not in keep:
+                    continue
+                if value in (None, "", [], {}):
+                    continue
+                if key == "link":
+                    value = self._link_id(value)
+                elif key == "snippet":
+                    value = _truncate_to_tokens(value, self.snippet_tokens)
+                entry[key] = value
+            compacted.append(entry)
+
+        result = json.dumps(compacted, separators=(",", ":"), ensure_ascii=False)
+        logger.info(f"Compacted '{tool_name}' output from {len(content)} to {len(result)} chars "
+                    f"({len(items)} -> {len(compacted)} items).")
+        return result
+
+    def expand(self, text: str) -> str:
+        """Replaces link ids the model copied into its answer with the original URLs."""
+        if not text or not self._links:
+            return text
+        return _LINK_ID.sub(lambda m: self._links.get(f"link{m.group(1)}", m.group(0)), text)
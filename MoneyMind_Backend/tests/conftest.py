@@ -0,0 +1,22 @@
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Settings are read at import time: point every store at a scratch directory and
+# turn off disk caches, quota persistence and prefetching before src is imported.
+_SCRATCH_DIR = tempfile.mkdtemp(prefix="moneymind-tests-")
+os.environ.update({
+    "GEMINI_API_KEY": "test",
+    "SERPAPI_API_KEY": "test",
+    "DATABASE_URL": f"sqlite:///{os.path.join(_SCRATCH_DIR, 'app.db')}",
+    "ARTICLE_STORE_PATH": os.path.join(_SCRATCH_DIR, "articles.sqlite3"),
+    "MARKET_HISTORY_DIR": os.path.join(_SCRATCH_DIR, "market_history"),
+    "INSTRUMENT_CATALOG_PATH": os.path.join(BACKEND_DIR, "data", "instruments.csv"),
+    "SERPAPI_CACHE_DIR": "",
+    "SERPAPI_QUOTA_STATE_PATH": "",
+    "PRODUCT_DETAILS_CACHE_PATH": "",
+    "NEWS_PREFETCH_TOP_K": "0",
+})
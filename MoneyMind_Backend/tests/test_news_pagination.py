@@ -0,0 +1,65 @@
+import base64
+
+import pytest
+from fastapi import HTTPException
+from starlette.responses import Response
+
+from src.api.news_routes import NEXT_CURSOR_HEADER, _decode_cursor, _encode_cursor, _paginate
+
+
+ARTICLES = [{"id": f"a{i}", "title": f"Article {i}"} for i in range(5)]
+
+
+def test_cursor_round_trips():
+    assert _decode_cursor(_encode_cursor("a3", 4)) == {"after": "a3", "offset": 4}
+
+
+def test_pages_follow_next_cursor_header():
+    seen, cursor = [], None
+    while True:
+        response = Response()
+        page = _paginate(ARTICLES, 2, cursor, response)
+        seen.extend(article["id"] for article in page)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+    assert seen == [article["id"] for article in ARTICLES]
+
+
+def test_last_page_omits_header():
+    response = Response()
+    page = _paginate(ARTICLES, 2, _encode_cursor("a3", 4), response)
+    assert [article["id"] for article in page] == ["a4"]
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_exact_fit_omits_header():
+    response = Response()
+    assert len(_paginate(ARTICLES, 5, None, response)) == 5
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_cursor_survives_reordering():
+    reordered = [{"id": "new"}] + ARTICLES
+    page = _paginate(reordered, 2, _encode_cursor("a1", 2), Response())
+    assert [article["id"] for article in page] == ["a2", "a3"]
+
+
+def test_missing_article_falls_back_to_offset():
+    page = _paginate(ARTICLES, 2, _encode_cursor("gone", 3), Response())
+    assert [article["id"] for article in page] == ["a3", "a4"]
+
+
+@pytest.mark.parametrize("cursor", [
+    "!!!not-base64!!!",
+    "a",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b'{"after": "a1"}').decode(),
+    base64.urlsafe_b64encode(b'{"after": "a1", "offset": "x"}').decode(),
+    base64.urlsafe_b64encode(b"[1, 2]").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+])
+def test_malformed_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        _paginate(ARTICLES, 2, cursor, Response())
+    assert error.value.status_code == 400
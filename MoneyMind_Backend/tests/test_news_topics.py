@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from src.services.news_personalization import NewsPersonalizer
+from src.services.news_prefetcher import IGNORED_TOPICS, NewsPrefetcher, normalize_topic
+
+
+@pytest.mark.parametrize("placeholder", [
+    "Unknown/General", "unknown general", "General Financial Topic", "general financial news", "Error",
+])
+def test_placeholder_spellings_are_ignored(placeholder):
+    assert normalize_topic(placeholder) in IGNORED_TOPICS
+
+
+def test_personalizer_skips_placeholder_topics():
+    user_data = {
+        "preferences": {"news_interaction_topics": ["Unknown/General", "RBI policy"]},
+        "history": {"news_log": [
+            {"topic_identified_for_log": "Unknown/General", "timestamp": "2026-01-01T00:00:00"},
+        ]},
+    }
+    phrases = [phrase for phrase, _ in NewsPersonalizer()._weighted_interests(user_data, [])]
+    assert phrases == ["RBI policy"]
+
+
+def test_prefetcher_skips_placeholder_topics(tmp_path):
+    for user in ("a", "b"):
+        topics = ["Unknown/General", "General Financial News", "Latest RBI news"]
+        (tmp_path / f"user_{user}_data.json").write_text(
+            json.dumps({"preferences": {"news_interaction_topics": topics}}))
+    assert NewsPrefetcher(data_dir=str(tmp_path), top_k=5).aggregate_topics() == ["rbi"]
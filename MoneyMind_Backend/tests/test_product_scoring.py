@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from src.data_manager.instrument_catalog import instrument_catalog
+from src.services.investment_service import InvestmentCriteria
+from src.services.product_scoring import ProductScorer, largest_remainder
+
+
+def product(product_id, **fields):
+    base = {"id": product_id, "type": "Mutual Funds", "risk": "Low", "min_horizon_years": 1,
+            "taxAdvantaged": False, "expense_ratio_pct": 0.5, "min_investment_inr": 500.0,
+            "expected_return_pct": 7.0}
+    return {**base, **fields}
+
+
+@pytest.mark.parametrize("shares", [
+    [1, 1, 1],
+    [1, 1, 1, 1, 1, 1, 1],
+    [0.3, 0.3, 0.4],
+    [97.3, 1.1, 1.6],
+    [1e-9, 1, 1e9],
+    [5],
+    np.random.default_rng(7).random(40),
+])
+def test_largest_remainder_sums_to_total(shares):
+    allocation = largest_remainder(shares)
+    assert allocation.sum() == 100
+    assert (allocation >= 0).all()
+
+
+def test_largest_remainder_ties_go_to_earlier_index():
+    assert largest_remainder([1, 1, 1]).tolist() == [34, 33, 33]
+    assert largest_remainder([1, 1, 1], total=2).tolist() == [1, 1, 0]
+
+
+@pytest.mark.parametrize("shares", [[], [0, 0, 0]])
+def test_largest_remainder_without_shares_is_zero(shares):
+    assert largest_remainder(shares).tolist() == [0] * len(shares)
+
+
+def test_allocate_prefers_affordable_products():
+    scorer = ProductScorer(max_allocated=4, min_allocation_score=60)
+    products = [product("pricey", min_investment_inr=50000.0), product("cheap")]
+    allocation = scorer.allocate(products, np.array([90.0, 80.0]), 20000)
+    assert allocation.tolist() == [0, 100]
+
+
+def test_allocate_with_no_affordable_product_uses_all():
+    scorer = ProductScorer(max_allocated=4, min_allocation_score=60)
+    products = [product("a", min_investment_inr=50000.0), product("b", min_investment_inr=80000.0)]
+    allocation = scorer.allocate(products, np.array([90.0, 70.0]), 1000)
+    assert allocation.sum() == 100
+    assert allocation.tolist() == [74, 26]
+
+
+def test_allocate_below_cut_off_shares_by_score():
+    scorer = ProductScorer(max_allocated=4, min_allocation_score=60)
+    products = [product("a"), product("b")]
+    allocation = scorer.allocate(products, np.array([50.0, 30.0]), 20000)
+    assert allocation.tolist() == [63, 37]
+
+
+def test_allocate_keeps_only_the_best_products():
+    scorer = ProductScorer(max_allocated=2, min_allocation_score=60)
+    products = [product(str(i)) for i in range(4)]
+    allocation = scorer.allocate(products, np.array([90.0, 80.0, 70.0, 65.0]), 20000)
+    assert allocation.sum() == 100
+    assert (allocation[2:] == 0).all()
+
+
+def test_allocate_tied_scores_split_evenly():
+    scorer = ProductScorer(max_allocated=4, min_allocation_score=60)
+    products = [product(str(i)) for i in range(3)]
+    allocation = scorer.allocate(products, np.array([80.0, 80.0, 80.0]), 20000)
+    assert allocation.tolist() == [34, 33, 33]
+
+
+def test_allocate_restricts_to_preferred_products_that_clear_the_cut_off():
+    scorer = ProductScorer(max_allocated=4, min_allocation_score=60)
+    products = [product("etf"), product("fund")]
+    preferred = np.array([True, False])
+    assert scorer.allocate(products, np.array([70.0, 90.0]), 20000, preferred).tolist() == [100, 0]
+    assert scorer.allocate(products, np.array([50.0, 90.0]), 20000, preferred).tolist() == [0, 100]
+
+
+def test_rank_with_nothing_within_tolerance_is_empty():
+    criteria = InvestmentCriteria(risk_tolerance="Low", investment_amount=20000)
+    products = [product("equity", risk="High"), product("hybrid", risk="Moderate")]
+    assert ProductScorer().rank(products, criteria) == []
+
+
+def test_rank_breaks_ties_by_expected_return():
+    criteria = InvestmentCriteria(risk_tolerance="Low", investment_amount=20000)
+    products = [product("lower", expected_return_pct=6.5), product("higher", expected_return_pct=7.5)]
+    ranked = ProductScorer().rank(products, criteria)
+    assert [p["id"] for p in ranked] == ["higher", "lower"]
+    assert ranked[0]["match_score"] == ranked[1]["match_score"]
+    assert sum(p["allocation"] for p in ranked) == 100
+
+
+def test_rank_puts_requested_categories_first():
+    criteria = InvestmentCriteria(categories=["ETF"], risk_tolerance="Low", investment_amount=20000)
+    products = [product("fund", expense_ratio_pct=0.1),
+                product("etf", type="ETF", expense_ratio_pct=1.5, min_horizon_years=3)]
+    ranked = ProductScorer().rank(products, criteria)
+    assert [p["id"] for p in ranked] == ["etf", "fund"]
+    assert ranked[0]["match_score"] < ranked[1]["match_score"]
+
+
+@pytest.mark.parametrize("categories, risk, horizon", [
+    (["ETF"], "Low", "1 year"),
+    (["Gold"], "Moderate", "5+ years"),
+])
+def test_requested_category_gets_the_allocation(categories, risk, horizon):
+    criteria = InvestmentCriteria(categories=categories, risk_tolerance=risk, time_horizon=horizon,
+                                  investment_amount=20000)
+    candidates = instrument_catalog.search(criteria.categories, criteria.risk_tolerance,
+                                           criteria.time_horizon, criteria.tax_free_growth)
+    ranked = ProductScorer().rank(candidates, criteria)
+    requested = {category.lower() for category in categories}
+    assert any(p["type"].lower() not in requested for p in ranked)
+    assert sum(p["allocation"] for p in ranked) == 100
+    assert sum(p["allocation"] for p in ranked if p["type"].lower() in requested) == 100
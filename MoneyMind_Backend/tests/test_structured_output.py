@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from src.core.structured_output import IncrementalJsonParser, parse_structured, repair_json, StructuredOutputError
+
+
+@pytest.mark.parametrize("damaged, expected", [
+    # Truncated arrays and objects
+    ('[{"a": 1}, {"a": 2}', [{"a": 1}, {"a": 2}]),
+    ('[{"a": 1}, {"a": 2', [{"a": 1}, {"a": 2}]),
+    ('{"a": [1, 2, 3', {"a": [1, 2, 3]}),
+    ('{"a": "half a sent', {"a": "half a sent"}),
+    ('{"a": 1, "b":', {"a": 1}),
+    ('{"a": 1, "b"', {"a": 1}),
+    ('{"a": 1, "b": tr', {"a": 1}),
+    ('{"a": 1, "b": 2.', {"a": 1, "b": 2}),
+    ('{"a": "quote \\', {"a": "quote "}),
+    # Code fences and surrounding prose
+    ('```json\n{"a": 1}\n```', {"a": 1}),
+    ('Here you go:\n```\n[1, 2]\n```\nAnything else?', [1, 2]),
+    ('Sure! {"a": 1} Hope that helps.', {"a": 1}),
+    # Trailing commas
+    ('{"a": 1, "b": 2,}', {"a": 1, "b": 2}),
+    ('[1, 2, 3, ]', [1, 2, 3]),
+    ('[{"a": 1,}, {"a": 2},]', [{"a": 1}, {"a": 2}]),
+    # Stray closers and text after the document
+    ('{"a": 1}]}', {"a": 1}),
+    ('{"a": 1} {"b": 2}', {"a": 1}),
+])
+def test_repair_json(damaged, expected):
+    assert json.loads(repair_json(damaged)) == expected
+
+
+def test_repair_json_leaves_valid_json_unchanged():
+    text = '{"a": [1, {"b": "x, y]"}], "c": null}'
+    assert json.loads(repair_json(text)) == json.loads(text)
+
+
+def test_parse_structured_repairs_and_checks_type():
+    assert parse_structured('```json\n[{"a": 1}, {"a": 2', many=True) == [{"a": 1}, {"a": 2}]
+    with pytest.raises(StructuredOutputError):
+        parse_structured('[1, 2]', many=False)
+    with pytest.raises(StructuredOutputError):
+        parse_structured("no json here")
+
+
+@pytest.mark.parametrize("chunks, expected_items", [
+    # Items are emitted as soon as they close, whatever the chunking
+    (['[{"a": 1}, {"a"', ': 2}, {"a": 3}]'], [[{"a": 1}], [{"a": 2}, {"a": 3}]]),
+    (['```json\n[', '{"a": "x}"}', ',{"a": "y\\"z"}', ']\n```'], [[], [{"a": "x}"}], [{"a": 'y"z'}], []]),
+    # A final element cut off mid-stream is never emitted
+    (['[{"a": 1}, {"a": 2', ', "b": [1, 2'], [[{"a": 1}], []]),
+    # Nested arrays count as one item
+    (['[[1, 2], [3', ']]'], [[[1, 2]], [[3]]]),
+])
+def test_incremental_parser_feed(chunks, expected_items):
+    parser = IncrementalJsonParser()
+    assert [parser.feed(chunk) for chunk in chunks] == expected_items
+
+
+def test_incremental_parser_partial_final_element():
+    parser = IncrementalJsonParser()
+    parser.feed('[{"a": 1}, {"a": 2, "b": "trunc')
+    assert parser.partial() == [{"a": 1}, {"a": 2, "b": "trunc"}]
+
+
+def test_incremental_parser_partial_before_any_json():
+    parser = IncrementalJsonParser()
+    parser.feed("Thinking about it")
+    assert parser.partial() is None
@@ -1,5 +1,6 @@
 // lib/models/news_article.dart
 class NewsArticle {
+  final String? id;
   final String title;
   final String? description;
   final String? url;
@@ -9,6 +10,7 @@ class NewsArticle {
   final String category;
 
   NewsArticle({
+    this.id,
     required this.title,
     this.description,
     this.url,
@@ -20,6 +22,7 @@ class NewsArticle {
 
   factory NewsArticle.fromJson(Map<String, dynamic> json) {
     return NewsArticle(
+      id: json['id'],
       title: json['title'] ?? 'No Title',
       description: json['description'] ?? json['snippet'],
       url: json['url'],
@@ -32,6 +35,7 @@ class NewsArticle {
 
   Map<String, dynamic> toJson() {
     return {
+      'id': id,
       'title': title,
       'description': description,
       'url': url,
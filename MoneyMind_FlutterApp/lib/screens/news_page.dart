@@ -26,6 +26,8 @@ class _NewsPageState extends State<NewsPage> {
 
   List<NewsArticle> _articles = [];
   List<NewsArticle> _featuredArticles = [];
+  String? _nextCursor;
+  bool _isLoadingMore = false;
 
   // Categories at the top with icons
   final List<Map<String, dynamic>> _categories = [
@@ -80,25 +82,21 @@ class _NewsPageState extends State<NewsPage> {
     });
 
     try {
-      if (_selectedCategory == 'Trending') {
-        final articles = await _apiService.getTrendingNews();
-        setState(() {
-          _articles = articles;
-          _featuredArticles = articles.take(2).toList();
-        });
-      } else if (_selectedCategory == 'My Topics') {
+      if (_selectedCategory == 'My Topics') {
         // Example user interests - in a real app, these would come from user preferences
         List<String> userInterests = ['finance', 'stocks', 'investment'];
         final articles = await _apiService.getPersonalizedNews(userInterests);
         setState(() {
           _articles = articles;
           _featuredArticles = articles.take(2).toList();
+          _nextCursor = null;
         });
       } else {
-        final articles = await _apiService.getNewsByCategory(_selectedCategory);
+        final page = await _apiService.getNewsPage(_selectedCategory);
         setState(() {
-          _articles = articles;
-          _featuredArticles = articles.take(2).toList();
+          _articles = page.articles;
+          _featuredArticles = page.articles.take(2).toList();
+          _nextCursor = page.nextCursor;
         });
       }
     } catch (e) {
@@ -114,6 +112,23 @@ class _NewsPageState extends State<NewsPage> {
     }
   }
 
+  // Infinite scroll: fetch the page after the last one loaded
+  Future<void> _loadMoreNews() async {
+    if (_isLoadingMore || _nextCursor == null) return;
+    final category = _selectedCategory;
+    _isLoadingMore = true;
+    try {
+      final page = await _apiService.getNewsPage(category, cursor: _nextCursor);
+      if (!mounted || category != _selectedCategory) return;
+      setState(() {
+        _articles = [..._articles, ...page.articles];
+        _nextCursor = page.nextCursor;
+      });
+    } finally {
+      _isLoadingMore = false;
+    }
+  }
+
   @override
   Widget build(BuildContext context) {
     return Scaffold(
@@ -370,6 +385,9 @@ class _NewsPageState extends State<NewsPage> {
                 itemCount: _articles.length,
                 itemBuilder: (context, index) {
                   final article = _articles[index];
+                  if (index == _articles.length - 1 && _nextCursor != null) {
+                    WidgetsBinding.instance.addPostFrameCallback((_) => _loadMoreNews());
+                  }
                   return GestureDetector(
                     onTap: () {
                       _showArticleDetail(context, article);
@@ -535,6 +553,7 @@ class _NewsPageState extends State<NewsPage> {
                       _articles = results;
                       _featuredArticles = results.take(2).toList();
                       _selectedCategory = 'Search';
+                      _nextCursor = null;
                     });
                   } catch (e) {
                     setState(() {
@@ -46,6 +46,11 @@ class _ProductFinderPageState extends State<ProductFinderPage> {
   // Products data
   List<Map<String, dynamic>> _investmentProducts = [];
 
+  // Explanations for the loaded products, fetched in one batch request after they load
+  Map<String, Map<String, dynamic>> _explanations = {};
+  Set<String> _unavailableExplanations = {};
+  Future<void>? _explanationsRequest;
+
   // Categories for filtering
   final List<String> _categories = [
     'ETF', 'Stocks', 'Insurance', 'Crypto',
@@ -144,6 +149,7 @@ class _ProductFinderPageState extends State<ProductFinderPage> {
         _investmentProducts = products;
         isLoading = false;
       });
+      _prefetchExplanations(products);
     } catch (e) {
       print('Error fetching products: $e');
       setState(() {
@@ -389,15 +395,51 @@ class _ProductFinderPageState extends State<ProductFinderPage> {
     );
   }
 
+  // Explain all loaded recommendations in one request instead of one per card
+  void _prefetchExplanations(List<Map<String, dynamic>> products) {
+    final productIds = products
+        .map((product) => product['id'] as String?)
+        .whereType<String>()
+        .toSet()
+        .take(BackendInvestmentService.explainBatchMaxProducts)
+        .toList();
+    _explanations = {};
+    _unavailableExplanations = {};
+    if (productIds.isEmpty) {
+      _explanationsRequest = null;
+      return;
+    }
+
+    late final Future<void> request;
+    request = _investmentService.getProductExplanations(productIds: productIds).then((batch) {
+      // Ignore a batch for products that have since been replaced by a newer search
+      if (_explanationsRequest != request) return;
+      _explanations = batch['explanations'] as Map<String, Map<String, dynamic>>;
+      _unavailableExplanations = (batch['unavailable'] as List<String>).toSet();
+    });
+    _explanationsRequest = request;
+  }
+
+  // Batched explanation if there is one; the per-product call only for ids the batch could not explain
+  Future<Map<String, dynamic>> _explanationFor(Map<String, dynamic> product) async {
+    final productId = product['id'] as String?;
+    if (productId != null && _explanationsRequest != null) {
+      await _explanationsRequest;
+      final explanation = _explanations[productId];
+      if (explanation != null && !_unavailableExplanations.contains(productId)) {
+        return explanation;
+      }
+    }
+    return _investmentService.getAssistantProductExplanation(product: product);
+  }
+
   void _showExplanationDialog(Map<String, dynamic> product) {
     setState(() {
       isLoading = true;
     });
 
-    // Use the backend service to get AI-generated explanation
-    _investmentService.getAssistantProductExplanation(
-      product: product,
-    ).then((response) {
+    // Use the batched AI-generated explanation, fetching this product alone only if needed
+    _explanationFor(product).then((response) {
       setState(() {
         isLoading = false;
       });
@@ -4,6 +4,14 @@ import 'package:http/http.dart' as http;
 import '../models/news_article.dart';
 import '../models/market_data.dart';
 
+// One page of news plus the cursor for the next page (null on the last page)
+class NewsArticlePage {
+  final List<NewsArticle> articles;
+  final String? nextCursor;
+
+  const NewsArticlePage(this.articles, this.nextCursor);
+}
+
 class ApiService {
   // Replace with your FastAPI server URL
   final String baseUrl;
@@ -64,6 +72,39 @@ class ApiService {
     }
   }
 
+  // Get one page of trending or category news; pass the previous page's
+  // nextCursor to continue where it ended without refetching earlier pages
+  Future<NewsArticlePage> getNewsPage(String category, {int limit = 10, String? cursor}) async {
+    try {
+      final path = category == 'Trending' ? '/api/news/trending' : '/api/news/category/$category';
+      final response = await http.get(
+        Uri.parse('$baseUrl$path').replace(queryParameters: {
+          'limit': '$limit',
+          if (cursor != null) 'cursor': cursor,
+        }),
+      );
+
+      if (response.statusCode == 200) {
+        final List<dynamic> data = jsonDecode(response.body);
+        final articles = data.map((item) {
+          // Ensure category is set
+          if (!item.containsKey('category')) {
+            item['category'] = category;
+          }
+          return NewsArticle.fromJson(item);
+        }).toList();
+        return NewsArticlePage(articles, response.headers['x-next-cursor']);
+      } else {
+        print('API Error: ${response.statusCode} - ${response.body}');
+        throw Exception('Failed to load $category news: ${response.statusCode}');
+      }
+    } catch (e) {
+      print('Error fetching $category news page: $e');
+      // Placeholder data for the first page only
+      return NewsArticlePage(cursor == null ? _getPlaceholderArticles(category) : [], null);
+    }
+  }
+
   // Search news
   Future<List<NewsArticle>> searchNews(String query, {int limit = 10}) async {
     try {
@@ -113,6 +154,47 @@ class ApiService {
     }
   }
 
+  // Live market trends over server-sent events: a full snapshot first, then
+  // only the quotes that changed are applied to it
+  Stream<List<MarketTrend>> streamMarketData() async* {
+    final client = http.Client();
+    try {
+      final request = http.Request('GET', Uri.parse('$baseUrl/api/news/markets/stream'))
+        ..headers['Accept'] = 'text/event-stream';
+      final response = await client.send(request);
+      if (response.statusCode != 200) {
+        throw Exception('Failed to open market stream: ${response.statusCode}');
+      }
+
+      List<dynamic> trends = [];
+      String event = 'message';
+      await for (final line in response.stream.transform(utf8.decoder).transform(const LineSplitter())) {
+        if (line.startsWith('event:')) {
+          event = line.substring(6).trim();
+        } else if (line.startsWith('data:')) {
+          final Map<String, dynamic> data = jsonDecode(line.substring(5));
+          if (event == 'snapshot') {
+            trends = data['market_trends'] ?? [];
+          } else if (event == 'diff') {
+            final Map<String, dynamic> quotes = data['quotes'] ?? {};
+            for (final trend in trends) {
+              final List<dynamic> results = trend['results'] ?? [];
+              for (var i = 0; i < results.length; i++) {
+                final updated = quotes[results[i]['stock']];
+                if (updated != null) results[i] = updated;
+              }
+            }
+          }
+          yield trends.map((item) => MarketTrend.fromJson(item)).toList();
+        } else if (line.isEmpty) {
+          event = 'message';
+        }
+      }
+    } finally {
+      client.close();
+    }
+  }
+
   // Get personalized news based on user interests
   Future<List<NewsArticle>> getPersonalizedNews(List<String> interests, {int limit = 10}) async {
     try {
@@ -10,6 +10,8 @@ class BackendInvestmentService {
   // API endpoints
   static const String _recommendEndpoint = "/api/investments/recommend";
   static const String _explainEndpoint = "/api/investments/assistant/explain-product";
+  static const String _explainBatchEndpoint = "/api/investments/explain-batch";
+  static const int explainBatchMaxProducts = 12; // Matches EXPLAIN_BATCH_MAX_PRODUCTS on the backend
   static const String _compareEndpoint = "/api/investments/assistant/compare-products";
   static const String _assistantQueryEndpoint = "/api/investments/assistant/query";
   static const String _healthEndpoint = "/api/health";
@@ -107,6 +109,46 @@ class BackendInvestmentService {
     }
   }
 
+  /// Get explanations for several recommended products in one request.
+  /// Returns {'explanations': {id: explanation}, 'unavailable': [ids]}; if the
+  /// request fails every id is reported unavailable so callers can fall back.
+  Future<Map<String, dynamic>> getProductExplanations({
+    required List<String> productIds,
+    String? userId,
+  }) async {
+    print('Fetching ${productIds.length} product explanations from: $baseUrl$_explainBatchEndpoint');
+    try {
+      final response = await http.post(
+        Uri.parse('$baseUrl$_explainBatchEndpoint'),
+        headers: {'Content-Type': 'application/json'},
+        body: jsonEncode({
+          'product_ids': productIds,
+          'user_id': userId,
+        }),
+      ).timeout(const Duration(seconds: 30)); // One model call covers the whole batch
+
+      print('Response status code: ${response.statusCode}');
+
+      if (response.statusCode == 200) {
+        final Map<String, dynamic> jsonResponse = jsonDecode(response.body);
+        final Map<String, dynamic> explanations = jsonResponse['explanations'] ?? {};
+        return {
+          'explanations': explanations.map((id, explanation) => MapEntry(id, explanation as Map<String, dynamic>)),
+          'unavailable': (jsonResponse['unavailable'] as List? ?? []).cast<String>(),
+        };
+      } else {
+        print('API error: ${response.statusCode} - ${response.body}');
+        throw Exception('Failed to get product explanations: ${response.statusCode}');
+      }
+    } catch (e) {
+      print('Error getting product explanations: $e');
+      return {
+        'explanations': <String, Map<String, dynamic>>{},
+        'unavailable': productIds,
+      };
+    }
+  }
+
   /// Get AI assistant comparison of products
   Future<Map<String, dynamic>> getAssistantProductComparison({
     required List<Map<String, dynamic>> products,
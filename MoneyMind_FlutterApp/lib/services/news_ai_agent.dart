@@ -7,22 +7,23 @@ class NewsAIAgent {
   // Replace with your actual API endpoint
   final String apiEndpoint = 'https://api.marketstack.com/v2';
   final String apiKey = '3b082b48ebb70c958db834679530c2f2';
+  final String backendUrl = 'https://moneymind-dlnl.onrender.com';
 
-  // Get personalized news recommendations
-  Future<List<NewsArticle>> getPersonalizedRecommendations(List<String> userInterests, {int limit = 10}) async {
+  // Get personalized news recommendations (ranked by the MoneyMind backend)
+  Future<List<NewsArticle>> getPersonalizedRecommendations(List<String> userInterests, {String? userId, int limit = 10}) async {
     try {
       final response = await http.post(
-        Uri.parse('$apiEndpoint/personalize'),
+        Uri.parse('$backendUrl/api/news/personalized'),
         headers: {'Content-Type': 'application/json'},
         body: jsonEncode({
+          'user_id': userId,
           'interests': userInterests,
           'limit': limit
         }),
       );
 
       if (response.statusCode == 200) {
-        final Map<String, dynamic> data = jsonDecode(response.body);
-        final List<dynamic> articles = data['articles'] ?? [];
+        final List<dynamic> articles = jsonDecode(response.body);
 
         return articles.map((article) {
           // Add the category based on the best matching interest
@@ -41,27 +42,41 @@ class NewsAIAgent {
   }
 
   // Get sentiment analysis for a news article
-  Future<Map<String, dynamic>> getArticleSentiment(String articleText) async {
+  Future<Map<String, dynamic>> getArticleSentiment(String articleText, {String? articleId}) async {
+    final results = await _postSentiment([
+      {'id': articleId, 'text': articleText}
+    ]);
+    return results.isNotEmpty ? results.first : {'sentiment': 'neutral', 'confidence': 0.5};
+  }
+
+  // Get sentiment for a page of articles in one request, keyed by article id
+  Future<Map<String, Map<String, dynamic>>> getArticleSentiments(List<NewsArticle> articles) async {
+    final items = articles
+        .where((article) => article.id != null)
+        .map((article) => {'id': article.id, 'text': '${article.title}. ${article.description ?? ''}'})
+        .toList();
+    if (items.isEmpty) return {};
+    final results = await _postSentiment(items);
+    return {for (final result in results) result['id'] as String: result};
+  }
+
+  Future<List<Map<String, dynamic>>> _postSentiment(List<Map<String, dynamic>> items) async {
     try {
       final response = await http.post(
-        Uri.parse('$apiEndpoint/sentiment'),
+        Uri.parse('$backendUrl/api/news/sentiment'),
         headers: {'Content-Type': 'application/json'},
-        body: jsonEncode({
-          'text': articleText,
-        }),
+        body: jsonEncode({'articles': items}),
       );
 
       if (response.statusCode == 200) {
-        return jsonDecode(response.body);
+        final List<dynamic> data = jsonDecode(response.body);
+        return data.cast<Map<String, dynamic>>();
       } else {
         throw Exception('Failed to analyze sentiment: ${response.statusCode}');
       }
     } catch (e) {
       print('Error in sentiment analysis: $e');
-      return {
-        'sentiment': 'neutral',
-        'confidence': 0.5,
-      };
+      return [];
     }
   }
 
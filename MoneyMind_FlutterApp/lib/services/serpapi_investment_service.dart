@@ -3,10 +3,11 @@ import 'dart:convert';
 import 'package:http/http.dart' as http;
 
 class SerpApiInvestmentService {
-  final String apiKey;
-  final String baseUrl = 'https://serpapi.com/search.json';
+  // Searches go through the backend proxy, which holds the SerpAPI key and
+  // shares its connection pool and result cache across all clients
+  final String baseUrl;
 
-  SerpApiInvestmentService({required this.apiKey});
+  SerpApiInvestmentService({this.baseUrl = 'https://moneymind-dlnl.onrender.com'});
 
   Future<List<Map<String, dynamic>>> getInvestmentProducts({
     List<String>? categories,
@@ -18,7 +19,7 @@ class SerpApiInvestmentService {
 
     try {
       final response = await http.get(
-          Uri.parse('$baseUrl?engine=google_finance&q=${Uri.encodeComponent(searchQuery)}&api_key=$apiKey')
+          Uri.parse('$baseUrl/api/investments/search?engine=google_finance&q=${Uri.encodeComponent(searchQuery)}')
       );
 
       if (response.statusCode == 200) {
@@ -46,7 +47,7 @@ class SerpApiInvestmentService {
 
     try {
       final response = await http.get(
-          Uri.parse('$baseUrl?engine=google_shopping&q=${Uri.encodeComponent(searchQuery)}&api_key=$apiKey')
+          Uri.parse('$baseUrl/api/investments/search?engine=google_shopping&q=${Uri.encodeComponent(searchQuery)}')
       );
 
       if (response.statusCode == 200) {
@@ -1,4 +1,6 @@
 // lib/widgets/market_trends_widget.dart
+import 'dart:async';
+import 'dart:math';
 import 'package:flutter/material.dart';
 import '../models/market_data.dart';
 import '../services/api_service.dart';
@@ -16,11 +18,56 @@ class _MarketTrendsWidgetState extends State<MarketTrendsWidget> {
   bool _isLoading = true;
   bool _hasError = false;
   String _errorMessage = '';
+  StreamSubscription<List<MarketTrend>>? _liveUpdates;
+  Timer? _reconnectTimer;
+  int _reconnectAttempts = 0;
+  static const int _maxReconnectDelaySeconds = 60;
 
   @override
   void initState() {
     super.initState();
     _fetchMarketData();
+    _listenForLiveUpdates();
+  }
+
+  @override
+  void dispose() {
+    _reconnectTimer?.cancel();
+    _liveUpdates?.cancel();
+    super.dispose();
+  }
+
+  // Live quotes pushed by the backend; the last loaded data stays on screen if the stream drops,
+  // and the stream is reopened with exponential backoff while the widget is mounted
+  void _listenForLiveUpdates() {
+    _liveUpdates?.cancel();
+    _liveUpdates = _apiService.streamMarketData().listen(
+      (marketTrends) {
+        _reconnectAttempts = 0;
+        if (!mounted || marketTrends.isEmpty) return;
+        setState(() {
+          _marketTrends = marketTrends;
+          _isLoading = false;
+          _hasError = false;
+        });
+      },
+      onError: (e) {
+        print('Market stream error: $e');
+        _scheduleReconnect();
+      },
+      onDone: _scheduleReconnect,
+      cancelOnError: true,
+    );
+  }
+
+  void _scheduleReconnect() {
+    if (!mounted) return;
+    _reconnectTimer?.cancel();
+    final delaySeconds = min(1 << min(_reconnectAttempts, 6), _maxReconnectDelaySeconds);
+    _reconnectAttempts++;
+    _reconnectTimer = Timer(Duration(seconds: delaySeconds), () {
+      if (mounted) _listenForLiveUpdates();
+    });
   }
 
   Future<void> _fetchMarketData() async {
@@ -104,7 +151,10 @@ class _MarketTrendsWidgetState extends State<MarketTrendsWidget> {
               ),
               IconButton(
                 icon: const Icon(Icons.refresh),
-                onPressed: _fetchMarketData,
+                onPressed: () {
+                  _fetchMarketData();
+                  _listenForLiveUpdates();
+                },
                 tooltip: 'Refresh data',
               ),
             ],